@@ -0,0 +1,70 @@
+"""
+Compare the time it takes to render the Link header of a response with and
+without a shared `LinkBuilder`, for a request with many filter parameters.
+
+Usage: python benchmarks/bench_links.py [number of filter params]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import django
+from django.conf import settings
+
+settings.configure(ALLOWED_HOSTS=["testserver"])
+django.setup()
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+import drf_link_header_pagination
+
+
+class Pagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+    default_limit = 10
+
+
+def per_link_parsing(pagination):
+    """The Link header as it was built before `LinkBuilder`: one parse per link."""
+    request = pagination.request
+    links = []
+
+    url = replace_query_param(request.build_absolute_uri(), "limit", pagination.limit)
+    links.append(replace_query_param(url, "offset", pagination.offset - pagination.limit))
+    url = replace_query_param(request.build_absolute_uri(), "limit", pagination.limit)
+    links.append(replace_query_param(url, "offset", pagination.offset + pagination.limit))
+    url = replace_query_param(request.build_absolute_uri(), "limit", pagination.limit)
+    links.append(remove_query_param(url, "offset"))
+    # The last link used to render the next link again to check for None.
+    url = replace_query_param(request.build_absolute_uri(), "limit", pagination.limit)
+    replace_query_param(url, "offset", pagination.offset + pagination.limit)
+    url = replace_query_param(request.build_absolute_uri(), "limit", pagination.limit)
+    links.append(replace_query_param(url, "offset", 990))
+    return links
+
+
+def shared_builder(pagination):
+    pagination._link_builder_request = None
+    return pagination.get_headers()
+
+
+def main(num_params=25, number=2000):
+    params = {"filter{}".format(idx): "value {}".format(idx) for idx in range(num_params)}
+    params["offset"] = 500
+    request = Request(APIRequestFactory().get("/items/", params))
+    pagination = Pagination()
+    pagination.paginate_queryset(range(1000), request)
+
+    for name, func in (
+        ("per-link parsing", per_link_parsing),
+        ("shared LinkBuilder", shared_builder),
+    ):
+        seconds = min(timeit.repeat(lambda: func(pagination), number=number, repeat=5))
+        print("{:<20} {:8.1f} us/response".format(name, seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
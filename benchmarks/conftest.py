@@ -0,0 +1,104 @@
+"""
+Benchmarks for the pagination classes, run with pytest-benchmark against a
+SQLite database of `BENCHMARK_ROWS` rows (10,000 by default). The database
+is kept in `benchmarks/.data` so that large ones are only seeded once.
+
+    $ BENCHMARK_ROWS=1000000 pytest benchmarks --benchmark-autosave
+    $ BENCHMARK_ROWS=1000000 pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:10%
+"""
+import os
+
+import pytest
+
+ROWS = int(os.environ.get("BENCHMARK_ROWS", 10000))
+# The wide documents are larger, so there are fewer of them.
+DOCUMENT_ROWS = min(ROWS, 100000)
+DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+
+
+def pytest_configure():
+    from django.conf import settings
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    name = os.path.join(DATA_DIR, "items-{}.sqlite3".format(ROWS))
+    settings.configure(
+        SECRET_KEY="not very secret in benchmarks",
+        ALLOWED_HOSTS=["testserver"],
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": name,
+                "TEST": {"NAME": name},
+            },
+        },
+        DEFAULT_AUTO_FIELD="django.db.models.AutoField",
+        INSTALLED_APPS=(
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "rest_framework",
+            "drf_link_header_pagination",
+            "tests",
+        ),
+    )
+
+    import django
+
+    django.setup()
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_blocker):
+    """Use the seeded database as is instead of creating a test database."""
+    from django.core.management import call_command
+    from django.db import connection
+
+    from tests.models import Document, Item
+
+    with django_db_blocker.unblock():
+        call_command("migrate", run_syncdb=True, verbosity=0)
+        if Item.objects.count() != ROWS:
+            Item.objects.all().delete()
+            table = connection.ops.quote_name(Item._meta.db_table)
+            with connection.cursor() as cursor:
+                for start in range(0, ROWS, 100000):
+                    cursor.executemany(
+                        "INSERT INTO {} (created, value, updated_at) "
+                        "VALUES (%s, %s, '2020-01-01 00:00:00')".format(table),
+                        [
+                            (idx, idx)
+                            for idx in range(start + 1, min(start + 100000, ROWS) + 1)
+                        ],
+                    )
+                cursor.execute("ANALYZE")
+        if Document.objects.count() != DOCUMENT_ROWS:
+            Document.objects.all().delete()
+            body = "lorem ipsum " * 400
+            for start in range(0, DOCUMENT_ROWS, 10000):
+                Document.objects.bulk_create(
+                    Document(
+                        created=idx,
+                        title="Document {}".format(idx),
+                        body=body,
+                        metadata={"index": idx, "tags": ["a", "b", "c"] * 20},
+                    )
+                    for idx in range(start + 1, min(start + 10000, DOCUMENT_ROWS) + 1)
+                )
+
+
+@pytest.fixture
+def items(db):
+    from tests.models import Item
+
+    return Item.objects.all()
+
+
+@pytest.fixture
+def documents(db):
+    from tests.models import Document
+
+    return Document.objects.all()
+
+
+@pytest.fixture
+def rows():
+    return ROWS
@@ -0,0 +1,175 @@
+import tracemalloc
+from urllib import parse
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import generics, serializers
+from rest_framework.pagination import Cursor
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+from tests.models import Document, Item
+
+factory = APIRequestFactory()
+
+PAGE_SIZE = 50
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["created", "value", "updated_at"]
+
+
+class DocumentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Document
+        fields = ["id", "created", "title"]
+
+
+class PagePagination(drf_link_header_pagination.LinkHeaderPagination):
+    page_size = PAGE_SIZE
+
+
+class LimitOffsetPagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+    default_limit = PAGE_SIZE
+
+
+class CursorPagination(drf_link_header_pagination.LinkHeaderCursorPagination):
+    page_size = PAGE_SIZE
+    ordering = "created"
+
+
+class LinkResponseCursorPagination(
+    drf_link_header_pagination.LinkHeaderLinkResponseCursorPagination
+):
+    page_size = PAGE_SIZE
+    ordering = "created"
+
+
+class KeysetPagination(drf_link_header_pagination.LinkHeaderKeysetPagination):
+    page_size = PAGE_SIZE
+    ordering = "created"
+
+
+def cursor_params(pagination_class, items, position):
+    pagination = pagination_class()
+    pagination.paginate_queryset(items, Request(factory.get("/")))
+    url = pagination.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+    return dict(parse.parse_qsl(parse.urlsplit(url).query))
+
+
+def get_params(pagination_class, depth, items, rows):
+    """Return the query parameters of a page near the start or the end."""
+    deep = depth == "deep"
+    if pagination_class is PagePagination:
+        return {"page": rows // PAGE_SIZE - 1 if deep else 2}
+    if pagination_class is LimitOffsetPagination:
+        return {"offset": rows - 2 * PAGE_SIZE if deep else PAGE_SIZE}
+    if pagination_class is KeysetPagination:
+        return {"after": rows - 2 * PAGE_SIZE if deep else PAGE_SIZE}
+    return cursor_params(
+        pagination_class, items, str(rows - 2 * PAGE_SIZE if deep else PAGE_SIZE)
+    )
+
+
+def respond(pagination_class, items, params):
+    """Paginate, serialize and render a page like a list view would."""
+    request = Request(factory.get("/", params))
+    pagination = pagination_class()
+    page = pagination.paginate_queryset(items, request)
+    response = pagination.get_paginated_response(ItemSerializer(page, many=True).data)
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = "application/json"
+    response.renderer_context = {}
+    return response.render()
+
+
+PAGINATION_CLASSES = [
+    PagePagination,
+    LimitOffsetPagination,
+    CursorPagination,
+    LinkResponseCursorPagination,
+    KeysetPagination,
+]
+
+
+@pytest.mark.parametrize("depth", ["shallow", "deep"])
+@pytest.mark.parametrize(
+    "pagination_class", PAGINATION_CLASSES, ids=lambda cls: cls.__name__
+)
+def test_response(benchmark, items, rows, pagination_class, depth):
+    """
+    Time a whole response, and record its queries and memory use in the
+    benchmark's extra info.
+    """
+    params = get_params(pagination_class, depth, items, rows)
+
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as queries:
+        response = respond(pagination_class, items, params)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert response.status_code == 200
+
+    benchmark.extra_info["queries"] = len(queries)
+    benchmark.extra_info["query_seconds"] = sum(
+        float(query["time"]) for query in queries.captured_queries
+    )
+    benchmark.extra_info["peak_memory_kb"] = peak // 1024
+    benchmark(respond, pagination_class, items, params)
+
+
+@pytest.mark.parametrize(
+    "pagination_class", PAGINATION_CLASSES, ids=lambda cls: cls.__name__
+)
+def test_headers(benchmark, items, rows, pagination_class):
+    """Time building the Link header of a page in the middle of the results."""
+    params = get_params(pagination_class, "shallow", items, rows)
+    request = Request(factory.get("/", dict(params, **{
+        "filter{}".format(idx): "value {}".format(idx) for idx in range(10)
+    })))
+    pagination = pagination_class()
+    pagination.paginate_queryset(items, request)
+
+    def reset():
+        # Start from an unparsed URL for every round.
+        pagination._link_builder_request = None
+        pagination._link_builder_url = None
+
+    # The keyset class runs a query for its last link, which is included.
+    headers = benchmark.pedantic(pagination.get_headers, setup=reset, rounds=200)
+    assert headers["Link"]
+
+
+@pytest.mark.parametrize("projection", [None, "only", "values"])
+def test_projection(benchmark, documents, projection):
+    """
+    Time fetching and serializing a page of 200 wide rows of which the
+    serializer reads three fields, and record the peak memory use.
+    """
+
+    class ProjectedPagination(drf_link_header_pagination.LinkHeaderPagination):
+        page_size = 200
+
+    ProjectedPagination.projection = projection
+    view = generics.ListAPIView.as_view(
+        queryset=documents,
+        serializer_class=DocumentSerializer,
+        pagination_class=ProjectedPagination,
+    )
+
+    def respond():
+        return view(factory.get("/", {"page": 2})).render()
+
+    tracemalloc.start()
+    response = respond()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert response.status_code == 200
+
+    benchmark.extra_info["peak_memory_kb"] = peak // 1024
+    benchmark(respond)
@@ -1,66 +1,1194 @@
-from rest_framework.pagination import CursorPagination, PageNumberPagination, LimitOffsetPagination
+import asyncio
+import hashlib
+import logging
+from base64 import b64encode
+from functools import wraps
+from itertools import islice
+from urllib import parse
+
+from asgiref.sync import sync_to_async
+
+from django.core.cache import caches
+from django.core.exceptions import (
+    EmptyResultSet,
+    FieldDoesNotExist,
+    ImproperlyConfigured,
+    ValidationError,
+)
+from django.core.paginator import InvalidPage
+from django.db import Error, connections
+from django.db.models import Count, F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    LimitOffsetPagination,
+    PageNumberPagination,
+    _positive_int,
+    _reverse_ordering,
+)
 from rest_framework.response import Response
-from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .batch import BatchListModelMixin, Collection
+from .cache import PageCache, get_cache_alias
+from .conditional import LastModified, PageHash
+from .counts import (
+    CachedCount,
+    CappedCount,
+    Estimate,
+    EstimatedCount,
+    ExactCount,
+    LowerBound,
+    NoCount,
+    ReplicaCount,
+    acount,
+    using_replica,
+)
+from .cursors import SignedCursorCodec
+from .executor import CountExecutor
+from .guard import QueryBudgetExceeded, QueryBudgetWarning, QueryGuard
+from .instrumentation import (
+    NULL_PHASE,
+    Instrumentation,
+    PrometheusMetrics,
+    StatsdMetrics,
+)
+from .keys import get_field_value, seek_filter
+from .links import LinkBuilder
+from .mixins import (
+    CachedListModelMixin,
+    ConditionalListModelMixin,
+    StreamingListModelMixin,
+)
+from .page_index import PageIndex
+from .paginator import CountStrategyPaginator, alist
+from .totals import TotalCounter
 
 __all__ = [
     "LinkHeaderPagination",
     "LinkHeaderLimitOffsetPagination",
     "LinkHeaderCursorPagination",
     "LinkHeaderLinkResponseCursorPagination",
+    "LinkHeaderKeysetPagination",
+    "ExactCount",
+    "NoCount",
+    "CachedCount",
+    "EstimatedCount",
+    "CappedCount",
+    "LowerBound",
+    "Estimate",
+    "ReplicaCount",
+    "CountStrategyPaginator",
+    "PageIndex",
+    "CountExecutor",
+    "SignedCursorCodec",
+    "TotalCounter",
+    "BatchListModelMixin",
+    "Collection",
+    "StreamingListModelMixin",
+    "PageCache",
+    "CachedListModelMixin",
+    "PageHash",
+    "LastModified",
+    "ConditionalListModelMixin",
+    "Instrumentation",
+    "StatsdMetrics",
+    "PrometheusMetrics",
+    "QueryGuard",
+    "QueryBudgetExceeded",
+    "QueryBudgetWarning",
 ]
 
+logger = logging.getLogger(__name__)
+
+
+def routed(method):
+    """
+    Decorate a `paginate_queryset()` or `apaginate_queryset()` method to
+    paginate on the `page_using` database, and to paginate again on the
+    queryset's own database if that fails.
+    """
+    def log_failure(pagination, queryset):
+        logger.warning(
+            "Paginating on %s failed, paginating on %s instead",
+            pagination.page_using,
+            queryset.db,
+            exc_info=True,
+        )
+
+    if asyncio.iscoroutinefunction(method):
+        @wraps(method)
+        async def awrapper(self, queryset, request, view=None):
+            if self.page_using is not None:
+                replica = await sync_to_async(using_replica)(queryset, self.page_using)
+                if replica is not None:
+                    try:
+                        return await method(self, replica, request, view)
+                    except Error:
+                        log_failure(self, queryset)
+            return await method(self, queryset, request, view)
+
+        return awrapper
+
+    @wraps(method)
+    def wrapper(self, queryset, request, view=None):
+        replica = using_replica(queryset, self.page_using)
+        if replica is not None:
+            try:
+                return method(self, replica, request, view)
+            except Error:
+                log_failure(self, queryset)
+        return method(self, queryset, request, view)
+
+    return wrapper
+
 
 class LinkHeaderMixin:
+    link_builder_class = LinkBuilder
+
+    # The number of rows fetched and serialized at a time when streaming.
+    stream_chunk_size = 1000
+
+    # A `PageCache` for views using `CachedListModelMixin`.
+    page_cache = None
+
+    # A validator such as `PageHash(("pk", "version"))` for views using
+    # `ConditionalListModelMixin`.
+    collection_validator = None
+
+    # An `Instrumentation` timing the phases of (a sample of) the requests.
+    instrumentation = None
+
+    # A `QueryGuard` checking the queries made for each paginated response.
+    query_guard = None
+
+    # Sent instead of the last link when the count is capped by `CappedCount`.
+    count_lower_bound_header = "X-Total-Count-Lower-Bound"
+
+    # Fetch only the fields the serializer reads: `"only"` defers the others,
+    # and `"values"` fetches dicts instead of model instances.
+    projection = None
+
+    # The serializer whose fields are fetched; the view's by default.
+    projection_serializer_class = None
+
+    # The database (e.g. a read replica) pages and their counts are fetched
+    # from, falling back to the queryset's own if it fails.
+    page_using = None
+
+    def start_instrumentation(self, request, queryset=None):
+        if self.instrumentation is not None:
+            self._recorder = self.instrumentation.start(request, queryset)
+
+    def start_query_guard(self, request, queryset=None, view=None):
+        if self.query_guard is not None:
+            self._query_log = self.query_guard.start(request, queryset, view)
+
+    def check_async(self):
+        """Refuse the options that `apaginate_queryset()` can't honor."""
+        if self.query_guard is not None:
+            raise ImproperlyConfigured(
+                "{}.query_guard can't guard apaginate_queryset(), whose queries "
+                "run on other threads.".format(type(self).__name__)
+            )
+
+    def finish_query_guard(self, report=True):
+        """
+        Stop counting the queries of the response, and report them unless
+        building the response failed (`report` is `False`).
+        """
+        log = getattr(self, "_query_log", None)
+        if log is None:
+            return
+        self._query_log = None
+        if report:
+            self.query_guard.finish(log)
+        else:
+            log.stop()
+
+    def get_projection_serializer(self, view):
+        if self.projection_serializer_class is not None:
+            context = view.get_serializer_context() if view is not None else {}
+            return self.projection_serializer_class(context=context)
+        if not hasattr(view, "get_serializer"):
+            return None
+        return view.get_serializer()
+
+    def get_projection(self, model, view, ordering=()):
+        """
+        Return the model fields read by the serializer and needed for
+        `ordering`, by name, or `None` if the serializer reads anything else
+        (e.g. with a `SerializerMethodField` or a dotted `source`).
+        """
+        serializer = self.get_projection_serializer(view)
+        if serializer is None:
+            return None
+        names = [field.lstrip("-") for field in ordering]
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            if len(field.source_attrs) != 1:
+                return None
+            names.append(field.source_attrs[0])
+
+        fields = {}
+        for name in names:
+            try:
+                field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete:
+                return None
+            fields[name] = field
+        return fields
+
+    def project_queryset(self, queryset, view, ordering=()):
+        """
+        Return `queryset` fetching only the fields read by the serializer, as
+        set by `projection`. Querysets that already use `only()`, `defer()` or
+        `values()` are left as they are.
+        """
+        if self.projection is None or not hasattr(queryset, "only"):
+            return queryset
+        if queryset._fields is not None or queryset.query.deferred_loading[0]:
+            return queryset
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        fields = self.get_projection(queryset.model, view, ordering)
+        if fields is None:
+            return queryset
+        if self.projection == "values" and not any(
+            field.is_relation for field in fields.values()
+        ):
+            return queryset.values(*fields)
+        # Related fields need instances to be serialized.
+        return queryset.only(*fields)
+
+    def instrument(self, phase, count_queries=True):
+        """
+        Return a context manager timing `phase` of the current request if it
+        is instrumented, and doing nothing otherwise.
+        """
+        recorder = getattr(self, "_recorder", None)
+        if recorder is None:
+            return NULL_PHASE
+        return recorder.phase(phase, count_queries)
+
+    def instrumented(self, phase, func, *args):
+        """Call `func(*args)` as part of `phase`."""
+        with self.instrument(phase):
+            return func(*args)
+
+    async def ainstrumented(self, phase, awaitable):
+        """
+        Await `awaitable` as part of `phase`. Its queries aren't counted,
+        since they run on other threads.
+        """
+        with self.instrument(phase, count_queries=False):
+            return await awaitable
+
+    def get_link_builder(self):
+        """
+        Return a `LinkBuilder` for the current request, so that its URL is
+        only built and parsed once however many links are rendered from it.
+        """
+        if getattr(self, "_link_builder_request", None) is not self.request:
+            self._link_builder = self.link_builder_class(
+                self.request.build_absolute_uri()
+            )
+            self._link_builder_request = self.request
+        return self._link_builder
+
     def get_headers(self):
-        """Prepare and return link headers."""
+        """
+        Prepare and return link headers, and report the timings of the
+        request if it is instrumented.
+        """
         links = []
-        for label, method_name in (
-            ("prev", "get_previous_link"),
-            ("next", "get_next_link"),
-            ("first", "get_first_link"),
-            ("last", "get_last_link"),
-        ):
-            try:
-                method = getattr(self, method_name)
-            except AttributeError:
-                continue
-            links.append((method(), label))
+        with self.instrument("links"):
+            for label, method_name in (
+                ("prev", "get_previous_link"),
+                ("next", "get_next_link"),
+                ("first", "get_first_link"),
+                ("last", "get_last_link"),
+            ):
+                try:
+                    method = getattr(self, method_name)
+                except AttributeError:
+                    continue
+                links.append((method(), label))
+            links.extend((url, "shard") for url in self.get_shard_links())
 
         header_links = []
         for url, label in links:
             if url is not None:
                 header_links.append('<{}>; rel="{}"'.format(url, label))
 
-        return {"Link": ", ".join(header_links)} if header_links else {}
+        headers = {"Link": ", ".join(header_links)} if header_links else {}
+        headers.update(self.get_count_headers())
+        recorder = getattr(self, "_recorder", None)
+        if recorder is not None:
+            self._recorder = None
+            if recorder.instrumentation.server_timing:
+                headers["Server-Timing"] = recorder.get_server_timing()
+            recorder.finish(self)
+        return headers
+
+    def get_count_headers(self):
+        """Return the headers about the number of rows, if any."""
+        return {}
+
+    def get_shard_links(self):
+        """
+        Return the links to the first pages of disjoint parts of the results
+        that can be crawled in parallel, if the client asked for them.
+        """
+        return []
+
+    def get_shard_count(self, request):
+        if not self.shard_query_param:
+            return None
+        try:
+            return _positive_int(
+                request.query_params[self.shard_query_param],
+                strict=True,
+                cutoff=self.max_shards,
+            )
+        except (KeyError, ValueError):
+            return None
+
+    def get_paginated_response(self, data, headers=None):
+        """
+        Return the response for `data`, with `headers` if they were already
+        built by `get_headers()`.
+        """
+        try:
+            if headers is None:
+                headers = self.get_headers()
+            response = Response(data, headers=headers)
+        except BaseException:
+            self.finish_query_guard(report=False)
+            raise
+        self.finish_query_guard()
+        return response
+
+    def get_streaming_response(self, page, serialize):
+        """
+        Return a `StreamingHttpResponse` with the Link header that streams
+        `page` as a JSON array, so memory use doesn't grow with the page size.
+
+        `page` is usually the unevaluated queryset returned by
+        `stream_queryset()`, which is read with `iterator()`. `serialize` is
+        called with lists of up to `stream_chunk_size` rows and returns the
+        data to render for them, e.g. `serializer_class(rows, many=True).data`.
+        The `query_guard` counts the queries made until the page has been
+        streamed.
+        """
+        try:
+            headers = self.get_headers()
+        except BaseException:
+            self.finish_query_guard(report=False)
+            raise
+        response = StreamingHttpResponse(
+            self.stream_json(page, serialize), content_type="application/json"
+        )
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def stream_json(self, page, serialize):
+        encode = JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        separator = "["
+        try:
+            if hasattr(page, "iterator"):
+                rows = page.iterator(chunk_size=self.stream_chunk_size)
+            else:
+                rows = iter(page)
+
+            while True:
+                chunk = list(islice(rows, self.stream_chunk_size))
+                if not chunk:
+                    break
+                yield separator + ",".join(encode(item) for item in serialize(chunk))
+                separator = ","
+        except BaseException:
+            # Including `GeneratorExit`, when the client goes away.
+            self.finish_query_guard(report=False)
+            raise
+        self.finish_query_guard()
+        yield "[]" if separator == "[" else "]"
+
+
+class LinkHeaderKeysetPagination(LinkHeaderMixin, BasePagination):
+    """
+    Keyset ("seek") pagination with first, prev, next and last links.
+
+    Pages are selected with an `after` or `before` query parameter holding the
+    ordering key of the row the page starts after or ends before, so a page
+    costs the same however deep it is. The `ordering` must be unique and not
+    null; composite keys are written as comma-separated values.
+
+    The last link is found by seeking backwards from the end of the ordering
+    rather than by counting.
+    """
+
+    page_size = api_settings.PAGE_SIZE
 
-    def get_paginated_response(self, data):
-        return Response(data, headers=self.get_headers())
+    # Client can control the page size using this query parameter.
+    # Default is 'None'. Set to eg 'page_size' to enable usage.
+    page_size_query_param = None
+
+    # Set to an integer to limit the maximum page size the client may request.
+    # Only relevant if 'page_size_query_param' has also been set.
+    max_page_size = None
+
+    # The unique ordering of the queryset, e.g. "pk" or ("-created", "pk").
+    ordering = "pk"
+
+    after_query_param = "after"
+    before_query_param = "before"
+    invalid_key_message = _("Invalid key.")
+
+    # Set to eg 'shards' to let clients ask for that many `rel="shard"` links,
+    # which split the results into ranges of keys ending at the `until` key.
+    shard_query_param = None
+    max_shards = 16
+    until_query_param = "until"
+
+    # How long the keys splitting the results into shards are cached.
+    shard_cache_timeout = 300
+
+    @routed
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.start_instrumentation(request, queryset)
+        self.start_query_guard(request, queryset, view)
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.set_queryset(queryset)
+        self.queryset = self.project_queryset(self.queryset, view, self.ordering)
+        with self.instrument("cursor"):
+            after = self.decode_key(request.query_params.get(self.after_query_param))
+            before = self.decode_key(request.query_params.get(self.before_query_param))
+            until = self.get_until(request)
+        if until is not None:
+            self.queryset = self.queryset.filter(~self.get_seek_filter(until))
+
+        if after is None and before is not None:
+            queryset = self.queryset.order_by(*self.get_reversed_ordering())
+            with self.instrument("page"):
+                results = list(
+                    queryset.filter(self.get_seek_filter(before, reverse=True))[
+                        :self.page_size + 1
+                    ]
+                )
+            self.has_previous = len(results) > self.page_size
+            self.has_next = True
+            results = results[:self.page_size][::-1]
+        else:
+            queryset = self.queryset
+            if after is not None:
+                queryset = queryset.filter(self.get_seek_filter(after))
+            with self.instrument("page"):
+                results = list(queryset[:self.page_size + 1])
+            self.has_previous = after is not None
+            self.has_next = len(results) > self.page_size
+            results = results[:self.page_size]
+
+        self.page = results
+        return results
+
+    def set_queryset(self, queryset):
+        self.ordering = self.get_ordering()
+        self.queryset = queryset.order_by(*self.ordering)
+        # The rows found for the links of the previous page.
+        self.__dict__.pop("last_page_start", None)
+        self.__dict__.pop("shard_boundaries", None)
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+
+        return self.page_size
+
+    def get_ordering(self):
+        if isinstance(self.ordering, str):
+            return (self.ordering,)
+        return tuple(self.ordering)
+
+    def get_reversed_ordering(self):
+        return tuple(
+            field[1:] if field.startswith("-") else "-" + field
+            for field in self.ordering
+        )
+
+    def get_seek_filter(self, key, reverse=False):
+        """
+        Return a filter for the rows that come after `key` in the ordering,
+        or before it if `reverse` is set.
+        """
+        return seek_filter(self.ordering, key, reverse)
+
+    def decode_key(self, encoded):
+        if encoded is None:
+            return None
+
+        values = [parse.unquote(value) for value in encoded.split(",")]
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_key_message)
+
+        opts = self.queryset.model._meta
+        key = []
+        for field, value in zip(self.ordering, values):
+            field = field.lstrip("-")
+            if field == "pk":
+                model_field = opts.pk
+            elif "__" in field:
+                key.append(value)
+                continue
+            else:
+                model_field = opts.get_field(field)
+            try:
+                key.append(model_field.to_python(value))
+            except ValidationError:
+                raise NotFound(self.invalid_key_message)
+        return key
+
+    def get_until(self, request):
+        """
+        Return the key the current shard ends at, if any. `until` is only
+        read when shards are enabled, so it can be a filter otherwise.
+        """
+        if not self.shard_query_param:
+            return None
+        return self.decode_key(request.query_params.get(self.until_query_param))
+
+    def encode_key(self, instance):
+        values = []
+        for field in self.ordering:
+            value = get_field_value(instance, field.lstrip("-"))
+            values.append(str(value).replace("%", "%25").replace(",", "%2C"))
+        return ",".join(values)
+
+    def get_key_query_params(self):
+        return (self.after_query_param, self.before_query_param)
+
+    def get_key_link(self, query_param, instance):
+        template = self.get_link_builder().template(
+            query_param, remove=self.get_key_query_params()
+        )
+        return template.render(self.encode_key(instance))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+
+        return self.get_key_link(self.after_query_param, self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.get_key_link(self.before_query_param, self.page[0])
+
+    def get_first_link(self):
+        if not self.has_previous:
+            return None
+
+        return self.get_link_builder().build(remove=self.get_key_query_params())
+
+    def get_last_link(self):
+        if not self.has_next:
+            return None
+
+        instance = self.last_page_start
+        if instance is None:
+            return self.get_link_builder().build(remove=self.get_key_query_params())
+        return self.get_key_link(self.after_query_param, instance)
+
+    @cached_property
+    def last_page_start(self):
+        """`get_last_page_start()`, queried once per page."""
+        return self.get_last_page_start()
+
+    @cached_property
+    def shard_boundaries(self):
+        """`get_shard_boundaries()` for the requested shards, once per page."""
+        return self.get_shard_boundaries(self.get_shard_count(self.request))
+
+    def prepare_links(self):
+        """
+        Run the queries the links need, so that `get_headers()` runs none:
+        async code calls this in a thread.
+        """
+        self.get_last_link()
+        self.get_shard_links()
+
+    def get_last_page_start(self):
+        """
+        Return the row that the last page starts after, or `None` if the last
+        page is the first one.
+        """
+        # The last page is made of the last `page_size` rows, so it starts
+        # after the row that many rows from the end.
+        queryset = self.queryset.order_by(*self.get_reversed_ordering())
+        results = list(queryset[self.page_size:self.page_size + 1])
+        return results[0] if results else None
+
+    def get_shard_links(self, replace=None, remove=()):
+        shards = self.get_shard_count(self.request)
+        if not shards:
+            return []
+
+        boundaries = self.shard_boundaries
+        builder = self.get_link_builder()
+        remove = tuple(remove) + (self.before_query_param, self.shard_query_param)
+        links = []
+        for after, until in zip([None] + boundaries, boundaries + [None]):
+            shard_replace = dict(replace or {})
+            if after is None:
+                shard_remove = remove + (self.after_query_param,)
+            else:
+                shard_remove = remove
+                shard_replace[self.after_query_param] = after
+            # The last shard ends where the results do.
+            if until is not None:
+                shard_replace[self.until_query_param] = until
+            links.append(builder.build(shard_replace, remove=shard_remove))
+        return links
+
+    def get_shard_boundaries(self, shards):
+        """
+        Return the encoded keys of the rows that end each shard but the last,
+        splitting the results into `shards` parts of about the same size.
+        """
+        if shards < 2:
+            return []
+        try:
+            sql, params = self.queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return []
+        digest = hashlib.sha1(
+            repr((self.queryset.db, sql, params, shards)).encode()
+        ).hexdigest()
+        key = "drf_link_header_pagination.shards:{}".format(digest)
+        cache = caches[get_cache_alias()]
+        boundaries = cache.get(key)
+        if boundaries is not None:
+            return boundaries
+
+        rows = self.queryset.values(*(field.lstrip("-") for field in self.ordering))
+        if connections[rows.db].features.supports_over_clause:
+            rows = rows.filter(pk__in=self.get_shard_ends(shards))
+        else:
+            rows = self.scan_shard_ends(rows, shards)
+        boundaries = []
+        for row in rows:
+            if not boundaries or boundaries[-1] != self.encode_key(row):
+                boundaries.append(self.encode_key(row))
+        cache.set(key, boundaries, self.shard_cache_timeout)
+        return boundaries
+
+    def get_shard_ends(self, shards):
+        """
+        Return a subquery of the primary keys of the rows ending each shard
+        but the last, numbered and counted by the database in one query: row
+        `count * shard // shards` ends `shard`.
+        """
+        connection = connections[self.queryset.db]
+        quote_name = connection.ops.quote_name
+        numbered = self.queryset.order_by().annotate(
+            shard_row=Window(
+                RowNumber(),
+                order_by=[
+                    F(field[1:]).desc() if field.startswith("-") else F(field).asc()
+                    for field in self.ordering
+                ],
+            ),
+            shard_total=Window(Count("pk")),
+        ).values("shard_row", "shard_total", shard_pk=F("pk"))
+        sql, params = numbered.query.sql_with_params()
+        # Without division, whose rounding differs between databases.
+        row, total = quote_name("shard_row"), quote_name("shard_total")
+        ends = " OR ".join(
+            "({row} * %s <= {total} * %s AND {total} * %s < ({row} + 1) * %s)".format(
+                row=row, total=total
+            )
+            for shard in range(1, shards)
+        )
+        return RawSQL(
+            "SELECT {} FROM ({}) {} WHERE {}".format(
+                quote_name("shard_pk"), sql, quote_name("shards"), ends
+            ),
+            params
+            + tuple(
+                param
+                for shard in range(1, shards)
+                for param in (shards, shard, shard, shards)
+            ),
+        )
+
+    def scan_shard_ends(self, rows, shards):
+        """
+        Return the rows ending each shard but the last, reading every key,
+        for databases without window functions.
+        """
+        count = rows.count()
+        ends = {count * shard // shards for shard in range(1, shards)}
+        for position, row in enumerate(rows.iterator(), 1):
+            if position in ends:
+                yield row
+            if position >= max(ends):
+                break
+
+    def get_paginated_response_schema(self, schema):
+        return schema
+
+    def get_schema_operation_parameters(self, view):
+        parameters = [
+            {
+                "name": query_param,
+                "required": False,
+                "in": "query",
+                "description": str(description),
+                "schema": {"type": "string"},
+            }
+            for query_param, description in (
+                (self.after_query_param, _("Return the rows after this key.")),
+                (self.before_query_param, _("Return the rows before this key.")),
+            )
+        ]
+        if self.page_size_query_param is not None:
+            parameters.append(
+                {
+                    "name": self.page_size_query_param,
+                    "required": False,
+                    "in": "query",
+                    "description": str(_("Number of results to return per page.")),
+                    "schema": {"type": "integer"},
+                }
+            )
+        return parameters
 
 
 class LinkHeaderLimitOffsetPagination(LinkHeaderMixin, LimitOffsetPagination):
     """
     Link header pagination with offset/limit links. Implements the regular
     `LimitOffsetPagination` module with `Link: ` headers instead.
+
+    The total used for the last link comes from `count_strategy`. If it
+    returns `None`, a `LowerBound` or an `Estimate`, one extra row is fetched
+    instead to find out whether there is a next page and `count` is only a
+    lower bound. There is then no last link, except for an `Estimate`, which
+    the last link is built from.
+    Set `count_executor` to a `CountExecutor` to count while the page is
+    fetched.
+
+    With `deferred_join` set, a page of a queryset is fetched by paging over
+    its primary keys first and then loading only the rows with those keys,
+    so the database doesn't read full rows just to skip them.
+
+    With `max_offset` set, larger offsets are refused. Links that would go
+    past it use the `after` key of `keyset_pagination_class` instead, ordered
+    by `keyset_ordering`, which should match the ordering of the queryset.
     """
-    def get_first_link(self):
-        url = self.request.build_absolute_uri()
-        url = replace_query_param(url, self.limit_query_param, self.limit)
+    count_strategy = ExactCount()
+    count_executor = None
+    deferred_join = False
+    max_offset = None
+    max_offset_message = _("Offset too large; follow the pagination links instead.")
+    keyset_pagination_class = LinkHeaderKeysetPagination
+    keyset_ordering = "pk"
+
+    # Set to eg 'shards' to let clients ask for that many `rel="shard"` links,
+    # which split the results into ranges of offsets ending at `until`.
+    shard_query_param = None
+    max_shards = 16
+    until_query_param = "until"
+
+    @routed
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.start_page(queryset, request, view)
+        if queryset is None:
+            return None
+        if self.paginated_by_key:
+            return self.keyset_pagination.paginate_queryset(queryset, request, view)
+
+        if self.count_executor is not None:
+            self.count, results = self.count_executor.gather(
+                lambda: self.instrumented("count", self.get_count, queryset),
+                lambda: self.instrumented(
+                    "page",
+                    self.get_results,
+                    queryset,
+                    self.offset,
+                    self.offset + self.limit + 1,
+                ),
+                using=getattr(queryset, "db", None),
+            )
+            self.set_count_kind()
+            if self.count_is_exact and (self.count == 0 or self.offset > self.count):
+                results = []
+            return self.set_results(results)
+
+        with self.instrument("count"):
+            self.count = self.get_count(queryset)
+        self.set_count_kind()
+        if self.count_is_exact and (self.count == 0 or self.offset > self.count):
+            return self.set_results([])
+        stop = self.offset + self.limit + (0 if self.count_is_exact else 1)
+        with self.instrument("page"):
+            results = self.get_results(queryset, self.offset, stop)
+        return self.set_results(results)
+
+    @routed
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async `paginate_queryset()`. The count and the page are fetched
+        concurrently, so one extra row is always fetched. The queries of the
+        links (past `max_offset`, and of shards) are run before returning,
+        so that `get_paginated_response()` runs none.
+        """
+        self.check_async()
+        queryset = self.start_page(queryset, request, view)
+        if queryset is None:
+            return None
+        if self.paginated_by_key:
+            results = await sync_to_async(self.keyset_pagination.paginate_queryset)(
+                queryset, request, view
+            )
+        else:
+            self.count, results = await asyncio.gather(
+                self.ainstrumented(
+                    "count", acount(self.count_strategy, queryset, self.count_executor)
+                ),
+                self.ainstrumented(
+                    "page",
+                    self.aget_results(
+                        queryset, self.offset, self.offset + self.limit + 1
+                    ),
+                ),
+            )
+            self.set_count_kind()
+            if self.count_is_exact and (self.count == 0 or self.offset > self.count):
+                results = []
+            results = self.set_results(results)
+        if self.keyset_pagination is not None:
+            await self.ainstrumented("links", sync_to_async(self.prepare_links)())
+        return results
+
+    def stream_queryset(self, queryset, request, view=None):
+        """
+        Like `paginate_queryset()`, but return the page as an unevaluated
+        slice of `queryset`, for `get_streaming_response()`. Without an exact
+        count, whether there is a next page is found with an `exists()` query
+        on the row after the page. The page isn't fetched until it is
+        streamed, so there is no page query for a `count_executor` to count
+        alongside.
+        """
+        queryset = self.start_page(queryset, request, view)
+        if queryset is None:
+            return None
+        if self.paginated_by_key:
+            return self.keyset_pagination.paginate_queryset(queryset, request, view)
+
+        with self.instrument("count"):
+            self.count = self.get_count(queryset)
+        self.set_count_kind()
+        stop = self.offset + self.limit
+        if self.until is not None:
+            stop = max(min(stop, self.until), self.offset)
+        if not self.count_is_exact:
+            # Only a lower bound: the row after the page says whether there's more.
+            following = queryset[stop:stop + 1]
+            with self.instrument("page"):
+                if hasattr(following, "exists"):
+                    has_next = following.exists()
+                else:
+                    has_next = bool(len(following))
+            count = stop + 1 if has_next else stop
+            if self.count_is_capped:
+                count = max(self.count, count)
+            self.count = int(count)
+
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        self.results = queryset[self.offset:stop]
+        return self.results
+
+    def start_page(self, queryset, request, view=None):
+        """
+        The start of `paginate_queryset()`, `apaginate_queryset()` and
+        `stream_queryset()`: read the limit, the offset and `until`, or
+        switch to the `keyset_pagination` (`paginated_by_key`) for requests
+        with a key. Return the queryset to paginate, or `None` if the request
+        isn't paginated.
+        """
+        self.request = request
+        self.start_instrumentation(request, queryset)
+        self.start_query_guard(request, queryset, view)
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        queryset = self.project_queryset(queryset, view, self.get_key_ordering())
+
+        self.keyset_pagination = None
+        self.paginated_by_key = False
+        if self.max_offset is not None:
+            self.keyset_pagination = self.get_keyset_pagination(queryset)
+            if self.is_paginated_by_key(request):
+                self.paginated_by_key = True
+                return queryset
+
+        self.offset = self.get_offset(request)
+        if self.max_offset is not None and self.offset > self.max_offset:
+            raise NotFound(self.max_offset_message)
+        self.until = self.get_until(request)
+        return queryset
+
+    def set_count_kind(self):
+        self.count_is_capped = isinstance(self.count, LowerBound)
+        self.estimate = self.count if isinstance(self.count, Estimate) else None
+        self.count_is_exact = (
+            self.count is not None
+            and not self.count_is_capped
+            and self.estimate is None
+        )
+
+    def set_results(self, results):
+        if not self.count_is_exact:
+            # Only a lower bound: the extra row says whether there's more.
+            count = self.offset + len(results)
+            if self.count_is_capped:
+                # So is the capped count (and it's the only one on an empty page).
+                count = max(self.count, count) if results else self.count
+            self.count = int(count)
+        results = results[:self.limit]
+        if self.until is not None:
+            results = results[:max(self.until - self.offset, 0)]
+
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        self.results = results
+        return results
+
+    def get_results(self, queryset, start, stop):
+        """Return the rows of `queryset[start:stop]` as a list."""
+        if not self.deferred_join or not hasattr(queryset, "values_list"):
+            return list(queryset[start:stop])
+        if queryset.query.values_select:
+            return list(queryset[start:stop])
+
+        pks = list(queryset.values_list("pk", flat=True)[start:stop])
+        instances = {
+            instance.pk: instance
+            for instance in queryset.order_by().filter(pk__in=pks)
+        }
+        return [instances[pk] for pk in pks if pk in instances]
+
+    async def aget_results(self, queryset, start, stop):
+        """Async `get_results()`."""
+        if not self.deferred_join or not hasattr(queryset, "values_list"):
+            return await alist(queryset[start:stop])
+        if queryset.query.values_select:
+            return await alist(queryset[start:stop])
+
+        pks = await alist(queryset.values_list("pk", flat=True)[start:stop])
+        instances = {
+            instance.pk: instance
+            for instance in await alist(queryset.order_by().filter(pk__in=pks))
+        }
+        return [instances[pk] for pk in pks if pk in instances]
+
+    def is_paginated_by_key(self, request):
+        params = self.keyset_pagination.get_key_query_params()
+        if self.shard_query_param:
+            # Key shards may only have an end.
+            params += (self.until_query_param,)
+        return any(param in request.query_params for param in params)
+
+    def get_key_ordering(self):
+        """Return the ordering whose values rows are seeked by, if any."""
+        if self.max_offset is None:
+            return ()
+        return self.keyset_ordering
+
+    def prepare_links(self):
+        """
+        Run the queries the links need, so that `get_headers()` runs none:
+        async code calls this in a thread.
+        """
+        self.get_last_link()
+        self.get_shard_links()
 
-        return remove_query_param(url, self.offset_query_param)
+    def get_keyset_pagination(self, queryset):
+        pagination = self.keyset_pagination_class()
+        pagination.page_size = self.limit
+        pagination.ordering = self.keyset_ordering
+        pagination.set_queryset(queryset)
+        pagination.request = self.request
+        pagination.shard_query_param = self.shard_query_param
+        pagination.max_shards = self.max_shards
+        pagination.until_query_param = self.until_query_param
+        # Keyset pages are recorded as part of this request.
+        pagination._recorder = getattr(self, "_recorder", None)
+        return pagination
+
+    def get_keyset_link(self, instance):
+        return self.get_link_builder().build(
+            {
+                self.limit_query_param: self.limit,
+                self.keyset_pagination.after_query_param: (
+                    self.keyset_pagination.encode_key(instance)
+                ),
+            },
+            remove=(self.offset_query_param, self.until_query_param),
+        )
+
+    def get_until(self, request):
+        """
+        Return the offset the current shard ends at, if any. `until` is only
+        read when shards are enabled, so it can be a filter otherwise.
+        """
+        if not self.shard_query_param:
+            return None
+        try:
+            return _positive_int(request.query_params[self.until_query_param])
+        except (KeyError, ValueError):
+            return None
+
+    def get_count(self, queryset):
+        return self.count_strategy(queryset)
+
+    def get_offset_link(self, offset):
+        builder = self.get_link_builder()
+        if offset <= 0:
+            return builder.build(
+                {self.limit_query_param: self.limit},
+                remove=(self.offset_query_param,),
+            )
+        template = builder.template(
+            self.offset_query_param, {self.limit_query_param: self.limit}
+        )
+        return template.render(offset)
+
+    def get_next_link(self):
+        if self.paginated_by_key:
+            return self.keyset_pagination.get_next_link()
+        if self.offset + self.limit >= self.count:
+            return None
+        if self.until is not None and self.offset + self.limit >= self.until:
+            return None
+
+        offset = self.offset + self.limit
+        if self.max_offset is not None and offset > self.max_offset:
+            instance = self.get_last_result()
+            if instance is None:
+                # The page came back short, e.g. because the count is stale.
+                return None
+            return self.get_keyset_link(instance)
+        return self.get_offset_link(offset)
+
+    def get_last_result(self):
+        """Return the last row of the page if it's full, or `None`."""
+        if hasattr(self.results, "query"):
+            # An unevaluated page from `stream_queryset()`.
+            rows = list(self.results[self.limit - 1:self.limit])
+            return rows[0] if rows else None
+        if len(self.results) < self.limit:
+            return None
+        return self.results[-1]
+
+    def get_previous_link(self):
+        if self.paginated_by_key:
+            return self.keyset_pagination.get_previous_link()
+        if self.offset <= 0:
+            return None
+
+        return self.get_offset_link(self.offset - self.limit)
+
+    def get_first_link(self):
+        if self.paginated_by_key:
+            return self.keyset_pagination.get_first_link()
+        return self.get_offset_link(0)
 
     def get_last_link(self):
-        if not self.get_next_link():
+        if self.paginated_by_key:
+            return self.keyset_pagination.get_last_link()
+        if self.offset + self.limit >= self.count:
+            return None
+        if self.until is not None:
+            # Shards are crawled with their next links only.
+            return None
+        if self.count_is_exact:
+            count = self.count
+        elif self.estimate is not None:
+            # The rows fetched for the page may already show there are more.
+            count = max(self.estimate, self.count)
+        else:
             return None
 
         # We need to adjust for 0 offset, otherwise we'll get the last link
         # to an empty page if count % limit == 0 (i.e. the "pages" line up
         # exactly)
-        offset = max(0, self.count - ((self.count - 1) % self.limit) - 1)
+        offset = max(0, count - ((count - 1) % self.limit) - 1)
 
-        url = self.request.build_absolute_uri()
-        url = replace_query_param(url, self.limit_query_param, self.limit)
+        if self.max_offset is not None and offset > self.max_offset:
+            instance = self.keyset_pagination.last_page_start
+            if instance is not None:
+                return self.get_keyset_link(instance)
+
+        return self.get_link_builder().build(
+            {self.limit_query_param: self.limit, self.offset_query_param: offset}
+        )
 
-        return replace_query_param(url, self.offset_query_param, offset)
+    def get_shard_links(self):
+        if self.paginated_by_key or self.max_offset is not None:
+            # Offsets past `max_offset` can't be fetched, so split by keys.
+            return self.keyset_pagination.get_shard_links(
+                replace={self.limit_query_param: self.limit},
+                remove=(self.offset_query_param,),
+            )
+
+        shards = self.get_shard_count(self.request)
+        if not shards or not self.count_is_exact:
+            return []
+
+        builder = self.get_link_builder()
+        starts = sorted({self.count * shard // shards for shard in range(shards)})
+        links = []
+        for start, stop in zip(starts, starts[1:] + [None]):
+            replace = {self.limit_query_param: self.limit}
+            remove = [self.shard_query_param]
+            if start:
+                replace[self.offset_query_param] = start
+            else:
+                remove.append(self.offset_query_param)
+            if stop is not None:
+                replace[self.until_query_param] = stop
+            links.append(builder.build(replace, remove=remove))
+        return links
+
+    def get_count_headers(self):
+        if self.paginated_by_key or not self.count_is_capped:
+            return {}
+        return {self.count_lower_bound_header: str(self.count)}
 
     def get_paginated_response_schema(self, schema):
         return schema
@@ -70,31 +1198,388 @@ class LinkHeaderPagination(LinkHeaderMixin, PageNumberPagination):
     """Inform the user of pagination links via response headers, similar to
     what's described in
     https://developer.github.com/guides/traversing-with-pagination/.
+
+    The total used for the last link comes from `count_strategy`; see
+    `CountStrategyPaginator` for what happens when it returns `None`, a
+    `LowerBound` or an `Estimate`. A `django_paginator_class` that isn't a
+    `CountStrategyPaginator` always counts exactly, as with
+    `PageNumberPagination`. Set
+    `count_executor` to a `CountExecutor` to count while the page is fetched,
+    or `lazy_count` to only count when the page isn't the last one. With a
+    `PageIndex` as `page_index`, pages are found by seeking instead, and the
+    count comes from the index.
     """
+    django_paginator_class = CountStrategyPaginator
+    count_strategy = ExactCount()
+    count_executor = None
+    lazy_count = False
+    page_index = None
 
-    def get_first_link(self):
+    @routed
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.start_instrumentation(request, queryset)
+        self.start_query_guard(request, queryset, view)
+        queryset = self.project_queryset(queryset, view)
+        self.page = self.get_page(queryset, request)
+        if self.page is None:
+            return None
+        with self.instrument("page"):
+            return list(self.page)
+
+    def stream_queryset(self, queryset, request, view=None):
+        """
+        Like `paginate_queryset()`, but return the page as an unevaluated
+        slice of `queryset`, for `get_streaming_response()`. See
+        `CountStrategyPaginator.lazy_page()`.
+        """
+        self.request = request
+        self.start_instrumentation(request, queryset)
+        self.start_query_guard(request, queryset, view)
+        queryset = self.project_queryset(queryset, view)
+        self.page = self.get_page(queryset, request, lazy=True)
+        if self.page is None:
+            return None
+        return self.page.object_list
+
+    def get_page(self, queryset, request, lazy=False):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        if self.page_index is not None and hasattr(queryset, "query"):
+            return self.get_indexed_page(queryset, request, page_size, lazy)
+
+        paginator = self.get_paginator(queryset, page_size)
+        counts_strategy = isinstance(paginator, CountStrategyPaginator)
+        if not counts_strategy or (self.count_executor is None and not self.lazy_count):
+            # Counted by `page()` anyway; with an executor or a lazy count,
+            # the count is part of the page phase.
+            with self.instrument("count"):
+                paginator.count
+        page_number = self.get_page_number(request, paginator)
+        try:
+            with self.instrument("page"):
+                if lazy and counts_strategy:
+                    page = paginator.lazy_page(page_number)
+                else:
+                    # A plain `Paginator` leaves the page's rows unevaluated.
+                    page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return page
+
+    def get_paginator(self, queryset, page_size):
+        if not issubclass(self.django_paginator_class, CountStrategyPaginator):
+            return self.django_paginator_class(queryset, page_size)
+        return self.django_paginator_class(
+            queryset,
+            page_size,
+            count_strategy=self.count_strategy,
+            count_executor=self.count_executor,
+            lazy_count=self.lazy_count,
+        )
+
+    def get_indexed_page(self, queryset, request, page_size, lazy=False):
+        """Return the page for `request` found with the `page_index`."""
+        with self.instrument("count"):
+            boundaries = self.page_index.get(queryset, page_size)
+        paginator = self.get_paginator(queryset, page_size)
+        # The count of the index is exact, as far as the index goes.
+        paginator.count = boundaries.count
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        object_list = boundaries.get_page_queryset(number)
+        if not lazy:
+            with self.instrument("page"):
+                object_list = list(object_list)
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return paginator._get_page(object_list, number, paginator)
+
+    @routed
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Async `paginate_queryset()`. The count and the page are fetched
+        concurrently unless the last page is requested. Pages of a plain
+        `Paginator` and of the `page_index` are found in a thread.
+        """
+        self.check_async()
+        self.request = request
+        self.start_instrumentation(request, queryset)
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        queryset = self.project_queryset(queryset, view)
+
+        paginator = self.get_paginator(queryset, page_size)
+        if self.page_index is not None or not isinstance(
+            paginator, CountStrategyPaginator
+        ):
+            # Plain `Paginator`s have no async methods, and indexes are kept
+            # with sync queries.
+            self.page = await sync_to_async(self.get_page)(queryset, request, lazy=True)
+            return await self.ainstrumented("page", alist(self.page.object_list))
+        page_number = request.query_params.get(self.page_query_param) or 1
+        if page_number in self.last_page_strings:
+            page_number = await self.ainstrumented("count", paginator.anum_pages())
+        try:
+            self.page = await self.ainstrumented("page", paginator.apage(page_number))
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_page_link(self, page_number):
+        builder = self.get_link_builder()
+        if page_number == 1:
+            return builder.build(remove=(self.page_query_param,))
+        return builder.template(self.page_query_param).render(page_number)
+
+    def get_next_link(self):
+        if not self.page.has_next():
+            return None
+
+        return self.get_page_link(self.page.next_page_number())
+
+    def get_previous_link(self):
         if not self.page.has_previous():
             return None
 
-        url = self.request.build_absolute_uri()
+        return self.get_page_link(self.page.previous_page_number())
 
-        return remove_query_param(url, self.page_query_param)
+    def get_first_link(self):
+        if not self.page.has_previous():
+            return None
+
+        return self.get_page_link(1)
 
     def get_last_link(self):
         if not self.page.has_next():
             return None
 
-        url = self.request.build_absolute_uri()
+        paginator = self.page.paginator
+        if not isinstance(paginator, CountStrategyPaginator):
+            return self.get_page_link(paginator.num_pages)
+        page_number = paginator.get_last_page_number()
+        if page_number is None:
+            return None
+        return self.get_page_link(page_number)
 
-        return replace_query_param(
-            url, self.page_query_param, self.page.paginator.num_pages
-        )
+    def get_count_headers(self):
+        if not getattr(self.page.paginator, "count_is_capped", False):
+            return {}
+        return {self.count_lower_bound_header: str(self.page.paginator.count)}
 
     def get_paginated_response_schema(self, schema):
         return schema
 
 
-class LinkHeaderCursorPagination(LinkHeaderMixin, CursorPagination):
+class LinkHeaderCursorMixin(LinkHeaderMixin):
+    # A codec such as `SignedCursorCodec()` to use instead of DRF's cursor
+    # encoding. Its positions hold every ordering field, which must be unique
+    # together.
+    cursor_codec = None
+
+    # A `TotalCounter` to send the total count from, in `total_count_header`,
+    # once it has counted the queryset.
+    total_counter = None
+    total_count_header = "X-Total-Count"
+
+    @routed
+    def paginate_queryset(self, queryset, request, view=None):
+        self.start_query_guard(request, queryset, view)
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        with self.instrument("page"):
+            results = list(queryset)
+        return self.set_page(results)
+
+    @routed
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async `paginate_queryset()`."""
+        self.check_async()
+        queryset = self.get_page_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.set_page(await self.ainstrumented("page", alist(queryset)))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        The first half of `CursorPagination.paginate_queryset()`: return the
+        slice of `queryset` to fetch for the page, with one extra row.
+        """
+        self.request = request
+        self.start_instrumentation(request, queryset)
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.total_count = None
+        if self.total_counter is not None:
+            self.total_count = self.total_counter.get(queryset)
+        queryset = self.project_queryset(queryset, view, self.ordering)
+
+        with self.instrument("cursor"):
+            self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        # Cursor pagination always enforces an ordering.
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        # If we have a cursor with a fixed position then filter by that.
+        if isinstance(current_position, tuple):
+            queryset = queryset.filter(
+                seek_filter(self.ordering, current_position, self.cursor.reverse)
+            )
+        elif current_position is not None:
+            order = self.ordering[0]
+            is_reversed = order.startswith("-")
+            order_attr = order.lstrip("-")
+
+            # Test for: (cursor reversed) XOR (queryset reversed)
+            if self.cursor.reverse != is_reversed:
+                kwargs = {order_attr + "__lt": current_position}
+            else:
+                kwargs = {order_attr + "__gt": current_position}
+
+            queryset = queryset.filter(**kwargs)
+
+        # If we have an offset cursor then offset the entire page by that amount.
+        # We also always fetch an extra item in order to determine if there is a
+        # page following on from this one.
+        return queryset[offset:offset + self.page_size + 1]
+
+    def set_page(self, results):
+        """
+        The second half of `CursorPagination.paginate_queryset()`: set up the
+        page and its positions from the fetched rows.
+        """
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        self.page = list(results[:self.page_size])
+
+        # Determine the position of the final item following the page.
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(
+                results[-1], self.ordering
+            )
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            # If we have a reverse queryset, then the query ordering was in reverse
+            # so we need to reverse the items again before returning them to the user.
+            self.page = list(reversed(self.page))
+
+            # Determine next and previous positions for reverse cursors.
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            # Determine next and previous positions for forward cursors.
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        # Display page controls in the browsable API if there is more
+        # than one page.
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_count_headers(self):
+        if getattr(self, "total_count", None) is None:
+            return {}
+        return {self.total_count_header: str(self.total_count)}
+
+    def get_link_builder(self):
+        # `CursorPagination` keeps the request URL in `base_url` (and older
+        # DRF versions don't keep the request at all).
+        if getattr(self, "_link_builder_url", None) is not self.base_url:
+            self._link_builder = self.link_builder_class(self.base_url)
+            self._link_builder_url = self.base_url
+        return self._link_builder
+
+    def decode_cursor(self, request):
+        if self.cursor_codec is None:
+            return super().decode_cursor(request)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            return self.cursor_codec.decode(encoded)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        """
+        Given a Cursor instance, return an url with encoded cursor.
+        """
+        if self.cursor_codec is not None:
+            template = self.get_link_builder().template(self.cursor_query_param)
+            return template.render(self.cursor_codec.encode(cursor))
+
+        tokens = {}
+        if cursor.offset != 0:
+            tokens["o"] = str(cursor.offset)
+        if cursor.reverse:
+            tokens["r"] = "1"
+        if cursor.position is not None:
+            tokens["p"] = cursor.position
+
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return self.get_link_builder().template(self.cursor_query_param).render(
+            encoded
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        if self.cursor_codec is None:
+            return super()._get_position_from_instance(instance, ordering)
+        return tuple(get_field_value(instance, field.lstrip("-")) for field in ordering)
+
+
+class LinkHeaderCursorPagination(LinkHeaderCursorMixin, CursorPagination):
     """
     Customized cursor pagination with links provided via:
         - headers.
@@ -104,18 +1589,19 @@ class LinkHeaderCursorPagination(LinkHeaderMixin, CursorPagination):
         return schema
 
 
-class LinkHeaderLinkResponseCursorPagination(LinkHeaderMixin, CursorPagination):
+class LinkHeaderLinkResponseCursorPagination(LinkHeaderCursorMixin, CursorPagination):
     """
     Customized cursor pagination with links provided via:
         - content of the response
         - headers.
     """
 
-    def get_paginated_response(self, data):
+    def get_paginated_response(self, data, headers=None):
         return super().get_paginated_response(
             {
                 "next": self.get_next_link(),
                 "previous": self.get_previous_link(),
                 "results": data,
-            }
+            },
+            headers,
         )
@@ -0,0 +1,171 @@
+"""
+Pagination of several collections in one request.
+
+Each collection is paginated by its own pagination class from the query
+parameters prefixed with its name (e.g. `orders.page=2`), and the response
+body holds the page and the Link header of each one. The exact counts of the
+collections are fetched together, with one `UNION ALL` query per database.
+"""
+from functools import partial
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.http import QueryDict
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .counts import ExactCount, KnownCount
+from .links import PrefixedLinkBuilder
+
+__all__ = ["BatchListModelMixin", "Collection", "batch_count"]
+
+
+def batch_count(querysets):
+    """
+    Return the number of rows of each of `querysets`, counted with one query
+    per database.
+    """
+    counts = [None] * len(querysets)
+    queries = {}
+    for index, queryset in enumerate(querysets):
+        if queryset.query.can_filter():
+            # The ordering of a slice decides which rows are in it.
+            queryset = queryset.order_by()
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            counts[index] = 0
+            continue
+        queries.setdefault(queryset.db, []).append((index, sql, params))
+
+    for using, selects in queries.items():
+        connection = connections[using]
+        sql = " UNION ALL ".join(
+            "SELECT {}, COUNT(*) FROM ({}) {}".format(
+                index, sql, connection.ops.quote_name("subquery{}".format(index))
+            )
+            for index, sql, _ in selects
+        )
+        params = [param for _, _, params in selects for param in params]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            for index, count in cursor.fetchall():
+                counts[index] = count
+    return counts
+
+
+class SectionRequest:
+    """
+    The request as seen by the pagination of one collection: only the query
+    parameters starting with `prefix`, without it.
+    """
+
+    def __init__(self, request, prefix):
+        self._request = request
+        self.query_params = QueryDict(mutable=True)
+        for key, values in request.query_params.lists():
+            if key.startswith(prefix):
+                self.query_params.setlist(key[len(prefix):], values)
+
+    def __getattr__(self, name):
+        return getattr(self._request, name)
+
+
+class Collection:
+    """
+    A collection for `BatchListModelMixin.get_collections()`, paginated with
+    `pagination_class` (`DEFAULT_PAGINATION_CLASS` by default).
+    """
+
+    def __init__(self, queryset, serializer_class, pagination_class=None):
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+        if pagination_class is None:
+            pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+        self.pagination_class = pagination_class
+
+
+class BatchListModelMixin:
+    """
+    A view mixin that lists a page of each of the collections returned by
+    `get_collections()`, a dict of `Collection`s by name, in one response:
+
+        {"orders": {"link": "<...?orders.page=2>; rel=\"next\", ...",
+                    "results": [...]},
+         "users": {...}}
+
+    The query parameters of each collection are prefixed with its name and
+    `collection_separator`, and so are the parameters in its links, which
+    keep the parameters of the other collections. Collections paginated with
+    an `ExactCount` strategy and no `count_executor` are counted together.
+    The `query_guard` of a collection's pagination class checks the queries
+    of that collection, from paginating it to serializing it.
+    """
+
+    collection_separator = "."
+
+    def get_collections(self):
+        raise NotImplementedError("`get_collections()` must be implemented.")
+
+    def get_pagination(self, name, collection):
+        pagination = collection.pagination_class()
+        pagination.link_builder_class = partial(
+            PrefixedLinkBuilder, prefix=name + self.collection_separator
+        )
+        pagination.projection_serializer_class = collection.serializer_class
+        return pagination
+
+    def needs_count(self, pagination, queryset):
+        return (
+            type(getattr(pagination, "count_strategy", None)) is ExactCount
+            and getattr(pagination, "count_executor", None) is None
+            and hasattr(queryset, "query")
+        )
+
+    def list(self, request, *args, **kwargs):
+        collections = self.get_collections()
+        paginations = {
+            name: self.get_pagination(name, collection)
+            for name, collection in collections.items()
+        }
+
+        counted = [
+            name
+            for name, pagination in paginations.items()
+            if self.needs_count(pagination, collections[name].queryset)
+        ]
+        counts = batch_count([collections[name].queryset for name in counted])
+        for name, count in zip(counted, counts):
+            paginations[name].count_strategy = KnownCount(count)
+
+        data = {}
+        for name, collection in collections.items():
+            pagination = paginations[name]
+            section_request = SectionRequest(
+                request, name + self.collection_separator
+            )
+            try:
+                data[name] = self.get_section(
+                    collection, pagination, section_request
+                )
+            except BaseException:
+                pagination.finish_query_guard(report=False)
+                raise
+            # Each section is guarded on its own, serialization included.
+            pagination.finish_query_guard()
+        return Response(data)
+
+    def get_section(self, collection, pagination, request):
+        """Return the link and the serialized page of `collection`."""
+        page = pagination.paginate_queryset(collection.queryset, request, view=self)
+        context = self.get_serializer_context()
+        if page is None:
+            serializer = collection.serializer_class(
+                collection.queryset, many=True, context=context
+            )
+            return {"link": "", "results": serializer.data}
+        serializer = collection.serializer_class(page, many=True, context=context)
+        return {
+            "link": pagination.get_headers().get("Link", ""),
+            "results": serializer.data,
+        }
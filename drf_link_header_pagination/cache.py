@@ -0,0 +1,168 @@
+"""
+Caching of rendered pages, invalidated by per-model generation counters.
+
+A model's generation changes whenever one of its instances is saved or
+deleted (see `signals.py`), which changes the cache keys of every page that
+depends on it. Bulk operations that don't send `post_save`/`post_delete`,
+like `QuerySet.update()`, aren't noticed until the cached pages expire, and
+neither are changes made by processes that haven't read the generation of
+the model yet.
+"""
+import hashlib
+import io
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.core.handlers.wsgi import WSGIRequest
+
+from .links import LinkBuilder
+from .signals import watch
+
+__all__ = ["PageCache", "bump_generation", "get_generations"]
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY_PREFIX = "drf_link_header_pagination.generation"
+
+# Set in the environ of the requests that prefetch a page, so that they don't
+# prefetch the page after it in turn.
+PREFETCH_ENVIRON_KEY = "drf_link_header_pagination.prefetch"
+
+
+def get_cache_alias():
+    return getattr(settings, "LINK_HEADER_PAGINATION_CACHE", "default")
+
+
+def get_generation_key(model):
+    return "{}:{}".format(GENERATION_KEY_PREFIX, model._meta.label_lower)
+
+
+def get_generations(models):
+    """Return the current generation of each of `models`."""
+    for model in models:
+        watch(model, "generation")
+    cache = caches[get_cache_alias()]
+    keys = [get_generation_key(model) for model in models]
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            # Start from the current time rather than 0, so that pages cached
+            # under a generation that has since been evicted can't match.
+            cache.add(key, int(time.time() * 1000000), None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generation(model):
+    """Invalidate the cached pages that depend on `model`."""
+    try:
+        caches[get_cache_alias()].incr(get_generation_key(model))
+    except ValueError:
+        # No generation yet, so nothing has been cached under one either.
+        pass
+
+
+class PageCache:
+    """
+    Cache the data and Link header of pages in Django's cache framework.
+
+    Pages are keyed by their canonical URL, the user they were rendered for
+    (see `get_vary()`), the SQL of the paginated queryset and the generations of its model and of the extra `models` the
+    serialized data depends on. The saves and deletes of the paginated model
+    are only noticed by a process once it has looked up one of its pages, so
+    if other processes (e.g. task workers) change it, list it in `models`
+    too. With a `prefetch_executor` (a
+    `CountExecutor`), serving a page also renders the next one in the
+    background, so that clients following `rel="next"` hit the cache.
+
+    Used by `CachedListModelMixin` views through the `page_cache` attribute of
+    their pagination class.
+    """
+
+    def __init__(
+        self,
+        timeout=300,
+        cache_alias=None,
+        key_prefix="drf_link_header_pagination.page",
+        models=(),
+        prefetch_executor=None,
+    ):
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self.models = tuple(models)
+        self.prefetch_executor = prefetch_executor
+        for model in self.models:
+            watch(model, "generation")
+
+    def get_cache(self):
+        return caches[self.cache_alias or get_cache_alias()]
+
+    def get_vary(self, request):
+        """
+        Return what the page for `request` depends on besides its URL and
+        queryset: the user, by default, since serializers may read it from
+        their context.
+        """
+        user = getattr(request, "user", None)
+        if user is None or not user.is_authenticated:
+            return None
+        return user.pk
+
+    def get_cache_key(self, queryset, request):
+        url = LinkBuilder(request.build_absolute_uri()).build()
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            sql, params = None, ()
+        generations = get_generations((queryset.model,) + self.models)
+        vary = self.get_vary(request)
+        digest = hashlib.sha1(
+            repr((url, vary, queryset.db, sql, params, generations)).encode()
+        ).hexdigest()
+        return "{}:{}".format(self.key_prefix, digest)
+
+    def get(self, key):
+        """Return the cached `(data, headers)` of a page, or `None`."""
+        return self.get_cache().get(key)
+
+    def set(self, key, data, headers):
+        self.get_cache().set(key, (data, headers), self.timeout)
+
+    def is_prefetch(self, request):
+        return bool(request.META.get(PREFETCH_ENVIRON_KEY))
+
+    def prefetch(self, view, request, url, *args, **kwargs):
+        """
+        Render the page at `url` with `view` (a view function called with
+        `args` and `kwargs`) on the prefetch executor, as if `request` had
+        asked for it.
+
+        The prefetch request goes through no middleware. It has the headers
+        of `request`, so header-based authentication works as usual, and the
+        user `request` was authenticated as, for authentication that relies
+        on `AuthenticationMiddleware` (like DRF's `SessionAuthentication`).
+        Views depending on other middleware, e.g. reading `request.session`,
+        shouldn't be prefetched.
+        """
+        environ = dict(request.META)
+        environ["QUERY_STRING"] = url.partition("?")[2].partition("#")[0]
+        environ["CONTENT_LENGTH"] = "0"
+        environ["wsgi.input"] = io.BytesIO()
+        environ[PREFETCH_ENVIRON_KEY] = True
+        prefetch_request = WSGIRequest(environ)
+        user = getattr(request, "user", None)
+        if user is not None:
+            prefetch_request.user = user
+        return self.prefetch_executor.submit(
+            self.render_prefetch, view, prefetch_request, args, kwargs
+        )
+
+    def render_prefetch(self, view, request, args, kwargs):
+        try:
+            view(request, *args, **kwargs)
+        except Exception:
+            logger.exception("Prefetching %s failed", request.get_full_path())
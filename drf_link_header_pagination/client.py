@@ -0,0 +1,148 @@
+"""
+A client for APIs paginated with the link header pagination classes.
+
+`parse_link_header()` parses exactly the Link headers the pagination classes
+send, which is much cheaper than a general RFC 8288 parser. `iter_pages()`
+and `aiter_pages()` follow the `next` links of a collection, fetching each
+page while the previous one is being processed.
+"""
+import asyncio
+import json
+import urllib.request
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = [
+    "Page",
+    "aiter_items",
+    "aiter_pages",
+    "fetch_json",
+    "iter_items",
+    "iter_pages",
+    "parse_link_header",
+    "parse_links",
+]
+
+Page = namedtuple("Page", ["url", "data", "links"])
+
+
+def parse_link_header(value):
+    """
+    Return the URLs of a Link header in the format of `get_headers()`
+    (`<url>; rel="next", <url>; rel="last"`) as a dict keyed by `rel`.
+    """
+    return {rel: url for url, rel in parse_links(value)}
+
+
+def parse_links(value):
+    """
+    Return the `(url, rel)` pairs of a Link header in the format of
+    `get_headers()`, including repeated ones like the `rel="shard"` links.
+    """
+    links = []
+    if not value:
+        return links
+    for link in value.split(", <"):
+        url, separator, rel = link.partition('>; rel="')
+        if not separator or not rel.endswith('"'):
+            raise ValueError("Unexpected Link header: {!r}".format(value))
+        links.append((url[1:] if url.startswith("<") else url, rel[:-1]))
+    return links
+
+
+def fetch_json(url, headers=None, timeout=30):
+    """
+    Fetch `url` with `urllib` and return its decoded JSON body and its Link
+    header.
+    """
+    request = urllib.request.Request(
+        url, headers=dict({"Accept": "application/json"}, **(headers or {}))
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or "utf-8"
+        data = json.loads(response.read().decode(charset))
+        return data, response.headers.get("Link", "")
+
+
+def get_results(data):
+    # `LinkHeaderLinkResponseCursorPagination` wraps the results.
+    if isinstance(data, dict) and "results" in data:
+        return data["results"]
+    return data
+
+
+def iter_pages(url, fetch=fetch_json, executor=None):
+    """
+    Yield a `Page` for each page of the collection at `url`, following the
+    `next` links. `fetch(url)` returns the data and the Link header of a
+    page, e.g. with `fetch_json()`.
+
+    The next page is fetched on `executor` (a thread pool of its own by
+    default) while the current one is being processed.
+    """
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="drf_link_header_pagination.client"
+        )
+
+    def fetch_page(url):
+        data, link = fetch(url)
+        return Page(url, data, parse_link_header(link))
+
+    future = executor.submit(fetch_page, url)
+    try:
+        while future is not None:
+            page = future.result()
+            next_url = page.links.get("next")
+            future = executor.submit(fetch_page, next_url) if next_url else None
+            yield page
+    finally:
+        if future is not None:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
+
+
+def iter_items(url, fetch=fetch_json, executor=None):
+    """Yield each item of the collection at `url`; see `iter_pages()`."""
+    for page in iter_pages(url, fetch, executor):
+        yield from get_results(page.data)
+
+
+async def aiter_pages(url, fetch=None):
+    """
+    Async `iter_pages()`. `fetch(url)` is a coroutine function returning the
+    data and the Link header of a page; by default `fetch_json()` is run in
+    the event loop's default executor.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except AttributeError:
+        # Python 3.6, where the event loop is the running one in coroutines.
+        loop = asyncio.get_event_loop()
+    if fetch is None:
+        async def fetch(url):
+            return await loop.run_in_executor(None, fetch_json, url)
+
+    async def fetch_page(url):
+        data, link = await fetch(url)
+        return Page(url, data, parse_link_header(link))
+
+    task = asyncio.ensure_future(fetch_page(url))
+    try:
+        while task is not None:
+            page = await task
+            next_url = page.links.get("next")
+            task = asyncio.ensure_future(fetch_page(next_url)) if next_url else None
+            yield page
+    finally:
+        if task is not None:
+            task.cancel()
+
+
+async def aiter_items(url, fetch=None):
+    """Async `iter_items()`."""
+    async for page in aiter_pages(url, fetch):
+        for item in get_results(page.data):
+            yield item
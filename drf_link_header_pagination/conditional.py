@@ -0,0 +1,66 @@
+"""
+Validators for conditional requests to paginated collections.
+
+A validator is called with the filtered queryset, the page of rows and the
+Link header of the response, and returns an ETag and a Last-Modified
+timestamp (or `None`) for the page.
+"""
+import calendar
+import hashlib
+
+from django.db.models import Count, Max
+
+__all__ = ["PageHash", "LastModified"]
+
+
+def hash_values(*values):
+    return hashlib.sha1(repr(values).encode()).hexdigest()
+
+
+def get_value(row, field):
+    if isinstance(row, dict):
+        return row[field]
+    return getattr(row, field)
+
+
+class PageHash:
+    """
+    Validate a page by hashing its Link header and the `fields` of each of
+    its rows, e.g. `("pk", "version")`. Needs no extra query.
+
+    `fields` must include one that changes whenever a row is edited, such as
+    a version counter or an update timestamp: with the primary keys alone,
+    edited rows would keep getting 304 responses.
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+
+    def __call__(self, queryset, page, links):
+        values = [tuple(get_value(row, field) for field in self.fields) for row in page]
+        return hash_values(links, values), None
+
+
+class LastModified:
+    """
+    Validate a page by the latest value of `field` (e.g. `updated_at`) and
+    the number of rows in the filtered queryset, found with one aggregate
+    query. The latest value is also used for the Last-Modified header, but
+    note that deleting a row doesn't change it, so clients relying on
+    `If-Modified-Since` alone won't notice deletions.
+    """
+
+    def __init__(self, field="updated_at"):
+        self.field = field
+
+    def __call__(self, queryset, page, links):
+        result = queryset.order_by().aggregate(
+            last_modified=Max(self.field), count=Count("pk")
+        )
+        last_modified = result["last_modified"]
+        etag = hash_values(links, last_modified, result["count"])
+        if last_modified is not None and hasattr(last_modified, "utctimetuple"):
+            last_modified = calendar.timegm(last_modified.utctimetuple())
+        else:
+            last_modified = None
+        return etag, last_modified
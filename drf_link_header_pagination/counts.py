@@ -0,0 +1,305 @@
+"""
+Count strategies for the link header pagination classes.
+
+A count strategy is a callable that takes the queryset being paginated and
+returns the total number of rows, or `None` if the total should not be
+computed. The total is only needed for the `rel="last"` link. A strategy can
+also return a `LowerBound` when it only found out that there are at least
+that many rows, or an `Estimate` when the total may be off either way.
+"""
+import hashlib
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db import Error, connections
+
+__all__ = [
+    "acount",
+    "ExactCount",
+    "NoCount",
+    "KnownCount",
+    "CachedCount",
+    "EstimatedCount",
+    "CappedCount",
+    "LowerBound",
+    "Estimate",
+    "ReplicaCount",
+]
+
+logger = logging.getLogger(__name__)
+
+
+async def acount(strategy, queryset, executor=None):
+    """
+    Count `queryset` with `strategy` from async code: on a worker thread of
+    `executor` (a `CountExecutor`) if given, and otherwise with the
+    strategy's `acount()` method if it has one, or in a thread.
+    """
+    if executor is not None:
+        return await executor.acall(strategy, queryset)
+    if hasattr(strategy, "acount"):
+        return await strategy.acount(queryset)
+    return await sync_to_async(strategy)(queryset)
+
+
+def using_replica(queryset, using):
+    """
+    Return `queryset` routed to the database `using`, or `None` if it can't
+    be: for objects that aren't querysets, and inside a transaction on the
+    queryset's database, whose changes the replica wouldn't see.
+    """
+    if using is None or not hasattr(queryset, "using"):
+        return None
+    if queryset.db == using or connections[queryset.db].in_atomic_block:
+        return None
+    return queryset.using(using)
+
+
+def is_unfiltered(query):
+    """Return whether `query` selects every row of its table."""
+    return (
+        not query.where
+        and not query.distinct
+        and not query.combinator
+        and len(query.alias_map) <= 1
+        and not query.low_mark
+        and query.high_mark is None
+    )
+
+
+class ExactCount:
+    """Count every time, using `queryset.count()` or `len()` for lists."""
+
+    def __call__(self, queryset):
+        try:
+            return queryset.count()
+        except (AttributeError, TypeError):
+            return len(queryset)
+
+    async def acount(self, queryset):
+        if hasattr(queryset, "acount"):
+            return await queryset.acount()
+        if hasattr(queryset, "query"):
+            # Django < 4.1 has no async queryset methods.
+            return await sync_to_async(queryset.count)()
+        return self(queryset)
+
+
+class NoCount:
+    """
+    Never count. Pages are fetched with one extra row to find out whether
+    there is a next page, and the `rel="last"` link is left out.
+    """
+
+    def __call__(self, queryset):
+        return None
+
+    async def acount(self, queryset):
+        return None
+
+
+class KnownCount:
+    """Return a count found beforehand, e.g. with `batch_count()`."""
+
+    def __init__(self, count):
+        self.count = count
+
+    def __call__(self, queryset):
+        return self.count
+
+    async def acount(self, queryset):
+        return self.count
+
+
+class CachedCount:
+    """
+    Cache the result of another count strategy for `timeout` seconds, keyed
+    by the database alias and the SQL and parameters of the queryset with its
+    ordering removed. Objects that aren't querysets are never cached.
+    """
+
+    def __init__(
+        self,
+        timeout=60,
+        cache_alias="default",
+        key_prefix="drf_link_header_pagination.count",
+        strategy=None,
+    ):
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self.key_prefix = key_prefix
+        self.strategy = strategy or ExactCount()
+
+    def get_cache_key(self, queryset):
+        if getattr(queryset, "query", None) is None:
+            return None
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        digest = hashlib.sha1(repr((queryset.db, sql, params)).encode()).hexdigest()
+        return "{}:{}".format(self.key_prefix, digest)
+
+    def __call__(self, queryset):
+        key = self.get_cache_key(queryset)
+        if key is None:
+            return self.strategy(queryset)
+
+        cache = caches[self.cache_alias]
+        count = cache.get(key)
+        if count is None:
+            count = self.strategy(queryset)
+            if count is not None:
+                cache.set(key, count, self.timeout)
+        return count
+
+
+class EstimatedCount:
+    """
+    Use PostgreSQL's planner statistics instead of a `COUNT(*)`: `reltuples`
+    for an unfiltered table, or the row estimate of `EXPLAIN` otherwise.
+
+    Estimates below `threshold` are replaced by the result of `strategy`
+    (an exact count by default), since small counts are cheap and that is
+    where planner estimates are least reliable. Other databases always use
+    `strategy`.
+
+    Estimates are returned as an `Estimate`, so pages are fetched as with a
+    `LowerBound`, with an extra row telling whether there is a next page,
+    and every row can be reached whatever the estimate. The estimate is only
+    used for the `rel="last"` link, which is wrong by as much as the
+    estimate is: it points before the real last page when the estimate is
+    too low, and to an empty page (a 404) when it is too high.
+    """
+
+    def __init__(self, threshold=10000, strategy=None):
+        self.threshold = threshold
+        self.strategy = strategy or ExactCount()
+
+    def estimate(self, queryset):
+        query = getattr(queryset, "query", None)
+        if query is None:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+
+        with connection.cursor() as cursor:
+            if self.is_unfiltered(query):
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [connection.ops.quote_name(queryset.model._meta.db_table)],
+                )
+                row = cursor.fetchone()
+                # Tables that were never analyzed report -1.
+                if row is not None and row[0] >= 0:
+                    return row[0]
+
+            try:
+                sql, params = queryset.order_by().query.sql_with_params()
+            except EmptyResultSet:
+                return 0
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+
+    def is_unfiltered(self, query):
+        return is_unfiltered(query)
+
+    def __call__(self, queryset):
+        count = self.estimate(queryset)
+        if count is None or count < self.threshold:
+            return self.strategy(queryset)
+        return Estimate(count)
+
+
+class LowerBound(int):
+    """A count that is only a lower bound of the number of rows."""
+
+
+class Estimate(int):
+    """A count that is only an estimate of the number of rows."""
+
+
+class CappedCount:
+    """
+    Count at most `cap` rows, with `SELECT COUNT(*) FROM (SELECT ... LIMIT
+    cap)`, so that the count of a large result set doesn't scan all of it.
+
+    When there are `cap` rows or more, the count is a `LowerBound`: the
+    `rel="last"` link is left out and the lower bound is sent in an
+    `X-Total-Count-Lower-Bound` header instead.
+    """
+
+    def __init__(self, cap=1000):
+        self.cap = cap
+
+    def __call__(self, queryset):
+        queryset = queryset[:self.cap]
+        try:
+            count = queryset.count()
+        except (AttributeError, TypeError):
+            count = len(queryset)
+        return self.bound(count)
+
+    async def acount(self, queryset):
+        queryset = queryset[:self.cap]
+        if hasattr(queryset, "acount"):
+            return self.bound(await queryset.acount())
+        if hasattr(queryset, "query"):
+            # Django < 4.1 has no async queryset methods.
+            return self.bound(await sync_to_async(queryset.count)())
+        return self.bound(len(queryset))
+
+    def bound(self, count):
+        if count >= self.cap:
+            return LowerBound(count)
+        return count
+
+
+class ReplicaCount:
+    """
+    Count with `strategy` (an exact count by default) on the database
+    `using`, e.g. a read replica, so that counts don't load the primary.
+
+    If that fails, e.g. because the replica is down, the queryset is counted
+    on its own database instead. Counts made inside a transaction on that
+    database are never routed, since the replica couldn't see its changes.
+    """
+
+    def __init__(self, using, strategy=None):
+        self.using = using
+        self.strategy = strategy or ExactCount()
+
+    def __call__(self, queryset):
+        replica = using_replica(queryset, self.using)
+        if replica is not None:
+            try:
+                return self.strategy(replica)
+            except Error:
+                logger.warning(
+                    "Counting on %s failed, counting on %s instead",
+                    self.using,
+                    queryset.db,
+                    exc_info=True,
+                )
+        return self.strategy(queryset)
+
+    async def acount(self, queryset):
+        replica = await sync_to_async(using_replica)(queryset, self.using)
+        if replica is not None:
+            try:
+                return await acount(self.strategy, replica)
+            except Error:
+                logger.warning(
+                    "Counting on %s failed, counting on %s instead",
+                    self.using,
+                    queryset.db,
+                    exc_info=True,
+                )
+        return await acount(self.strategy, queryset)
@@ -0,0 +1,201 @@
+"""
+A compact, signed encoding of the cursors of the cursor pagination classes.
+
+A cursor is encoded as a version byte, a flags byte, the offset, the values
+of its position and an HMAC of all of them, in URL-safe base64 without
+padding. Each value is written as a one-byte type tag followed by a binary
+representation of the value, so that positions made of several ordering
+fields are still short and decode back to values of the right type.
+"""
+import datetime
+import decimal
+import struct
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import lru_cache
+
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework.pagination import Cursor
+
+__all__ = ["SignedCursorCodec"]
+
+VERSION = 1
+REVERSE = 1
+
+INT64 = struct.Struct(">q")
+FLOAT = struct.Struct(">d")
+EPOCH = datetime.datetime(1970, 1, 1)
+UTC_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def pack_varint(number):
+    data = bytearray()
+    while True:
+        byte = number & 0x7F
+        number >>= 7
+        if number:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+
+def unpack_varint(data, pos):
+    number = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        number |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return number, pos
+        shift += 7
+
+
+def pack_bytes(tag, value):
+    return tag + pack_varint(len(value)) + value
+
+
+def microseconds(delta):
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def pack_value(value):
+    if value is None:
+        return b"N"
+    if value is True:
+        return b"T"
+    if value is False:
+        return b"F"
+    if isinstance(value, int):
+        if -(2 ** 63) <= value < 2 ** 63:
+            return b"i" + INT64.pack(value)
+        return pack_bytes(b"I", str(value).encode("ascii"))
+    if isinstance(value, float):
+        return b"f" + FLOAT.pack(value)
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            return b"n" + INT64.pack(microseconds(value - EPOCH))
+        return b"t" + INT64.pack(microseconds(value - UTC_EPOCH))
+    if isinstance(value, datetime.date):
+        return b"D" + INT64.pack(value.toordinal())
+    if isinstance(value, decimal.Decimal):
+        return pack_bytes(b"x", str(value).encode("ascii"))
+    if isinstance(value, uuid.UUID):
+        return b"u" + value.bytes
+    if isinstance(value, bytes):
+        return pack_bytes(b"b", value)
+    # Anything else is filtered on as a string, like DRF's cursor positions.
+    return pack_bytes(b"s", str(value).encode("utf-8"))
+
+
+def unpack_value(data, pos):
+    tag = data[pos:pos + 1]
+    pos += 1
+    if tag == b"N":
+        return None, pos
+    if tag == b"T":
+        return True, pos
+    if tag == b"F":
+        return False, pos
+    if tag in (b"i", b"n", b"t", b"D"):
+        (number,) = INT64.unpack_from(data, pos)
+        pos += INT64.size
+        if tag == b"n":
+            return EPOCH + datetime.timedelta(microseconds=number), pos
+        if tag == b"t":
+            return UTC_EPOCH + datetime.timedelta(microseconds=number), pos
+        if tag == b"D":
+            return datetime.date.fromordinal(number), pos
+        return number, pos
+    if tag == b"f":
+        (number,) = FLOAT.unpack_from(data, pos)
+        return number, pos + FLOAT.size
+    if tag == b"u":
+        if len(data) < pos + 16:
+            raise ValueError("Truncated UUID")
+        return uuid.UUID(bytes=bytes(data[pos:pos + 16])), pos + 16
+    if tag in (b"I", b"x", b"b", b"s"):
+        length, pos = unpack_varint(data, pos)
+        value = bytes(data[pos:pos + length])
+        if len(value) != length:
+            raise ValueError("Truncated value")
+        pos += length
+        if tag == b"I":
+            return int(value.decode("ascii")), pos
+        if tag == b"x":
+            return decimal.Decimal(value.decode("ascii")), pos
+        if tag == b"s":
+            return value.decode("utf-8"), pos
+        return value, pos
+    raise ValueError("Unknown type tag {!r}".format(tag))
+
+
+class SignedCursorCodec:
+    """
+    Encode cursors compactly and sign them, for the `cursor_codec` of the
+    cursor pagination classes.
+
+    The position of a cursor is a tuple of the values of every ordering
+    field of the row it points at, so any unique combination of fields can
+    be used as the ordering without falling back to offsets. The signature
+    is an HMAC of `signature_length` bytes keyed with `secret` (the
+    `SECRET_KEY` setting by default) and `salt`, so tampered cursors are
+    rejected. Up to `cache_size` decoded cursors are kept, so clients
+    crawling a collection don't have their cursors verified over and over.
+    """
+
+    def __init__(self, secret=None, salt="drf_link_header_pagination.cursor",
+                 signature_length=12, cache_size=1024):
+        self.secret = secret
+        self.salt = salt
+        self.signature_length = signature_length
+        self.decode = lru_cache(maxsize=cache_size)(self.decode)
+
+    def sign(self, data):
+        return salted_hmac(
+            self.salt, data, secret=self.secret, algorithm="sha256"
+        ).digest()[:self.signature_length]
+
+    def encode(self, cursor):
+        """Return `cursor` encoded as a string."""
+        position = cursor.position
+        if position is not None and not isinstance(position, tuple):
+            position = (position,)
+        data = bytes([VERSION, REVERSE if cursor.reverse else 0])
+        data += pack_varint(cursor.offset)
+        if position is None:
+            data += b"\x00"
+        else:
+            data += pack_varint(len(position) + 1)
+            data += b"".join(pack_value(value) for value in position)
+        data += self.sign(data)
+        return urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+    def decode(self, encoded):
+        """
+        Return the `Cursor` encoded in `encoded`, or raise `ValueError` if it
+        isn't a valid cursor.
+        """
+        try:
+            data = urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+        except (TypeError, ValueError, UnicodeEncodeError):
+            raise ValueError("Invalid base64")
+        data, signature = data[:-self.signature_length], data[-self.signature_length:]
+        if len(data) < 3 or not constant_time_compare(signature, self.sign(data)):
+            raise ValueError("Invalid signature")
+        if data[0] != VERSION:
+            raise ValueError("Unknown version")
+
+        try:
+            offset, pos = unpack_varint(data, 2)
+            length, pos = unpack_varint(data, pos)
+            position = None
+            if length:
+                values = []
+                for _ in range(length - 1):
+                    value, pos = unpack_value(data, pos)
+                    values.append(value)
+                position = tuple(values)
+        except (IndexError, struct.error):
+            raise ValueError("Truncated cursor")
+        return Cursor(offset=offset, reverse=bool(data[1] & REVERSE), position=position)
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+
+__all__ = ["CountExecutor"]
+
+
+class CountExecutor:
+    """
+    A bounded thread pool for running the count query of a page at the same
+    time as the page query, on the worker thread's own database connection.
+    It can also run other work in the background, like `PageCache` prefetches.
+
+    Worker connections are closed after each count unless `CONN_MAX_AGE`
+    allows keeping them, and all of them are closed by `shutdown()`.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="drf_link_header_pagination.count",
+                )
+            return self._executor
+
+    def submit(self, func, *args):
+        """
+        Call `func(*args)` on a worker thread and return its future. The
+        worker's connections are cleaned up afterwards, as for counts.
+        """
+        return self.get_executor().submit(self.run, func, *args)
+
+    async def acall(self, func, *args):
+        """Await `func(*args)`, called on a worker thread as by `submit()`."""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def run(self, func, *args):
+        try:
+            return func(*args)
+        finally:
+            for connection in connections.all():
+                connection.close_if_unusable_or_obsolete()
+
+    def gather(self, count, fetch, using=None):
+        """
+        Call `count` on a worker thread while calling `fetch` on this one,
+        and return both results.
+
+        Both are called on this thread instead when `using` (the database
+        alias of the queryset) is `None` or this thread is inside a
+        transaction, whose changes the worker's connection couldn't see.
+        """
+        if using is None or connections[using].in_atomic_block:
+            return count(), fetch()
+
+        future = self.submit(count)
+        results = fetch()
+        return future.result(), results
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+
+        # Make every worker thread close its own connections: the barrier
+        # keeps a thread from picking up a second task.
+        barrier = threading.Barrier(self.max_workers)
+
+        def close_connections():
+            barrier.wait()
+            connections.close_all()
+
+        for _ in range(self.max_workers):
+            executor.submit(close_connections)
+        executor.shutdown(wait=True)
@@ -0,0 +1,152 @@
+"""
+Guarding paginated responses against query regressions.
+
+A `QueryGuard` counts the queries made from the start of
+`paginate_queryset()` to `get_paginated_response()`, which includes the
+serialization of the page. A response that makes more queries than its
+budget, or that repeats a query shape (its SQL without the parameters) more
+than `max_repeats` times, is reported: one more query per row is the sign of
+a serializer missing a `select_related()` or `prefetch_related()`.
+"""
+import logging
+import re
+import warnings
+from collections import Counter
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+__all__ = ["QueryBudgetExceeded", "QueryBudgetWarning", "QueryGuard", "QueryLog"]
+
+logger = logging.getLogger(__name__)
+
+# `IN` lists have a placeholder per value, so they're collapsed into one.
+IN_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)+\s*\)")
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised by a `QueryGuard` with `action="raise"`."""
+
+
+class QueryBudgetWarning(RuntimeWarning):
+    """Warned by a `QueryGuard` with `action="warn"`."""
+
+
+def get_query_shape(sql):
+    return IN_LIST_RE.sub("(%s, ...)", sql)
+
+
+class QueryLog:
+    """
+    An execute wrapper counting the queries made by this thread on the
+    connections named in `using` (all of them by default), by shape.
+    """
+
+    def __init__(self, using=None):
+        if using is None:
+            using = list(connections)
+        elif isinstance(using, str):
+            using = [using]
+        self.using = using
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.shapes[get_query_shape(sql)] += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def count(self):
+        return sum(self.shapes.values())
+
+    def start(self):
+        for alias in self.using:
+            connections[alias].execute_wrappers.append(self)
+
+    def stop(self):
+        for alias in self.using:
+            wrappers = connections[alias].execute_wrappers
+            if self in wrappers:
+                wrappers.remove(self)
+
+    def get_problems(self, max_queries=None, max_repeats=None):
+        """Return a description of each way the queries exceed the budget."""
+        problems = []
+        if max_queries is not None and self.count > max_queries:
+            problems.append(
+                "{} queries, over the budget of {}".format(self.count, max_queries)
+            )
+        if max_repeats is not None:
+            for shape, repeats in self.shapes.most_common():
+                if repeats <= max_repeats:
+                    break
+                problems.append("repeated {} times: {}".format(repeats, shape))
+        return problems
+
+
+class GuardedLog(QueryLog):
+    """The `QueryLog` of a `QueryGuard`, for the request it was started for."""
+
+    def __init__(self, request, view, using):
+        super().__init__(using)
+        self.request = request
+        self.view = view
+
+
+class QueryGuard:
+    """
+    Check the queries of the paginated responses of a pagination class that
+    has this as its `query_guard`.
+
+    A response may make up to `max_queries` queries (or the `query_budget`
+    of its view, if it has one), and repeat a query shape up to
+    `max_repeats` times. Over budget, `action` decides what happens: `"log"`
+    logs a warning, `"warn"` warns with a `QueryBudgetWarning` and `"raise"`
+    raises `QueryBudgetExceeded`. Only the queries made on the queryset's
+    database by the request's thread are counted, so `apaginate_queryset()`,
+    whose queries run on other threads, refuses to paginate with a guard.
+    """
+
+    actions = ("log", "warn", "raise")
+
+    def __init__(self, max_queries=None, max_repeats=1, action="warn"):
+        if action not in self.actions:
+            raise ValueError(
+                "`action` must be one of {}, not {!r}.".format(self.actions, action)
+            )
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.action = action
+
+    def get_budget(self, view):
+        budget = getattr(view, "query_budget", None)
+        return self.max_queries if budget is None else budget
+
+    def start(self, request, queryset=None, view=None):
+        """Start counting the queries of `request` and return the `QueryLog`."""
+        using = getattr(queryset, "db", DEFAULT_DB_ALIAS)
+        # Drop the logs of responses that were never finished, e.g. because
+        # serializing them failed, on any database: the last one may have
+        # been paginated on a replica.
+        for connection in connections.all():
+            wrappers = connection.execute_wrappers
+            wrappers[:] = [
+                wrapper for wrapper in wrappers if not isinstance(wrapper, GuardedLog)
+            ]
+        log = GuardedLog(request, view, using)
+        log.start()
+        return log
+
+    def finish(self, log):
+        """Stop counting and report the response if it's over budget."""
+        log.stop()
+        problems = log.get_problems(self.get_budget(log.view), self.max_repeats)
+        if not problems:
+            return
+        message = "{} {}: {}".format(
+            log.request.method, log.request.get_full_path(), "; ".join(problems)
+        )
+        if self.action == "raise":
+            raise QueryBudgetExceeded(message)
+        if self.action == "warn":
+            warnings.warn(message, QueryBudgetWarning, stacklevel=2)
+        else:
+            logger.warning(message)
@@ -0,0 +1,190 @@
+"""
+Instrumentation of the link header pagination classes.
+
+A paginated request goes through some of these phases, each of which is
+timed and has its queries counted:
+
+- `cursor`: decoding the cursor or key of the requested page.
+- `count`: counting the rows, for the last link.
+- `page`: fetching the rows of the page.
+- `links`: building the Link header.
+
+The results are reported once the Link header has been built: as a
+`Server-Timing` header, with the `pagination_timed` signal and to the
+`metrics` backends of the `Instrumentation`.
+"""
+import random
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.dispatch import Signal
+
+__all__ = [
+    "Instrumentation",
+    "PrometheusMetrics",
+    "StatsdMetrics",
+    "pagination_timed",
+]
+
+# Sent with the `pagination`, the `request` and the `timings` (in seconds) and
+# `queries` of each phase.
+pagination_timed = Signal()
+
+
+class NullPhase:
+    """The phases of requests that aren't sampled, which cost nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_PHASE = NullPhase()
+
+
+class Recorder:
+    """The timings and query counts of the phases of one request."""
+
+    def __init__(self, instrumentation, request, using=None):
+        self.instrumentation = instrumentation
+        self.request = request
+        self.using = using
+        self.timings = {}
+        self.queries = {}
+
+    @contextmanager
+    def phase(self, name, count_queries=True):
+        """
+        Time the body of the `with` block as part of phase `name`, counting
+        the queries made on this thread's connection to the database.
+        """
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        try:
+            if count_queries and self.using is not None:
+                with connections[self.using].execute_wrapper(count):
+                    yield
+            else:
+                yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.timings[name] = self.timings.get(name, 0) + elapsed
+            self.queries[name] = self.queries.get(name, 0) + queries[0]
+
+    def get_server_timing(self):
+        return ", ".join(
+            "{}{};dur={:.3f}".format(
+                self.instrumentation.server_timing_prefix, name, seconds * 1000
+            )
+            for name, seconds in self.timings.items()
+        )
+
+    def finish(self, pagination):
+        pagination_timed.send(
+            sender=type(pagination),
+            pagination=pagination,
+            request=self.request,
+            timings=self.timings,
+            queries=self.queries,
+        )
+        for metrics in self.instrumentation.metrics:
+            metrics.record(type(pagination).__name__, self.timings, self.queries)
+
+
+class Instrumentation:
+    """
+    Time the phases of a `sample_rate` fraction of the requests to a
+    pagination class that has this as its `instrumentation`.
+
+    Requests that aren't sampled only cost a call to `random.random()`.
+    Set `server_timing` to `False` to leave out the `Server-Timing` header,
+    e.g. when the timings shouldn't be visible to clients. `metrics` is a
+    list of backends such as `StatsdMetrics` and `PrometheusMetrics`.
+    """
+
+    def __init__(
+        self,
+        sample_rate=1.0,
+        server_timing=True,
+        server_timing_prefix="pagination-",
+        metrics=(),
+    ):
+        self.sample_rate = sample_rate
+        self.server_timing = server_timing
+        self.server_timing_prefix = server_timing_prefix
+        self.metrics = list(metrics)
+
+    def start(self, request, queryset=None):
+        """Return a `Recorder` for `request`, or `None` if it isn't sampled."""
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return None
+        return Recorder(self, request, using=getattr(queryset, "db", None))
+
+
+class StatsdMetrics:
+    """
+    Send the timings (in milliseconds) and query counts of each phase to a
+    StatsD client with `timing()` and `incr()` methods, like the one of the
+    `statsd` package, as `<prefix>.<pagination class>.<phase>` and
+    `<prefix>.<pagination class>.<phase>.queries`.
+    """
+
+    def __init__(self, client, prefix="pagination"):
+        self.client = client
+        self.prefix = prefix
+
+    def record(self, name, timings, queries):
+        for phase, seconds in timings.items():
+            stat = "{}.{}.{}".format(self.prefix, name, phase)
+            self.client.timing(stat, seconds * 1000)
+            if queries.get(phase):
+                self.client.incr(stat + ".queries", queries[phase])
+
+
+class PrometheusMetrics:
+    """
+    Observe the timings of each phase in a histogram and count their queries
+    in a counter, both labelled with `pagination` and `phase`.
+
+    The metrics are created in `registry` (the default registry of
+    `prometheus_client` by default) unless `duration` and `queries` are
+    given.
+    """
+
+    def __init__(
+        self,
+        duration=None,
+        queries=None,
+        registry=None,
+        namespace="drf_link_header_pagination",
+    ):
+        if duration is None or queries is None:
+            from prometheus_client import Counter, Histogram
+
+            kwargs = {"namespace": namespace, "labelnames": ("pagination", "phase")}
+            if registry is not None:
+                kwargs["registry"] = registry
+            if duration is None:
+                duration = Histogram(
+                    "phase_seconds", "Time spent in each pagination phase.", **kwargs
+                )
+            if queries is None:
+                queries = Counter(
+                    "phase_queries", "Queries made in each pagination phase.", **kwargs
+                )
+        self.duration = duration
+        self.queries = queries
+
+    def record(self, name, timings, queries):
+        for phase, seconds in timings.items():
+            self.duration.labels(pagination=name, phase=phase).observe(seconds)
+            if queries.get(phase):
+                self.queries.labels(pagination=name, phase=phase).inc(queries[phase])
@@ -0,0 +1,32 @@
+"""
+Seeking through querysets by the values of their ordering fields.
+"""
+from django.db.models import Q
+
+__all__ = ["get_field_value", "seek_filter"]
+
+
+def seek_filter(ordering, key, reverse=False):
+    """
+    Return a filter for the rows that come after `key`, the values of the
+    `ordering` fields of a row, or before it if `reverse` is set.
+    """
+    q = Q()
+    equal = {}
+    for field, value in zip(ordering, key):
+        descending = field.startswith("-")
+        field = field.lstrip("-")
+        lookup = "{}__{}".format(field, "lt" if descending != reverse else "gt")
+        q |= Q(**equal, **{lookup: value})
+        equal[field] = value
+    return q
+
+
+def get_field_value(instance, field):
+    """Return the value of `field` (which can span relations) of `instance`."""
+    if isinstance(instance, dict):
+        return instance[field]
+    value = instance
+    for attr in field.split("__"):
+        value = getattr(value, attr)
+    return value
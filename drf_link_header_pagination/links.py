@@ -0,0 +1,123 @@
+from urllib import parse
+
+from django.utils.encoding import force_str
+
+__all__ = ["LinkBuilder", "LinkTemplate", "PrefixedLinkBuilder"]
+
+
+class LinkTemplate:
+    """
+    A URL with the value of one query parameter left out, rendered by
+    concatenating the encoded value between the parts around it.
+    """
+
+    def __init__(self, prefix, suffix):
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def render(self, value):
+        return self.prefix + parse.quote_plus(force_str(value)) + self.suffix
+
+
+class LinkBuilder:
+    """
+    Parse a URL once so that links differing only in some query parameters
+    can be rendered without parsing it again.
+
+    The output is the same as chaining DRF's `replace_query_param` and
+    `remove_query_param` calls on the URL. Links that only differ in the
+    value of one parameter are rendered from a `template()`, which encodes
+    the rest of the URL once.
+    """
+
+    def __init__(self, url):
+        scheme, netloc, path, query, fragment = parse.urlsplit(force_str(url))
+        self.scheme = scheme
+        self.netloc = netloc
+        self.path = path
+        self.fragment = fragment
+        self.query = parse.parse_qs(query, keep_blank_values=True)
+        self.templates = {}
+
+    def get_query(self, replace=None, remove=()):
+        query = self.query.copy()
+        for key in remove:
+            query.pop(force_str(key), None)
+        if replace:
+            for key, val in replace.items():
+                query[force_str(key)] = [force_str(val)]
+        return query
+
+    def build(self, replace=None, remove=()):
+        """
+        Return the URL with the query parameters in `replace` set to the given
+        values and the ones in `remove` left out.
+        """
+        query = self.get_query(replace, remove)
+        return parse.urlunsplit(
+            (
+                self.scheme,
+                self.netloc,
+                self.path,
+                parse.urlencode(sorted(query.items()), doseq=True),
+                self.fragment,
+            )
+        )
+
+    def template(self, key, replace=None, remove=()):
+        """
+        Return a `LinkTemplate` whose `render(value)` is the same as
+        `build({key: value, **replace}, remove)`.
+        """
+        key = force_str(key)
+        replace = {force_str(k): force_str(v) for k, v in (replace or {}).items()}
+        remove = tuple(force_str(k) for k in remove)
+        cache_key = (key, tuple(sorted(replace.items())), remove)
+        template = self.templates.get(cache_key)
+        if template is None:
+            template = self.templates[cache_key] = self.compile(key, replace, remove)
+        return template
+
+    def compile(self, key, replace, remove):
+        query = self.get_query(replace, remove)
+        query.pop(key, None)
+        # `build()` sorts the parameters, so the slot goes between the ones
+        # sorting before and after `key`.
+        items = sorted(query.items())
+        before = [item for item in items if item[0] < key]
+        after = items[len(before):]
+        slot = parse.quote_plus(key) + "="
+        if before:
+            slot = parse.urlencode(before, doseq=True) + "&" + slot
+        suffix = "&" + parse.urlencode(after, doseq=True) if after else ""
+        if self.fragment:
+            suffix += "#" + self.fragment
+        url = parse.urlunsplit((self.scheme, self.netloc, self.path, "", ""))
+        return LinkTemplate(url + "?" + slot, suffix)
+
+
+class PrefixedLinkBuilder(LinkBuilder):
+    """
+    A `LinkBuilder` for pagination whose query parameters are prefixed with
+    `prefix` in the URL, e.g. `orders.page` instead of `page`.
+    """
+
+    def __init__(self, url, prefix):
+        super().__init__(url)
+        self.prefix = prefix
+
+    def build(self, replace=None, remove=()):
+        if replace:
+            replace = {
+                self.prefix + force_str(key): val for key, val in replace.items()
+            }
+        remove = [self.prefix + force_str(key) for key in remove]
+        return super().build(replace, remove)
+
+    def template(self, key, replace=None, remove=()):
+        if replace:
+            replace = {
+                self.prefix + force_str(name): val for name, val in replace.items()
+            }
+        remove = [self.prefix + force_str(name) for name in remove]
+        return super().template(self.prefix + force_str(key), replace, remove)
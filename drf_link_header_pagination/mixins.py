@@ -0,0 +1,121 @@
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+__all__ = [
+    "CachedListModelMixin",
+    "ConditionalListModelMixin",
+    "StreamingListModelMixin",
+]
+
+
+class CachedListModelMixin:
+    """
+    A `ListModelMixin` addition that serves pages from the `page_cache` (a
+    `PageCache`) of the view's pagination class, and warms the cache with
+    the next page when the cache has a prefetch executor.
+
+    Only successful responses are cached. Pages are served from the cache
+    without running any queries or serializing anything. Prefetched pages
+    are rendered without middleware; see `PageCache.prefetch()`.
+    """
+
+    def list(self, request, *args, **kwargs):
+        page_cache = getattr(self.paginator, "page_cache", None)
+        if page_cache is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        key = page_cache.get_cache_key(queryset, request)
+        cached = page_cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            return Response(data, headers=headers)
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+
+        headers = {"Link": response["Link"]} if response.has_header("Link") else {}
+        page_cache.set(key, response.data, headers)
+
+        if page_cache.prefetch_executor is not None and not page_cache.is_prefetch(request):
+            next_url = self.paginator.get_next_link()
+            if next_url is not None:
+                resolver_match = getattr(request, "resolver_match", None)
+                if resolver_match is not None:
+                    view = resolver_match.func
+                else:
+                    view = type(self).as_view()
+                page_cache.prefetch(view, request, next_url, *args, **kwargs)
+        return response
+
+
+class StreamingListModelMixin:
+    """
+    A `ListModelMixin` replacement that streams each page as a JSON array
+    instead of building the whole response in memory.
+
+    The view's `pagination_class` must provide `stream_queryset()` and
+    `get_streaming_response()`, like `LinkHeaderPagination` and
+    `LinkHeaderLimitOffsetPagination`. Unpaginated requests are served as
+    usual by the next `list()` in the MRO.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = self.paginator
+        page = None
+        if paginator is not None:
+            page = paginator.stream_queryset(queryset, request, view=self)
+        if page is None:
+            return super().list(request, *args, **kwargs)
+
+        def serialize(rows):
+            return self.get_serializer(rows, many=True).data
+
+        return paginator.get_streaming_response(page, serialize)
+
+
+class ConditionalListModelMixin:
+    """
+    A `ListModelMixin` addition that sets the ETag and Last-Modified headers
+    from the `collection_validator` of the view's pagination class, and
+    answers `If-None-Match`/`If-Modified-Since` requests for unchanged pages
+    with a 304 that still has the Link header, without serializing the page.
+    """
+
+    def list(self, request, *args, **kwargs):
+        validator = getattr(self.paginator, "collection_validator", None)
+        if validator is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return super().list(request, *args, **kwargs)
+
+        try:
+            headers = self.paginator.get_headers()
+            etag, last_modified = validator(queryset, page, headers.get("Link", ""))
+            headers["ETag"] = quote_etag(etag)
+            if last_modified is not None:
+                headers["Last-Modified"] = http_date(last_modified)
+
+            response = get_conditional_response(
+                request._request, etag=headers["ETag"], last_modified=last_modified
+            )
+            if response is not None:
+                for header, value in headers.items():
+                    response[header] = value
+        except BaseException:
+            self.paginator.finish_query_guard(report=False)
+            raise
+        if response is not None:
+            # Not serialized, so `get_paginated_response()` isn't called.
+            self.paginator.finish_query_guard()
+            return response
+
+        serializer = self.get_serializer(page, many=True)
+        # The links may take queries, so they aren't built again.
+        return self.paginator.get_paginated_response(serializer.data, headers)
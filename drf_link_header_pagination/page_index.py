@@ -0,0 +1,225 @@
+"""
+Indexes of page boundaries, for page-number pagination of mostly append-only
+tables without `OFFSET` scans or counts.
+
+A `PageIndex` keeps, in the cache, the ordering key of the row ending every
+`every`-th page of a queryset and the number of rows. A page is then fetched
+by seeking past the nearest boundary before it, and the last page is known
+without counting. New rows are indexed on the next request after they are
+saved, from the rows after the last boundary only. Deleting rows rebuilds
+the indexes of their model from scratch.
+
+The boundaries are numbered and picked by the database, with `ROW_NUMBER()`,
+so only they are fetched; databases without window functions have every
+ordering key read instead.
+"""
+import hashlib
+import pickle
+
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import F, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+
+from .cache import get_cache_alias, get_generations
+from .keys import seek_filter
+from .signals import watch
+
+__all__ = ["PageIndex"]
+
+INDEX_KEY_PREFIX = "drf_link_header_pagination.page_index"
+
+
+def get_deletions_key(model):
+    return "{}.deletions:{}".format(INDEX_KEY_PREFIX, model._meta.label_lower)
+
+
+def count_deletion(model):
+    """Make the page indexes of `model` be rebuilt, since rows were deleted."""
+    cache = caches[get_cache_alias()]
+    try:
+        cache.incr(get_deletions_key(model))
+    except ValueError:
+        # Nothing has been indexed since the counter was evicted.
+        pass
+
+
+class PageBoundaries:
+    """The boundaries of the pages of `page_size` rows of a queryset."""
+
+    def __init__(self, queryset, ordering, page_size, every, keys, count):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.page_size = page_size
+        self.every = every
+        self.keys = keys
+        self.count = count
+
+    def get_page_queryset(self, number):
+        """Return the slice of the queryset holding page `number`."""
+        boundary, page = divmod(number - 1, self.every)
+        queryset = self.queryset.order_by(*self.ordering)
+        if boundary:
+            key = self.keys[boundary - 1]
+            queryset = queryset.filter(seek_filter(self.ordering, key))
+        offset = page * self.page_size
+        return queryset[offset:offset + self.page_size]
+
+
+class PageIndex:
+    """
+    Index the page boundaries of the querysets paginated by a
+    `LinkHeaderPagination` that has this as its `page_index`.
+
+    `ordering` must be the ordering of the querysets, and unique. The key of
+    the row ending every `every`-th page is kept, so fetching a page takes a
+    seek and an offset of less than `every` pages. An index that would take
+    more than `max_size` bytes in the cache (less than memcached's 1 MB item
+    limit by default) keeps every other key until it doesn't, doubling its
+    `every`. New rows must sort after the existing ones, as with an
+    auto-incremented primary key or a creation time. Indexes are kept for `timeout` seconds, which bounds how long
+    changes to existing rows' ordering fields, `bulk_create()`,
+    `QuerySet.update()` and changes made by processes that haven't used the
+    index yet go unnoticed.
+    """
+
+    def __init__(
+        self,
+        ordering="pk",
+        every=10,
+        timeout=3600,
+        cache_alias=None,
+        max_size=500000,
+    ):
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        self.ordering = tuple(ordering)
+        self.every = every
+        self.timeout = timeout
+        self.cache_alias = cache_alias
+        self.max_size = max_size
+
+    def get_cache(self):
+        return caches[self.cache_alias or get_cache_alias()]
+
+    def get_cache_key(self, queryset, page_size):
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        digest = hashlib.sha1(
+            repr((queryset.db, sql, params, self.ordering)).encode()
+        ).hexdigest()
+        return "{}:{}:{}:{}".format(INDEX_KEY_PREFIX, digest, page_size, self.every)
+
+    def get_versions(self, queryset):
+        # Kept with the generations, whatever cache the indexes are in.
+        cache = caches[get_cache_alias()]
+        watch(queryset.model, "deletions")
+        deletions_key = get_deletions_key(queryset.model)
+        cache.add(deletions_key, 0, None)
+        return get_generations((queryset.model,))[0], cache.get(deletions_key)
+
+    def get(self, queryset, page_size):
+        """
+        Return the `PageBoundaries` of `queryset`, indexing the rows added
+        since it was last indexed, or all of them if rows were deleted.
+        """
+        key = self.get_cache_key(queryset, page_size)
+        if key is None:
+            return PageBoundaries(queryset, self.ordering, page_size, self.every, [], 0)
+
+        cache = self.get_cache()
+        generation, deletions = self.get_versions(queryset)
+        entry = cache.get(key)
+        if entry is not None and entry["deletions"] != deletions:
+            entry = None
+        if entry is None or entry["generation"] != generation:
+            every = entry["every"] if entry is not None else self.every
+            keys, count = self.extend(queryset, page_size * every, entry)
+            entry = self.shrink(
+                {
+                    "keys": keys,
+                    "count": count,
+                    "every": every,
+                    "generation": generation,
+                    "deletions": deletions,
+                }
+            )
+            cache.set(key, entry, self.timeout)
+        return PageBoundaries(
+            queryset,
+            self.ordering,
+            page_size,
+            entry["every"],
+            entry["keys"],
+            entry["count"],
+        )
+
+    def extend(self, queryset, stride, entry=None):
+        """
+        Return the keys of every `stride`-th row of `queryset` and its count,
+        finding those after the last key of `entry` only.
+        """
+        keys = list(entry["keys"]) if entry is not None else []
+        rows = queryset.order_by(*self.ordering)
+        if keys:
+            rows = rows.filter(seek_filter(self.ordering, keys[-1]))
+        fields = [field.lstrip("-") for field in self.ordering]
+        if not connections[rows.db].features.supports_over_clause:
+            tail = 0
+            for row in rows.values_list(*fields).iterator():
+                tail += 1
+                if tail == stride:
+                    keys.append(row)
+                    tail = 0
+            return keys, len(keys) * stride + tail
+
+        count = len(keys) * stride + rows.count()
+        boundaries = rows.filter(pk__in=self.get_boundaries(rows, stride))
+        keys.extend(boundaries.values_list(*fields))
+        return keys, count
+
+    def get_boundaries(self, rows, stride):
+        """
+        Return a subquery of the primary keys of every `stride`-th row of
+        `rows`, numbered by the database.
+        """
+        connection = connections[rows.db]
+        quote_name = connection.ops.quote_name
+        numbered = rows.order_by().annotate(
+            page_index_row=Window(
+                RowNumber(),
+                order_by=[
+                    F(field[1:]).desc() if field.startswith("-") else F(field).asc()
+                    for field in self.ordering
+                ],
+            )
+        ).values("page_index_row", page_index_pk=F("pk"))
+        sql, params = numbered.query.sql_with_params()
+        row = connection.ops.combine_expression(
+            "%%", [quote_name("page_index_row"), "%s"]
+        )
+        return RawSQL(
+            "SELECT {} FROM ({}) {} WHERE {} = 0".format(
+                quote_name("page_index_pk"),
+                sql,
+                quote_name("page_index"),
+                row,
+            ),
+            params + (stride,),
+        )
+
+    def shrink(self, entry):
+        """
+        Keep every other key of `entry`, doubling its `every`, until it takes
+        at most `max_size` bytes in the cache.
+        """
+        while len(entry["keys"]) > 1 and (
+            len(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)) > self.max_size
+        ):
+            entry["keys"] = entry["keys"][1::2]
+            entry["every"] *= 2
+        return entry
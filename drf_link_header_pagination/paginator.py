@@ -0,0 +1,248 @@
+import asyncio
+from math import ceil
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from .counts import Estimate, ExactCount, LowerBound, acount
+
+__all__ = ["alist", "CountStrategyPaginator"]
+
+
+async def alist(object_list):
+    """
+    Async `list(object_list)`, iterating querysets asynchronously where
+    Django supports it.
+    """
+    if hasattr(object_list, "__aiter__"):
+        return [obj async for obj in object_list]
+    if hasattr(object_list, "query"):
+        # Django < 4.1 can't iterate querysets asynchronously.
+        return await sync_to_async(list)(object_list)
+    return list(object_list)
+
+
+class CountStrategyPaginator(Paginator):
+    """
+    A Django `Paginator` that gets its `count` from a count strategy.
+
+    When the strategy returns `None`, a page is fetched with one extra row to
+    find out whether there is a next page. `count` is then only a lower bound
+    (`count_is_exact` is `False`) and `orphans` is ignored. The same goes for
+    a `LowerBound`, which `count` doesn't go below (`count_is_capped` is
+    `True`), and for an `Estimate`, which is kept as `estimate` for
+    `get_last_page_number()`.
+
+    With a `count_executor` (see `CountExecutor`), the count and the page are
+    fetched concurrently. With `lazy_count`, the page is fetched first, and
+    the count strategy is only used if the page isn't the last one: the
+    count of the last page is its offset plus its length.
+    """
+
+    def __init__(
+        self,
+        object_list,
+        per_page,
+        orphans=0,
+        allow_empty_first_page=True,
+        count_strategy=None,
+        count_executor=None,
+        lazy_count=False,
+    ):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.count_strategy = count_strategy or ExactCount()
+        self.count_executor = count_executor
+        self.lazy_count = lazy_count
+        self.count_is_exact = True
+        self.count_is_capped = False
+        self.estimate = None
+
+    @cached_property
+    def count(self):
+        count = self.count_strategy(self.object_list)
+        self.set_count_kind(count)
+        return count
+
+    def set_count_kind(self, count):
+        self.count_is_capped = isinstance(count, LowerBound)
+        self.estimate = count if isinstance(count, Estimate) else None
+        self.count_is_exact = (
+            count is not None and not self.count_is_capped and self.estimate is None
+        )
+
+    def get_lower_bound(self, bottom, object_list):
+        """
+        Return the lower bound of the count found by fetching `object_list`
+        from `bottom` on, or by the count strategy.
+        """
+        count = bottom + len(object_list)
+        if self.count_is_capped:
+            count = max(self.count, count) if object_list else self.count
+        return int(count)
+
+    @property
+    def num_pages(self):
+        if self.count is None or isinstance(self.count, (LowerBound, Estimate)):
+            # Nothing has been fetched yet (e.g. `?page=last`), so counting
+            # is the only way to find out how many pages there are.
+            self.count = ExactCount()(self.object_list)
+            self.set_count_kind(self.count)
+        if not self.count_is_exact:
+            return ceil(self.count / self.per_page)
+        return super().num_pages
+
+    def get_last_page_number(self):
+        """
+        Return the number of the last page for the `rel="last"` link, from
+        the exact count or an estimate, or `None` if it isn't known.
+        """
+        if self.count_is_exact:
+            return self.num_pages
+        if self.estimate is None:
+            return None
+        # The rows fetched for the page may already show there are more.
+        return ceil(max(self.estimate, self.count) / self.per_page)
+
+    def validate_number(self, number):
+        if self.count is not None and self.count_is_exact:
+            return super().validate_number(number)
+        return self.validate_lower_bound(number)
+
+    def validate_lower_bound(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_("That page number is not an integer"))
+        if number < 1:
+            raise EmptyPage(_("That page number is less than 1"))
+        return number
+
+    def page(self, number):
+        if self.lazy_count and "count" not in self.__dict__:
+            number = self.validate_lower_bound(number)
+            bottom, stop = self.get_fetch_bounds(number)
+            object_list = list(self.object_list[bottom:stop])
+            count = self.get_count_from_rows(number, bottom, stop, object_list)
+            if count is None:
+                count = self.count_strategy(self.object_list)
+            return self.build_page(number, count, object_list)
+        if self.count_executor is not None and "count" not in self.__dict__:
+            number = self.validate_lower_bound(number)
+            bottom, stop = self.get_fetch_bounds(number)
+            count, object_list = self.count_executor.gather(
+                lambda: self.count_strategy(self.object_list),
+                lambda: list(self.object_list[bottom:stop]),
+                using=getattr(self.object_list, "db", None),
+            )
+            return self.build_page(number, count, object_list)
+        if self.count is not None and self.count_is_exact:
+            return super().page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        self.count = self.get_lower_bound(bottom, object_list)
+        return self._get_page(object_list[:self.per_page], number, self)
+
+    def lazy_page(self, number):
+        """
+        Like `page()`, but leave the rows of the page unevaluated. Without
+        an exact count, whether there is a next page is found with an
+        `exists()` query on the row after the page.
+        """
+        if self.count is not None and self.count_is_exact:
+            return super().page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        following = self.object_list[top:top + 1]
+        if hasattr(following, "exists"):
+            has_next = following.exists()
+        else:
+            has_next = bool(len(following))
+        # Only a lower bound, like in `page()`.
+        count = top + 1 if has_next else top
+        if self.count_is_capped:
+            count = max(self.count, count)
+        self.count = int(count)
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+    async def anum_pages(self):
+        """Async `num_pages`, counting asynchronously if needed."""
+        if "count" not in self.__dict__:
+            count = await self.acount(self.count_strategy)
+            if count is None or isinstance(count, (LowerBound, Estimate)):
+                count = await self.acount(ExactCount())
+            self.count = count
+            self.set_count_kind(count)
+        return self.num_pages
+
+    async def acount(self, strategy):
+        """Count `object_list` with `strategy`, on the `count_executor` if any."""
+        return await acount(strategy, self.object_list, self.count_executor)
+
+    async def apage(self, number):
+        """Async `page()`, fetching the count and the page concurrently."""
+        number = self.validate_lower_bound(number)
+        bottom, stop = self.get_fetch_bounds(number)
+        if "count" in self.__dict__:
+            count = self.count
+            object_list = await alist(self.object_list[bottom:stop])
+        elif self.lazy_count:
+            object_list = await alist(self.object_list[bottom:stop])
+            count = self.get_count_from_rows(number, bottom, stop, object_list)
+            if count is None:
+                count = await self.acount(self.count_strategy)
+        else:
+            count, object_list = await asyncio.gather(
+                self.acount(self.count_strategy),
+                alist(self.object_list[bottom:stop]),
+            )
+        return self.build_page(number, count, object_list)
+
+    def get_fetch_bounds(self, number):
+        """
+        Return the slice of rows to fetch for a page when the count isn't
+        known yet: a few extra rows, in case they are orphans of this page.
+        """
+        bottom = (number - 1) * self.per_page
+        return bottom, bottom + self.per_page + max(self.orphans, 1)
+
+    def get_count_from_rows(self, number, bottom, stop, object_list):
+        """
+        Return the exact count if `object_list`, the rows from `bottom` to
+        `stop`, shows where the results end, and `None` otherwise.
+        """
+        if len(object_list) >= stop - bottom:
+            return None
+        if not object_list and number > 1:
+            raise EmptyPage(_("That page contains no results"))
+        return bottom + len(object_list)
+
+    def build_page(self, number, count, object_list):
+        """
+        Build a page from `object_list`, the rows fetched for it per
+        `get_fetch_bounds()`, once `count` is known.
+        """
+        bottom = (number - 1) * self.per_page
+        self.set_count_kind(count)
+        if not self.count_is_exact:
+            if not object_list and number > 1:
+                raise EmptyPage(_("That page contains no results"))
+            # Only a lower bound: the extra rows say whether there's more.
+            self.count = count
+            count = self.get_lower_bound(bottom, object_list)
+        self.count = count
+
+        number = self.validate_number(number)
+        top = bottom + self.per_page
+        if self.count_is_exact and top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(object_list[:max(top - bottom, 0)], number, self)
@@ -0,0 +1,73 @@
+"""
+The receivers keeping the state cached by `PageCache`, `TotalCounter` and
+`PageIndex` up to date.
+
+They are connected for each model by `watch()`, once one of those uses it,
+rather than for every model: a receiver makes every save and delete of its
+model update the cache, and stops Django from deleting its rows in bulk
+without loading them first.
+"""
+from django.db.models.signals import post_delete, post_save
+
+__all__ = ["watch"]
+
+
+def bump_generation_receiver(sender, **kwargs):
+    from .cache import bump_generation
+
+    bump_generation(sender)
+
+
+def count_created_receiver(sender, created, using, **kwargs):
+    from .totals import adjust_total
+
+    if created:
+        adjust_total(sender, using, 1)
+
+
+def count_deleted_receiver(sender, using, **kwargs):
+    from .totals import adjust_total
+
+    adjust_total(sender, using, -1)
+
+
+def page_index_deleted_receiver(sender, **kwargs):
+    from .page_index import count_deletion
+
+    count_deletion(sender)
+
+
+# The receivers keeping each kind of state up to date.
+RECEIVERS = {
+    "generation": (
+        (post_save, bump_generation_receiver),
+        (post_delete, bump_generation_receiver),
+    ),
+    "total": (
+        (post_save, count_created_receiver),
+        (post_delete, count_deleted_receiver),
+    ),
+    "deletions": ((post_delete, page_index_deleted_receiver),),
+}
+
+# The `(model, kind)` pairs whose receivers are connected in this process.
+watched = set()
+
+
+def watch(model, *kinds):
+    """
+    Connect the receivers keeping the given kinds of state (`"generation"`,
+    `"total"` or `"deletions"`) of `model` up to date, if they aren't yet.
+    """
+    for kind in kinds:
+        if (model, kind) in watched:
+            continue
+        for signal, receiver in RECEIVERS[kind]:
+            signal.connect(
+                receiver,
+                sender=model,
+                dispatch_uid="drf_link_header_pagination.{}:{}".format(
+                    receiver.__name__, model._meta.label_lower
+                ),
+            )
+        watched.add((model, kind))
@@ -0,0 +1,45 @@
+"""
+A pytest plugin with a `query_budget` fixture, enabled by adding
+
+    pytest_plugins = ["drf_link_header_pagination.testing"]
+
+to a `conftest.py`.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from .guard import QueryLog
+
+__all__ = ["query_budget"]
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Return a context manager failing the test if the code run in it, e.g. a
+    request made with DRF's `APIClient`, makes more than `max_queries`
+    queries, or repeats a query shape more than `max_repeats` times:
+
+        def test_list(client, query_budget):
+            with query_budget(2):
+                client.get("/items/")
+
+    Queries are counted on the connections named in `using` (all of them by
+    default), on the test's thread. The `QueryLog` is available as the
+    target of the `with` statement.
+    """
+
+    @contextmanager
+    def query_budget(max_queries=None, max_repeats=1, using=None):
+        log = QueryLog(using)
+        log.start()
+        try:
+            yield log
+        finally:
+            log.stop()
+        problems = log.get_problems(max_queries, max_repeats)
+        if problems:
+            pytest.fail("Query budget exceeded: " + "; ".join(problems))
+
+    return query_budget
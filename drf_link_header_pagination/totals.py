@@ -0,0 +1,123 @@
+"""
+Total counts of querysets kept in Django's cache, so that they can be sent
+without counting on the request path.
+
+The total of a queryset that selects a whole table is adjusted when rows are
+created or deleted (see `signals.py`). The totals of other querysets are
+counted again once the generation of their model (see `cache.py`) changes.
+All of them are also counted again every `ttl` seconds, in the background.
+"""
+import hashlib
+import logging
+import time
+
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet
+
+from .cache import get_cache_alias, get_generations
+from .counts import is_unfiltered
+from .signals import watch
+
+__all__ = ["TotalCounter", "adjust_total"]
+
+logger = logging.getLogger(__name__)
+
+TOTAL_KEY_PREFIX = "drf_link_header_pagination.total"
+
+
+def get_table_total_key(model, using):
+    return "{}:{}:{}".format(TOTAL_KEY_PREFIX, using, model._meta.label_lower)
+
+
+def adjust_total(model, using, delta):
+    """Add `delta` to the cached total of the whole table of `model`."""
+    try:
+        caches[get_cache_alias()].incr(get_table_total_key(model, using), delta)
+    except ValueError:
+        # Not counted yet, so there's nothing to adjust.
+        pass
+
+
+class TotalCounter:
+    """
+    Serve the total counts of querysets from the cache, counting them on
+    `executor` (a `CountExecutor`) when they are missing or stale.
+
+    `get()` never counts: until a queryset has been counted once, it returns
+    `None`, and after that it returns the last known total while a fresh
+    one is counted. Rows created with `bulk_create()` or changed with
+    `QuerySet.update()`, and rows changed by processes that haven't used the
+    counter yet, aren't noticed until the total is counted again.
+    """
+
+    def __init__(self, executor, ttl=60, timeout=None):
+        self.executor = executor
+        self.ttl = ttl
+        self.timeout = timeout
+
+    def get_cache(self):
+        return caches[get_cache_alias()]
+
+    def get_cache_key(self, queryset):
+        query = getattr(queryset, "query", None)
+        if query is None:
+            return None
+        if is_unfiltered(query):
+            watch(queryset.model, "total")
+            return get_table_total_key(queryset.model, queryset.db)
+        try:
+            sql, params = queryset.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        digest = hashlib.sha1(repr((queryset.db, sql, params)).encode()).hexdigest()
+        return "{}:{}".format(TOTAL_KEY_PREFIX, digest)
+
+    def get_generation(self, queryset):
+        """
+        Return the generation a total of `queryset` depends on, or `None`
+        for totals that are adjusted instead.
+        """
+        if is_unfiltered(queryset.query):
+            return None
+        return get_generations((queryset.model,))[0]
+
+    def get(self, queryset):
+        """Return the cached total of `queryset`, or `None`."""
+        key = self.get_cache_key(queryset)
+        if key is None:
+            return None
+
+        meta_key = key + ":meta"
+        cached = self.get_cache().get_many([key, meta_key])
+        total = cached.get(key)
+        if total is None or meta_key not in cached or self.is_stale(
+            queryset, cached[meta_key]
+        ):
+            self.schedule_refresh(queryset, key)
+        return total
+
+    def is_stale(self, queryset, meta):
+        counted_at, generation = meta
+        if time.time() - counted_at >= self.ttl:
+            return True
+        return generation is not None and generation != self.get_generation(queryset)
+
+    def schedule_refresh(self, queryset, key):
+        # Only one refresh at a time, across processes.
+        if self.get_cache().add(key + ":refreshing", True, self.ttl):
+            self.executor.submit(self.refresh, queryset, key)
+
+    def refresh(self, queryset, key):
+        cache = self.get_cache()
+        try:
+            # Read the generation first, so that writes made while counting
+            # make the total stale.
+            generation = self.get_generation(queryset)
+            total = queryset.order_by().count()
+            cache.set_many(
+                {key: total, key + ":meta": (time.time(), generation)}, self.timeout
+            )
+        except Exception:
+            logger.exception("Counting the total of %s failed", key)
+        finally:
+            cache.delete(key + ":refreshing")
@@ -1,3 +1,6 @@
+import pytest
+
+
 def pytest_configure():
     from django.conf import settings
 
@@ -5,6 +8,17 @@ def pytest_configure():
         DEBUG_PROPAGATE_EXCEPTIONS=True,
         SITE_ID=1,
         SECRET_KEY="not very secret in tests",
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": ":memory:",
+            },
+            "replica": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": ":memory:",
+            },
+        },
+        DEFAULT_AUTO_FIELD="django.db.models.AutoField",
         USE_I18N=True,
         STATIC_URL="/static/",
         ROOT_URLCONF="tests.urls",
@@ -54,3 +68,13 @@ def pytest_configure():
         django.setup()
     except AttributeError:
         pass
+
+
+@pytest.fixture
+def items(db):
+    """The 23 items most tests paginate, with `created` and `value` 1 to 23."""
+    from .models import Item
+
+    return Item.objects.bulk_create(
+        Item(created=idx, value=idx) for idx in range(1, 24)
+    )
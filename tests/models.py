@@ -0,0 +1,23 @@
+from django.db import models
+
+
+class Item(models.Model):
+    created = models.IntegerField(unique=True)
+    value = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created"]
+
+
+class Document(models.Model):
+    """A wide model, with large fields that list views usually leave out."""
+
+    created = models.IntegerField(unique=True)
+    title = models.CharField(max_length=100)
+    body = models.TextField()
+    metadata = models.JSONField(default=dict)
+    item = models.ForeignKey(Item, null=True, on_delete=models.SET_NULL)
+
+    class Meta:
+        ordering = ["created"]
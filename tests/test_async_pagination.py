@@ -0,0 +1,175 @@
+from urllib import parse
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .mocks import MockObject, MockQuerySet
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("items")
+class TestAsyncPagination:
+    """
+    Unit tests for `apaginate_queryset()`, comparing it with the sync version.
+    """
+
+    def setup(self):
+        self.queryset = Item.objects.all()
+
+    def compare(self, pagination_class, params, queryset=None):
+        if queryset is None:
+            queryset = self.queryset
+        request = Request(factory.get("/", params))
+        pagination = pagination_class()
+        expected = list(pagination.paginate_queryset(queryset, request))
+        expected_link = pagination.get_paginated_response(expected).get("Link")
+
+        page, link = self.apaginate(pagination_class(), queryset, request)
+        assert page == expected
+        assert link == expected_link
+        return [item.value for item in page]
+
+    def apaginate(self, pagination, queryset, request):
+        # The links are built in the event loop too, where queries would fail.
+        async def paginate():
+            page = await pagination.apaginate_queryset(queryset, request)
+            return page, pagination.get_paginated_response(page).get("Link")
+
+        return async_to_sync(paginate)()
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            ({}, [1, 2, 3, 4, 5]),
+            ({"page": 2}, [6, 7, 8, 9, 10]),
+            ({"page": "last"}, [21, 22, 23]),
+        ],
+    )
+    def test_page_number(self, params, expected):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+
+        assert self.compare(ExamplePagination, params) == expected
+
+    def test_page_number_no_count(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            count_strategy = drf_link_header_pagination.NoCount()
+
+        assert self.compare(ExamplePagination, {"page": 3}) == [11, 12, 13, 14, 15]
+
+    def test_page_number_capped_count(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            count_strategy = drf_link_header_pagination.CappedCount(cap=10)
+
+        assert self.compare(ExamplePagination, {"page": 3}) == [11, 12, 13, 14, 15]
+
+    def test_page_number_last_estimate(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+
+            def count_strategy(self, queryset):
+                return drf_link_header_pagination.Estimate(30)
+
+        assert self.compare(ExamplePagination, {"page": "last"}) == [21, 22, 23]
+
+    def test_page_number_orphans(self):
+        class ExamplePaginator(drf_link_header_pagination.CountStrategyPaginator):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, orphans=3, **kwargs)
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            django_paginator_class = ExamplePaginator
+
+        assert self.compare(ExamplePagination, {"page": 4}) == list(range(16, 24))
+
+    def test_page_number_invalid_page(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+
+        request = Request(factory.get("/", {"page": 6}))
+        with pytest.raises(exceptions.NotFound):
+            async_to_sync(ExamplePagination().apaginate_queryset)(self.queryset, request)
+
+    @pytest.mark.parametrize("params", [{}, {"offset": 8}, {"offset": 20}, {"offset": 40}])
+    def test_limit_offset(self, params):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+            default_limit = 4
+            deferred_join = True
+
+        self.compare(ExamplePagination, params)
+
+    def test_limit_offset_no_count(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+            default_limit = 4
+            count_strategy = drf_link_header_pagination.NoCount()
+
+        assert self.compare(ExamplePagination, {"offset": 4}) == [5, 6, 7, 8]
+
+    def test_limit_offset_capped_count(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+            default_limit = 4
+            count_strategy = drf_link_header_pagination.CappedCount(cap=10)
+
+        assert self.compare(ExamplePagination, {"offset": 4}) == [5, 6, 7, 8]
+
+    def test_page_number_page_index(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            page_index = drf_link_header_pagination.PageIndex(every=1)
+
+        assert self.compare(ExamplePagination, {"page": 3}) == [11, 12, 13, 14, 15]
+
+    @pytest.mark.parametrize(
+        "params", [{"offset": 8}, {"after": 12}, {"offset": 4, "shards": 3}]
+    )
+    def test_limit_offset_max_offset(self, params):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+            default_limit = 4
+            max_offset = 8
+            shard_query_param = "shards"
+
+        self.compare(ExamplePagination, params)
+
+    @pytest.mark.parametrize(
+        "pagination",
+        [
+            drf_link_header_pagination.LinkHeaderPagination,
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination,
+            drf_link_header_pagination.LinkHeaderCursorPagination,
+        ],
+    )
+    def test_query_guard(self, pagination):
+        class ExamplePagination(pagination):
+            page_size = 5
+            ordering = "created"
+            query_guard = drf_link_header_pagination.QueryGuard()
+
+        request = Request(factory.get("/"))
+        with pytest.raises(ImproperlyConfigured):
+            self.apaginate(ExamplePagination(), self.queryset, request)
+
+    def test_cursor(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderCursorPagination):
+            page_size = 5
+            ordering = "created"
+
+        queryset = MockQuerySet([MockObject(idx) for idx in range(1, 12)])
+        assert self.compare(ExamplePagination, {}, queryset) == [1, 2, 3, 4, 5]
+
+        request = Request(factory.get("/"))
+        pagination = ExamplePagination()
+        pagination.paginate_queryset(self.queryset, request)
+        params = parse.parse_qs(parse.urlsplit(pagination.get_next_link()).query)
+        assert self.compare(ExamplePagination, params) == [6, 7, 8, 9, 10]
@@ -0,0 +1,136 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+from drf_link_header_pagination.batch import batch_count
+from drf_link_header_pagination.guard import GuardedLog
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["created"]
+
+
+class PagePagination(drf_link_header_pagination.LinkHeaderPagination):
+    page_size = 5
+
+
+class LimitOffsetPagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+    default_limit = 3
+
+
+class CursorPagination(drf_link_header_pagination.LinkHeaderCursorPagination):
+    page_size = 4
+    ordering = "created"
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("items")
+class TestBatchListModelMixin:
+    """
+    Unit tests for paginating several collections with `BatchListModelMixin`.
+    """
+
+    def setup(self):
+        class Dashboard(drf_link_header_pagination.BatchListModelMixin, generics.GenericAPIView):
+            def get_collections(self):
+                Collection = drf_link_header_pagination.Collection
+                return {
+                    "small": Collection(
+                        Item.objects.filter(value__lte=12), ItemSerializer, PagePagination
+                    ),
+                    "large": Collection(
+                        Item.objects.filter(value__gt=12),
+                        ItemSerializer,
+                        LimitOffsetPagination,
+                    ),
+                    "all": Collection(Item.objects.all(), ItemSerializer, CursorPagination),
+                }
+
+            def get(self, request, *args, **kwargs):
+                return self.list(request, *args, **kwargs)
+
+        self.view = Dashboard.as_view()
+
+    def get(self, params=None):
+        response = self.view(factory.get("/", params or {}))
+        assert response.status_code == 200
+        return response.data
+
+    def get_results(self, data, name):
+        return [item["created"] for item in data[name]["results"]]
+
+    def test_first_pages(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get()
+        # One query for both counts, and one for each page.
+        assert len(queries) == 4
+        assert "UNION ALL" in queries[0]["sql"]
+
+        assert self.get_results(data, "small") == [1, 2, 3, 4, 5]
+        assert data["small"]["link"] == (
+            '<http://testserver/?small.page=2>; rel="next", '
+            '<http://testserver/?small.page=3>; rel="last"'
+        )
+        assert self.get_results(data, "large") == [13, 14, 15]
+        assert data["large"]["link"] == (
+            '<http://testserver/?large.limit=3&large.offset=3>; rel="next", '
+            '<http://testserver/?large.limit=3>; rel="first", '
+            '<http://testserver/?large.limit=3&large.offset=9>; rel="last"'
+        )
+        assert self.get_results(data, "all") == [1, 2, 3, 4]
+        assert 'rel="next"' in data["all"]["link"]
+        assert "?all.cursor=" in data["all"]["link"]
+
+    def test_prefixed_params(self):
+        data = self.get({"small.page": 3, "large.offset": 9, "page": 2})
+        assert self.get_results(data, "small") == [11, 12]
+        assert data["small"]["link"] == (
+            '<http://testserver/?large.offset=9&page=2&small.page=2>; rel="prev", '
+            '<http://testserver/?large.offset=9&page=2>; rel="first"'
+        )
+        assert self.get_results(data, "large") == [22, 23]
+        assert self.get_results(data, "all") == [1, 2, 3, 4]
+
+    def test_query_guard(self):
+        class GuardedPagination(PagePagination):
+            query_guard = drf_link_header_pagination.QueryGuard(
+                max_queries=0, action="raise"
+            )
+
+        class Dashboard(drf_link_header_pagination.BatchListModelMixin, generics.GenericAPIView):
+            def get_collections(self):
+                return {
+                    "items": drf_link_header_pagination.Collection(
+                        Item.objects.all(), ItemSerializer, GuardedPagination
+                    ),
+                }
+
+            def get(self, request, *args, **kwargs):
+                return self.list(request, *args, **kwargs)
+
+        with pytest.raises(drf_link_header_pagination.QueryBudgetExceeded):
+            Dashboard.as_view()(factory.get("/"))
+        assert not any(isinstance(w, GuardedLog) for w in connection.execute_wrappers)
+
+
+def test_batch_count(items):
+    with CaptureQueriesContext(connection) as queries:
+        counts = batch_count(
+            [
+                Item.objects.filter(value__gt=20),
+                Item.objects.none(),
+                Item.objects.order_by("-value")[:5],
+                Item.objects.filter(value__in=[1, 2]).distinct(),
+            ]
+        )
+    assert counts == [3, 0, 5, 2]
+    assert len(queries) == 1
@@ -0,0 +1,130 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.urls import path
+from rest_framework import generics, serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+from drf_link_header_pagination.client import (
+    aiter_items,
+    iter_items,
+    iter_pages,
+    parse_link_header,
+)
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["created"]
+
+
+class PagePagination(drf_link_header_pagination.LinkHeaderPagination):
+    page_size = 5
+
+
+class CursorPagination(drf_link_header_pagination.LinkHeaderLinkResponseCursorPagination):
+    page_size = 4
+    ordering = "created"
+
+
+class ItemList(generics.ListAPIView):
+    queryset = Item.objects.all()
+    serializer_class = ItemSerializer
+    pagination_class = PagePagination
+
+
+class CursorItemList(ItemList):
+    pagination_class = CursorPagination
+
+
+urlpatterns = [
+    path("items/", ItemList.as_view()),
+    path("cursor-items/", CursorItemList.as_view()),
+]
+
+
+class TestParseLinkHeader:
+    """
+    Unit tests for `parse_link_header()`.
+    """
+
+    def test_get_headers(self):
+        pagination = drf_link_header_pagination.LinkHeaderLimitOffsetPagination()
+        pagination.default_limit = 5
+        request = Request(factory.get("/", {"offset": 10, "q": "a, <b>; c"}))
+        pagination.paginate_queryset(list(range(100)), request)
+        links = parse_link_header(pagination.get_headers()["Link"])
+        assert links == {
+            "prev": "http://testserver/?limit=5&offset=5&q=a%2C+%3Cb%3E%3B+c",
+            "next": "http://testserver/?limit=5&offset=15&q=a%2C+%3Cb%3E%3B+c",
+            "first": "http://testserver/?limit=5&q=a%2C+%3Cb%3E%3B+c",
+            "last": "http://testserver/?limit=5&offset=95&q=a%2C+%3Cb%3E%3B+c",
+        }
+
+    def test_empty(self):
+        assert parse_link_header("") == {}
+        assert parse_link_header(None) == {}
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_link_header("<http://testserver/>; rel=next")
+
+
+@pytest.mark.urls(__name__)
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("items")
+class TestIterPages:
+    """
+    Tests for following the links of a live server with `iter_pages()`.
+    """
+
+    def test_iter_items(self, live_server):
+        items = list(iter_items(live_server.url + "/items/"))
+        assert [item["created"] for item in items] == list(range(1, 24))
+
+    def test_iter_pages(self, live_server):
+        pages = list(iter_pages(live_server.url + "/items/?page=3"))
+        assert [page.url for page in pages] == [
+            live_server.url + "/items/?page=3",
+            live_server.url + "/items/?page=4",
+            live_server.url + "/items/?page=5",
+        ]
+        assert pages[0].links["last"] == live_server.url + "/items/?page=5"
+
+    def test_results_in_body(self, live_server):
+        items = list(iter_items(live_server.url + "/cursor-items/"))
+        assert [item["created"] for item in items] == list(range(1, 24))
+
+    def test_aiter_items(self, live_server):
+        async def collect():
+            return [item async for item in aiter_items(live_server.url + "/items/")]
+
+        items = async_to_sync(collect)()
+        assert [item["created"] for item in items] == list(range(1, 24))
+
+
+def test_prefetch():
+    fetched = threading.Event()
+    urls = []
+
+    def fetch(url):
+        urls.append(url)
+        if url == "/2":
+            fetched.set()
+            return [2], ""
+        return [1], '</2>; rel="next"'
+
+    pages = iter_pages("/1", fetch)
+    assert next(pages).data == [1]
+    # The second page is fetched before it is asked for.
+    assert fetched.wait(5)
+    assert next(pages).data == [2]
+    assert urls == ["/1", "/2"]
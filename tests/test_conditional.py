@@ -0,0 +1,123 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["created", "value"]
+
+    def to_representation(self, instance):
+        self.context["serialized"].append(instance.pk)
+        return super().to_representation(instance)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("items")
+class TestConditionalListModelMixin:
+    """
+    Unit tests for conditional requests with `ConditionalListModelMixin`.
+    """
+
+    def setup(self):
+        self.serialized = []
+        serialized = self.serialized
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            collection_validator = drf_link_header_pagination.PageHash(
+                fields=("pk", "value")
+            )
+
+        class ItemList(
+            drf_link_header_pagination.ConditionalListModelMixin, generics.ListAPIView
+        ):
+            queryset = Item.objects.all()
+            serializer_class = ItemSerializer
+            pagination_class = ExamplePagination
+
+            def get_serializer_context(self):
+                return dict(super().get_serializer_context(), serialized=serialized)
+
+        self.pagination_class = ExamplePagination
+        self.view = ItemList.as_view()
+
+    def get(self, params, **headers):
+        del self.serialized[:]
+        return self.view(factory.get("/", params, **headers))
+
+    def test_etag(self):
+        response = self.get({"page": 2})
+        assert response.status_code == 200
+        assert response["ETag"].startswith('"')
+        assert len(self.serialized) == 5
+
+        response = self.get({"page": 2}, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 304
+        assert response["Link"] == (
+            '<http://testserver/>; rel="prev", '
+            '<http://testserver/?page=3>; rel="next", '
+            '<http://testserver/>; rel="first", '
+            '<http://testserver/?page=5>; rel="last"'
+        )
+        assert self.serialized == []
+
+    def test_etag_changes(self):
+        etag = self.get({"page": 2})["ETag"]
+        Item.objects.filter(created=7).update(value=70)
+        response = self.get({"page": 2}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_etag_changes_with_links(self):
+        etag = self.get({"page": 2})["ETag"]
+        Item.objects.create(created=24, value=24)
+        Item.objects.create(created=25, value=25)
+        Item.objects.create(created=26, value=26)
+        response = self.get({"page": 2}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_last_modified(self):
+        self.pagination_class.collection_validator = (
+            drf_link_header_pagination.LastModified()
+        )
+        response = self.get({"page": 2})
+        assert response.status_code == 200
+        assert "Last-Modified" in response
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(
+                {"page": 2}, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+            )
+        assert response.status_code == 304
+        assert "Link" in response
+        # The count, the page and the aggregate.
+        assert len(queries) == 3
+
+        Item.objects.get(created=1).delete()
+        response = self.get({"page": 2}, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert response.status_code == 200
+
+    def test_links_built_once(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderKeysetPagination):
+            page_size = 5
+            collection_validator = drf_link_header_pagination.PageHash(
+                fields=("pk", "value")
+            )
+
+        self.view.view_class.pagination_class = ExamplePagination
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get({})
+        assert response.status_code == 200
+        assert '<http://testserver/?after=18>; rel="last"' in response["Link"]
+        # The page, and the row the last page starts after.
+        assert len(queries) == 2
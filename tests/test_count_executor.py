@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+class RecordingCount(drf_link_header_pagination.ExactCount):
+    def __init__(self):
+        self.threads = []
+        self.thread_names = []
+
+    def __call__(self, queryset):
+        self.threads.append(threading.get_ident())
+        self.thread_names.append(threading.current_thread().name)
+        return super().__call__(queryset)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("items")
+class TestCountExecutor:
+    """
+    Unit tests for paginating with a `CountExecutor`.
+    """
+
+    def setup(self):
+        self.executor = drf_link_header_pagination.CountExecutor(max_workers=2)
+        self.count_strategy = RecordingCount()
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            count_strategy = self.count_strategy
+            count_executor = self.executor
+
+        class ExampleLimitOffsetPagination(
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination
+        ):
+            default_limit = 4
+            count_strategy = self.count_strategy
+            count_executor = self.executor
+
+        self.pagination = ExamplePagination()
+        self.limit_offset_pagination = ExampleLimitOffsetPagination()
+        self.queryset = Item.objects.all()
+
+    def teardown(self):
+        self.executor.shutdown()
+
+    def paginate(self, pagination, params):
+        request = Request(factory.get("/", params))
+        page = pagination.paginate_queryset(self.queryset, request)
+        response = pagination.get_paginated_response(page)
+        return [item.value for item in page], response["Link"]
+
+    def test_page_number(self):
+        page, link = self.paginate(self.pagination, {"page": 2})
+        assert page == [6, 7, 8, 9, 10]
+        assert link == (
+            '<http://testserver/>; rel="prev", '
+            '<http://testserver/?page=3>; rel="next", '
+            '<http://testserver/>; rel="first", '
+            '<http://testserver/?page=5>; rel="last"'
+        )
+        assert self.count_strategy.threads != [threading.get_ident()]
+
+    def test_limit_offset(self):
+        page, link = self.paginate(self.limit_offset_pagination, {"offset": 20})
+        assert page == [21, 22, 23]
+        assert link == (
+            '<http://testserver/?limit=4&offset=16>; rel="prev", '
+            '<http://testserver/?limit=4>; rel="first"'
+        )
+        assert self.count_strategy.threads != [threading.get_ident()]
+
+    @pytest.mark.parametrize("params", [{"page": 2}, {"page": "last"}, {"offset": 8}])
+    def test_async(self, params):
+        if "page" in params:
+            pagination = self.pagination
+        else:
+            pagination = self.limit_offset_pagination
+        request = Request(factory.get("/", params))
+        page = async_to_sync(pagination.apaginate_queryset)(self.queryset, request)
+        assert len(page) in (3, 4, 5)
+        assert self.count_strategy.thread_names
+        assert all(
+            name.startswith("drf_link_header_pagination.count")
+            for name in self.count_strategy.thread_names
+        )
+
+    def test_serial_in_transaction(self):
+        with transaction.atomic():
+            Item.objects.create(created=24, value=24)
+            page, link = self.paginate(self.limit_offset_pagination, {"offset": 20})
+        assert page == [21, 22, 23, 24]
+        assert self.count_strategy.threads == [threading.get_ident()]
@@ -0,0 +1,429 @@
+import json
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+from drf_link_header_pagination import counts
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+@pytest.fixture
+def items(db):
+    Item.objects.bulk_create(Item(created=idx, value=idx) for idx in range(1, 101))
+    cache.clear()
+    return Item.objects.all()
+
+
+class TestNoCount:
+    """
+    Unit tests for paginating with the `NoCount` count strategy.
+    """
+
+    def setup(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            count_strategy = drf_link_header_pagination.NoCount()
+
+        class ExampleLimitOffsetPagination(
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination
+        ):
+            default_limit = 4
+            count_strategy = drf_link_header_pagination.NoCount()
+
+        self.pagination = ExamplePagination()
+        self.limit_offset_pagination = ExampleLimitOffsetPagination()
+        self.queryset = range(1, 101)
+
+    def test_page_number(self):
+        request = Request(factory.get("/", {"page": 2}))
+        queryset = list(self.pagination.paginate_queryset(self.queryset, request))
+        response = self.pagination.get_paginated_response(queryset)
+        assert queryset == [6, 7, 8, 9, 10]
+        assert response["Link"] == (
+            '<http://testserver/>; rel="prev", '
+            '<http://testserver/?page=3>; rel="next", '
+            '<http://testserver/>; rel="first"'
+        )
+
+    def test_page_number_last_page(self):
+        request = Request(factory.get("/", {"page": 20}))
+        queryset = list(self.pagination.paginate_queryset(self.queryset, request))
+        response = self.pagination.get_paginated_response(queryset)
+        assert queryset == [96, 97, 98, 99, 100]
+        assert response["Link"] == (
+            '<http://testserver/?page=19>; rel="prev", '
+            '<http://testserver/>; rel="first"'
+        )
+
+    def test_page_number_last_page_string_counts(self):
+        request = Request(factory.get("/", {"page": "last"}))
+        queryset = list(self.pagination.paginate_queryset(self.queryset, request))
+        assert queryset == [96, 97, 98, 99, 100]
+
+    def test_limit_offset(self):
+        request = Request(factory.get("/", {"offset": 4}))
+        pagination = self.limit_offset_pagination
+        queryset = pagination.paginate_queryset(self.queryset, request)
+        response = pagination.get_paginated_response(queryset)
+        assert queryset == [5, 6, 7, 8]
+        assert response["Link"] == (
+            '<http://testserver/?limit=4>; rel="prev", '
+            '<http://testserver/?limit=4&offset=8>; rel="next", '
+            '<http://testserver/?limit=4>; rel="first"'
+        )
+
+    def test_limit_offset_last_page(self):
+        request = Request(factory.get("/", {"offset": 96}))
+        pagination = self.limit_offset_pagination
+        queryset = pagination.paginate_queryset(self.queryset, request)
+        response = pagination.get_paginated_response(queryset)
+        assert queryset == [97, 98, 99, 100]
+        assert response["Link"] == (
+            '<http://testserver/?limit=4&offset=92>; rel="prev", '
+            '<http://testserver/?limit=4>; rel="first"'
+        )
+
+
+def test_no_count_runs_no_count_query(items):
+    class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+        page_size = 5
+        count_strategy = drf_link_header_pagination.NoCount()
+
+    request = Request(factory.get("/"))
+    with CaptureQueriesContext(connection) as queries:
+        page = ExamplePagination().paginate_queryset(items, request)
+    assert [item.value for item in page] == [1, 2, 3, 4, 5]
+    assert len(queries) == 1
+    assert "COUNT" not in queries[0]["sql"]
+
+
+def test_cached_count(items):
+    strategy = drf_link_header_pagination.CachedCount(timeout=60)
+    with CaptureQueriesContext(connection) as queries:
+        assert strategy(items.filter(value__gt=50)) == 50
+        assert strategy(items.filter(value__gt=50).order_by("-created")) == 50
+    assert len(queries) == 1
+
+    with CaptureQueriesContext(connection) as queries:
+        assert strategy(items.filter(value__gt=90)) == 10
+    assert len(queries) == 1
+
+
+def test_cached_count_without_queryset():
+    strategy = drf_link_header_pagination.CachedCount()
+    assert strategy(range(10)) == 10
+
+
+def test_estimated_count_falls_back_to_exact_count(items):
+    strategy = drf_link_header_pagination.EstimatedCount()
+    assert strategy(items.filter(value__lte=10)) == 10
+
+
+class TestEstimatedCountPostgreSQL:
+    """
+    Unit tests for the estimates of `EstimatedCount`, with a mocked
+    PostgreSQL connection.
+    """
+
+    def estimate(self, queryset, *rows, **kwargs):
+        connection = mock.MagicMock(vendor="postgresql")
+        connection.ops.quote_name.side_effect = '"{}"'.format
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.side_effect = rows
+        strategy = drf_link_header_pagination.EstimatedCount(**kwargs)
+        with mock.patch.object(counts, "connections", {"default": connection}):
+            count = strategy(queryset)
+        return count, [call[0] for call in cursor.execute.call_args_list]
+
+    def test_unfiltered(self, items):
+        count, queries = self.estimate(items, (50000,))
+        assert count == 50000
+        assert isinstance(count, drf_link_header_pagination.Estimate)
+        assert queries == [
+            (
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                ['"tests_item"'],
+            )
+        ]
+
+    def test_never_analyzed(self, items):
+        plan = [{"Plan": {"Plan Rows": 20000}}]
+        count, queries = self.estimate(items, (-1,), (plan,))
+        assert count == 20000
+        assert queries[1][0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+    def test_filtered(self, items):
+        plan = json.dumps([{"Plan": {"Plan Rows": 30000.0}}])
+        count, queries = self.estimate(items.filter(value__gt=10), (plan,))
+        assert count == 30000
+        assert isinstance(count, drf_link_header_pagination.Estimate)
+        assert len(queries) == 1
+        assert queries[0][0].startswith("EXPLAIN (FORMAT JSON) SELECT")
+
+    def test_under_threshold(self, items):
+        plan = [{"Plan": {"Plan Rows": 20}}]
+        count, queries = self.estimate(items.filter(value__gt=10), (plan,))
+        assert count == 90
+        assert not isinstance(count, drf_link_header_pagination.Estimate)
+
+    def test_empty_result(self, items):
+        count, queries = self.estimate(items.filter(pk__in=[]), threshold=0)
+        assert count == 0
+        assert queries == []
+
+
+class UnderEstimatedCount:
+    def __call__(self, queryset):
+        return drf_link_header_pagination.Estimate(45)
+
+
+class TestEstimate:
+    """
+    Unit tests for paginating with a count strategy returning an `Estimate`.
+    """
+
+    def setup(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 10
+            count_strategy = UnderEstimatedCount()
+
+        class ExampleLimitOffsetPagination(
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination
+        ):
+            default_limit = 10
+            count_strategy = UnderEstimatedCount()
+
+        self.pagination = ExamplePagination()
+        self.limit_offset_pagination = ExampleLimitOffsetPagination()
+        self.queryset = range(1, 101)
+
+    def paginate(self, pagination, params):
+        request = Request(factory.get("/", params))
+        queryset = list(pagination.paginate_queryset(self.queryset, request))
+        return queryset, pagination.get_paginated_response(queryset)
+
+    def test_page_number_first_page(self):
+        queryset, response = self.paginate(self.pagination, {})
+        assert queryset == list(range(1, 11))
+        assert response["Link"] == (
+            '<http://testserver/?page=2>; rel="next", '
+            '<http://testserver/?page=5>; rel="last"'
+        )
+
+    def test_page_number_past_estimate(self):
+        queryset, response = self.paginate(self.pagination, {"page": 5})
+        assert queryset == list(range(41, 51))
+        assert '<http://testserver/?page=6>; rel="next"' in response["Link"]
+        assert '<http://testserver/?page=6>; rel="last"' in response["Link"]
+
+        queryset, response = self.paginate(self.pagination, {"page": 10})
+        assert queryset == list(range(91, 101))
+        assert response["Link"] == (
+            '<http://testserver/?page=9>; rel="prev", '
+            '<http://testserver/>; rel="first"'
+        )
+        assert not response.has_header("X-Total-Count-Lower-Bound")
+
+    def test_page_number_past_end(self):
+        with pytest.raises(NotFound):
+            self.paginate(self.pagination, {"page": 11})
+
+    def test_page_number_last_page_string_counts(self):
+        queryset, response = self.paginate(self.pagination, {"page": "last"})
+        assert queryset == list(range(91, 101))
+
+    def test_limit_offset_past_estimate(self):
+        pagination = self.limit_offset_pagination
+        queryset, response = self.paginate(pagination, {"offset": 40})
+        assert queryset == list(range(41, 51))
+        assert '<http://testserver/?limit=10&offset=50>; rel="next"' in response["Link"]
+        assert '<http://testserver/?limit=10&offset=50>; rel="last"' in response["Link"]
+
+        queryset, response = self.paginate(pagination, {"offset": 90})
+        assert queryset == list(range(91, 101))
+        assert 'rel="next"' not in response["Link"]
+        assert 'rel="last"' not in response["Link"]
+
+
+class TestCappedCount:
+    """
+    Unit tests for paginating with the `CappedCount` count strategy.
+    """
+
+    def setup(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            count_strategy = drf_link_header_pagination.CappedCount(cap=30)
+
+        class ExampleLimitOffsetPagination(
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination
+        ):
+            default_limit = 4
+            count_strategy = drf_link_header_pagination.CappedCount(cap=30)
+
+        self.pagination = ExamplePagination()
+        self.limit_offset_pagination = ExampleLimitOffsetPagination()
+        self.queryset = range(1, 101)
+
+    def test_strategy(self):
+        strategy = drf_link_header_pagination.CappedCount(cap=30)
+        assert strategy(range(10)) == 10
+        assert not isinstance(strategy(range(10)), drf_link_header_pagination.LowerBound)
+        assert strategy(range(100)) == 30
+        assert isinstance(strategy(range(100)), drf_link_header_pagination.LowerBound)
+
+    def test_page_number(self):
+        request = Request(factory.get("/", {"page": 2}))
+        queryset = list(self.pagination.paginate_queryset(self.queryset, request))
+        response = self.pagination.get_paginated_response(queryset)
+        assert queryset == [6, 7, 8, 9, 10]
+        assert response["Link"] == (
+            '<http://testserver/>; rel="prev", '
+            '<http://testserver/?page=3>; rel="next", '
+            '<http://testserver/>; rel="first"'
+        )
+        assert response["X-Total-Count-Lower-Bound"] == "30"
+
+    def test_page_number_past_cap(self):
+        request = Request(factory.get("/", {"page": 10}))
+        queryset = list(self.pagination.paginate_queryset(self.queryset, request))
+        response = self.pagination.get_paginated_response(queryset)
+        assert queryset == [46, 47, 48, 49, 50]
+        assert '<http://testserver/?page=11>; rel="next"' in response["Link"]
+        assert response["X-Total-Count-Lower-Bound"] == "51"
+
+    def test_page_number_under_cap(self):
+        request = Request(factory.get("/", {"page": 2}))
+        queryset = list(self.pagination.paginate_queryset(range(1, 21), request))
+        response = self.pagination.get_paginated_response(queryset)
+        assert '<http://testserver/?page=4>; rel="last"' in response["Link"]
+        assert not response.has_header("X-Total-Count-Lower-Bound")
+
+    def test_limit_offset(self):
+        request = Request(factory.get("/", {"offset": 4}))
+        pagination = self.limit_offset_pagination
+        queryset = pagination.paginate_queryset(self.queryset, request)
+        response = pagination.get_paginated_response(queryset)
+        assert queryset == [5, 6, 7, 8]
+        assert response["Link"] == (
+            '<http://testserver/?limit=4>; rel="prev", '
+            '<http://testserver/?limit=4&offset=8>; rel="next", '
+            '<http://testserver/?limit=4>; rel="first"'
+        )
+        assert response["X-Total-Count-Lower-Bound"] == "30"
+
+    def test_limit_offset_past_end(self):
+        request = Request(factory.get("/", {"offset": 200}))
+        pagination = self.limit_offset_pagination
+        queryset = pagination.paginate_queryset(self.queryset, request)
+        response = pagination.get_paginated_response(queryset)
+        assert queryset == []
+        assert response["X-Total-Count-Lower-Bound"] == "30"
+
+
+def test_capped_count_query(items):
+    class ExamplePagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+        default_limit = 5
+        count_strategy = drf_link_header_pagination.CappedCount(cap=20)
+
+    request = Request(factory.get("/", {"offset": 10}))
+    with CaptureQueriesContext(connection) as queries:
+        page = ExamplePagination().paginate_queryset(items, request)
+    assert [item.value for item in page] == [11, 12, 13, 14, 15]
+    assert len(queries) == 2
+    assert "COUNT" in queries[0]["sql"]
+    assert "LIMIT 20" in queries[0]["sql"]
+
+
+class TestLazyCount:
+    """
+    Unit tests for `LinkHeaderPagination` with `lazy_count`.
+    """
+
+    def setup(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 10
+            lazy_count = True
+
+        self.pagination_class = ExamplePagination
+
+    def paginate(self, queryset, params=None):
+        request = Request(factory.get("/", params))
+        pagination = self.pagination_class()
+        with CaptureQueriesContext(connection) as queries:
+            page = pagination.paginate_queryset(queryset, request)
+            response = pagination.get_paginated_response(page)
+        counts = [query for query in queries if "COUNT" in query["sql"]]
+        return [item.value for item in page], response.get("Link"), len(counts)
+
+    def test_single_page(self, items):
+        page, link, counts = self.paginate(items.filter(value__lte=7))
+        assert page == [1, 2, 3, 4, 5, 6, 7]
+        assert link is None
+        assert counts == 0
+
+    def test_empty(self, items):
+        page, link, counts = self.paginate(items.none())
+        assert page == []
+        assert counts == 0
+
+    def test_last_page(self, items):
+        page, link, counts = self.paginate(items.filter(value__lte=25), {"page": 3})
+        assert page == [21, 22, 23, 24, 25]
+        assert link == (
+            '<http://testserver/?page=2>; rel="prev", '
+            '<http://testserver/>; rel="first"'
+        )
+        assert counts == 0
+
+    def test_full_page_counts(self, items):
+        page, link, counts = self.paginate(items, {"page": 2})
+        assert page == [11, 12, 13, 14, 15, 16, 17, 18, 19, 20]
+        assert link == (
+            '<http://testserver/>; rel="prev", '
+            '<http://testserver/?page=3>; rel="next", '
+            '<http://testserver/>; rel="first", '
+            '<http://testserver/?page=10>; rel="last"'
+        )
+        assert counts == 1
+
+    def test_exactly_one_page(self, items):
+        page, link, counts = self.paginate(items.filter(value__lte=10))
+        assert link is None
+        assert counts == 0
+
+    def test_orphans(self, items):
+        class OrphansPaginator(drf_link_header_pagination.CountStrategyPaginator):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, orphans=3, **kwargs)
+
+        self.pagination_class.django_paginator_class = OrphansPaginator
+        page, link, counts = self.paginate(items.filter(value__lte=12))
+        assert page == list(range(1, 13))
+        assert link is None
+        assert counts == 0
+
+    def test_past_the_end(self, items):
+        with pytest.raises(NotFound):
+            self.paginate(items.filter(value__lte=7), {"page": 2})
+
+    def test_async(self, items):
+        request = Request(factory.get("/", {"page": 2}))
+        pagination = self.pagination_class()
+        page = async_to_sync(pagination.apaginate_queryset)(
+            items.filter(value__lte=15), request
+        )
+        assert [item.value for item in page] == [11, 12, 13, 14, 15]
+        assert pagination.page.paginator.count == 15
+        assert not pagination.page.has_next()
@@ -0,0 +1,135 @@
+import datetime
+import decimal
+import uuid
+from urllib import parse
+
+import pytest
+from rest_framework import exceptions
+from rest_framework.pagination import Cursor
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+class TestSignedCursorCodec:
+    """
+    Unit tests for `SignedCursorCodec`.
+    """
+
+    def setup(self):
+        self.codec = drf_link_header_pagination.SignedCursorCodec(secret="secret")
+
+    @pytest.mark.parametrize(
+        "position",
+        [
+            None,
+            (1,),
+            (-(2 ** 70), 2 ** 63),
+            (None, True, False, 1.5),
+            ("café", b"\x00\xff", ""),
+            (decimal.Decimal("1.10"), uuid.UUID(int=12345)),
+            (datetime.date(2022, 2, 3), datetime.datetime(2022, 2, 3, 4, 5, 6, 7)),
+            (datetime.datetime(2022, 2, 3, 4, 5, 6, 7, tzinfo=datetime.timezone.utc),),
+        ],
+    )
+    def test_round_trip(self, position):
+        cursor = Cursor(offset=3, reverse=True, position=position)
+        assert self.codec.decode(self.codec.encode(cursor)) == cursor
+
+    def test_single_value(self):
+        encoded = self.codec.encode(Cursor(offset=0, reverse=False, position="10"))
+        assert self.codec.decode(encoded) == Cursor(0, False, ("10",))
+
+    def test_compact(self):
+        encoded = self.codec.encode(Cursor(offset=0, reverse=False, position=(12345,)))
+        assert len(encoded) == 34
+        assert parse.quote(encoded) == encoded
+
+    @pytest.mark.parametrize("encoded", ["", "abc", "é", "!!!!"])
+    def test_invalid(self, encoded):
+        with pytest.raises(ValueError):
+            self.codec.decode(encoded)
+
+    def test_tampered(self):
+        encoded = self.codec.encode(Cursor(offset=0, reverse=False, position=(1,)))
+        other = drf_link_header_pagination.SignedCursorCodec(secret="other")
+        with pytest.raises(ValueError):
+            other.decode(encoded)
+
+        data = bytearray(parse.unquote(encoded).encode())
+        data[5] = ord("A") if data[5] != ord("A") else ord("B")
+        with pytest.raises(ValueError):
+            self.codec.decode(data.decode())
+
+    def test_cache(self):
+        encoded = self.codec.encode(Cursor(offset=0, reverse=False, position=(1,)))
+        self.codec.decode(encoded)
+        self.codec.decode(encoded)
+        assert self.codec.decode.cache_info().hits == 1
+
+
+@pytest.mark.django_db
+class TestSignedCursorPagination:
+    """
+    Unit tests for cursor pagination with a `SignedCursorCodec`.
+    """
+
+    def setup(self):
+        # Many rows share each value, so the ordering needs both fields.
+        Item.objects.bulk_create(
+            Item(created=idx, value=idx // 4) for idx in range(1, 24)
+        )
+        self.queryset = Item.objects.all()
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderCursorPagination):
+            page_size = 5
+            ordering = ("-value", "created")
+            cursor_codec = drf_link_header_pagination.SignedCursorCodec()
+
+        self.pagination_class = ExamplePagination
+
+    def get_page(self, url):
+        request = Request(factory.get(url))
+        pagination = self.pagination_class()
+        page = pagination.paginate_queryset(self.queryset, request)
+        return (
+            [item.created for item in page],
+            pagination.get_previous_link(),
+            pagination.get_next_link(),
+        )
+
+    def test_crawl(self):
+        expected = list(
+            self.queryset.order_by("-value", "created").values_list("created", flat=True)
+        )
+        pages = []
+        url = "/"
+        while url is not None:
+            page, previous_url, url = self.get_page(url)
+            pages.append(page)
+        assert [created for page in pages for created in page] == expected
+        assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+
+        backwards = []
+        url = previous_url
+        while url is not None:
+            page, url, _ = self.get_page(url)
+            backwards.append(page)
+        assert backwards == pages[-2::-1]
+
+    def test_no_offsets(self):
+        _, _, url = self.get_page("/")
+        _, _, url = self.get_page(url)
+        encoded = parse.parse_qs(parse.urlsplit(url).query)["cursor"][0]
+        cursor = self.pagination_class.cursor_codec.decode(encoded)
+        assert cursor.offset == 0
+        assert cursor.position == (3, 13)
+
+    def test_invalid_cursor(self):
+        with pytest.raises(exceptions.NotFound):
+            self.get_page("/?cursor=invalid")
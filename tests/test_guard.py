@@ -0,0 +1,225 @@
+import logging
+
+import pytest
+from django.db import connection, connections
+from rest_framework import generics, serializers
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+from drf_link_header_pagination.guard import GuardedLog, get_query_shape
+from drf_link_header_pagination.testing import query_budget  # noqa: F401
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["created"]
+
+
+class NPlusOneSerializer(serializers.ModelSerializer):
+    smaller = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Item
+        fields = ["created", "smaller"]
+
+    def get_smaller(self, item):
+        return Item.objects.filter(created__lt=item.created).count()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("items")
+class TestQueryGuard:
+    """
+    Unit tests for the `query_guard` of the pagination classes.
+    """
+
+    def get_view(self, serializer_class, guard, pagination=None, mixins=(), **attrs):
+        if pagination is None:
+            pagination = drf_link_header_pagination.LinkHeaderPagination
+
+        class ExamplePagination(pagination):
+            page_size = 5
+            default_limit = 5
+            ordering = "created"
+            query_guard = guard
+
+        attrs.update(
+            queryset=Item.objects.all(),
+            serializer_class=serializer_class,
+            pagination_class=ExamplePagination,
+        )
+        return type("ItemList", mixins + (generics.ListAPIView,), attrs).as_view()
+
+    @pytest.mark.parametrize(
+        "pagination",
+        [
+            drf_link_header_pagination.LinkHeaderPagination,
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination,
+            drf_link_header_pagination.LinkHeaderCursorPagination,
+            drf_link_header_pagination.LinkHeaderKeysetPagination,
+        ],
+    )
+    def test_repeated_queries(self, pagination):
+        guard = drf_link_header_pagination.QueryGuard(action="raise")
+        view = self.get_view(ItemSerializer, guard, pagination)
+        assert view(factory.get("/")).status_code == 200
+
+        view = self.get_view(NPlusOneSerializer, guard, pagination)
+        with pytest.raises(drf_link_header_pagination.QueryBudgetExceeded) as excinfo:
+            view(factory.get("/"))
+        assert str(excinfo.value).startswith("GET /: repeated 5 times: SELECT COUNT(*)")
+        assert not any(isinstance(w, GuardedLog) for w in connection.execute_wrappers)
+
+    def test_max_queries(self):
+        guard = drf_link_header_pagination.QueryGuard(max_queries=1, action="raise")
+        view = self.get_view(ItemSerializer, guard)
+        with pytest.raises(
+            drf_link_header_pagination.QueryBudgetExceeded,
+            match="2 queries, over the budget of 1",
+        ):
+            view(factory.get("/"))
+
+    def test_view_budget(self):
+        guard = drf_link_header_pagination.QueryGuard(max_queries=1, action="raise")
+        view = self.get_view(ItemSerializer, guard, query_budget=2)
+        assert view(factory.get("/")).status_code == 200
+
+    def test_warn(self):
+        guard = drf_link_header_pagination.QueryGuard()
+        view = self.get_view(NPlusOneSerializer, guard)
+        with pytest.warns(drf_link_header_pagination.QueryBudgetWarning):
+            assert view(factory.get("/")).status_code == 200
+
+    def test_log(self, caplog):
+        guard = drf_link_header_pagination.QueryGuard(max_repeats=5, action="log")
+        view = self.get_view(NPlusOneSerializer, guard)
+        with caplog.at_level(logging.WARNING, "drf_link_header_pagination.guard"):
+            assert view(factory.get("/?page=2")).status_code == 200
+            assert not caplog.records
+            guard.max_repeats = 4
+            assert view(factory.get("/?page=2")).status_code == 200
+        assert caplog.records[0].getMessage().startswith("GET /?page=2: repeated 5")
+
+    def test_unfinished(self):
+        guard = drf_link_header_pagination.QueryGuard(action="raise")
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            query_guard = guard
+
+        request = factory.get("/")
+        request.query_params = request.GET
+        ExamplePagination().paginate_queryset(Item.objects.all(), request)
+        ExamplePagination().paginate_queryset(Item.objects.all(), request)
+        wrappers = [w for w in connection.execute_wrappers if isinstance(w, GuardedLog)]
+        assert len(wrappers) == 1
+        wrappers[0].stop()
+
+    def test_unfinished_on_replica(self):
+        guard = drf_link_header_pagination.QueryGuard()
+        request = factory.get("/")
+        guard.start(request, Item.objects.using("replica"))
+        log = guard.start(request, Item.objects.all())
+        for alias in ("default", "replica"):
+            wrappers = connections[alias].execute_wrappers
+            assert [w for w in wrappers if isinstance(w, GuardedLog)] == (
+                [log] if alias == "default" else []
+            )
+        log.stop()
+
+    def test_failed_headers(self):
+        guard = drf_link_header_pagination.QueryGuard(action="raise")
+
+        class FailingPagination(drf_link_header_pagination.LinkHeaderPagination):
+            def get_last_link(self):
+                raise RuntimeError("Broken link")
+
+        view = self.get_view(ItemSerializer, guard, FailingPagination)
+        with pytest.raises(RuntimeError):
+            view(factory.get("/"))
+        assert not any(isinstance(w, GuardedLog) for w in connection.execute_wrappers)
+
+    def test_not_modified(self):
+        guard = drf_link_header_pagination.QueryGuard(max_queries=1, action="raise")
+
+        class ConditionalPagination(drf_link_header_pagination.LinkHeaderPagination):
+            collection_validator = drf_link_header_pagination.PageHash(
+                fields=("pk", "value")
+            )
+
+        view = self.get_view(
+            ItemSerializer,
+            guard,
+            ConditionalPagination,
+            mixins=(drf_link_header_pagination.ConditionalListModelMixin,),
+        )
+        guard.max_queries = None
+        etag = view(factory.get("/"))["ETag"]
+        guard.max_queries = 1
+        with pytest.raises(
+            drf_link_header_pagination.QueryBudgetExceeded, match="2 queries"
+        ):
+            view(factory.get("/", HTTP_IF_NONE_MATCH=etag))
+        assert not any(isinstance(w, GuardedLog) for w in connection.execute_wrappers)
+
+    @pytest.mark.parametrize(
+        "pagination",
+        [
+            drf_link_header_pagination.LinkHeaderPagination,
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination,
+        ],
+    )
+    def test_streaming(self, pagination):
+        guard = drf_link_header_pagination.QueryGuard(action="raise")
+        view = self.get_view(
+            NPlusOneSerializer,
+            guard,
+            pagination,
+            mixins=(drf_link_header_pagination.StreamingListModelMixin,),
+        )
+        response = view(factory.get("/"))
+        with pytest.raises(drf_link_header_pagination.QueryBudgetExceeded):
+            b"".join(response.streaming_content)
+        assert not any(isinstance(w, GuardedLog) for w in connection.execute_wrappers)
+
+    def test_invalid_action(self):
+        with pytest.raises(ValueError):
+            drf_link_header_pagination.QueryGuard(action="ignore")
+
+
+def test_query_shape():
+    assert get_query_shape("SELECT 1 WHERE id IN (%s, %s, %s)") == (
+        "SELECT 1 WHERE id IN (%s, ...)"
+    )
+    assert get_query_shape("SELECT 1 WHERE id IN (%s)") == "SELECT 1 WHERE id IN (%s)"
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("items")
+class TestQueryBudgetFixture:
+    """
+    Tests for the `query_budget` fixture of `drf_link_header_pagination.testing`.
+    """
+
+    def test_within_budget(self, query_budget):
+        with query_budget(2) as log:
+            list(Item.objects.all()[:5])
+            Item.objects.count()
+        assert log.count == 2
+
+    def test_over_budget(self, query_budget):
+        with pytest.raises(pytest.fail.Exception, match="2 queries, over the budget"):
+            with query_budget(1):
+                list(Item.objects.all()[:5])
+                Item.objects.count()
+
+    def test_repeated(self, query_budget):
+        with pytest.raises(pytest.fail.Exception, match="repeated 3 times"):
+            with query_budget():
+                for item in Item.objects.all()[:3]:
+                    Item.objects.filter(created__lt=item.created).exists()
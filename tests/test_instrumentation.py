@@ -0,0 +1,175 @@
+import re
+from urllib import parse
+
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+from drf_link_header_pagination.instrumentation import pagination_timed
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+class StatsdClient:
+    def __init__(self):
+        self.calls = []
+
+    def timing(self, stat, delta):
+        self.calls.append(("timing", stat))
+
+    def incr(self, stat, count=1):
+        self.calls.append(("incr", stat, count))
+
+
+class PrometheusMetric:
+    def __init__(self):
+        self.calls = []
+
+    def labels(self, **labels):
+        self.labels_ = labels
+        return self
+
+    def observe(self, value):
+        self.calls.append(("observe", self.labels_["pagination"], self.labels_["phase"]))
+
+    def inc(self, amount=1):
+        self.calls.append(("inc", self.labels_["pagination"], self.labels_["phase"], amount))
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("items")
+class TestInstrumentation:
+    """
+    Unit tests for the `instrumentation` of the pagination classes.
+    """
+
+    def setup(self):
+        self.queryset = Item.objects.all()
+        self.reports = []
+        pagination_timed.connect(self.receiver)
+
+    def teardown(self):
+        pagination_timed.disconnect(self.receiver)
+
+    def receiver(self, sender, pagination, request, timings, queries, **kwargs):
+        self.reports.append((sender, timings, queries))
+
+    def get_headers(self, pagination_class, params=None):
+        request = Request(factory.get("/", params or {}))
+        pagination = pagination_class()
+        pagination.paginate_queryset(self.queryset, request)
+        return pagination.get_headers()
+
+    def get_phases(self, headers):
+        return re.findall(r"pagination-(\w+);dur=[\d.]+", headers["Server-Timing"])
+
+    def test_page_number(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            instrumentation = drf_link_header_pagination.Instrumentation()
+
+        headers = self.get_headers(ExamplePagination, {"page": 2})
+        assert "Link" in headers
+        assert self.get_phases(headers) == ["count", "page", "links"]
+        assert self.reports == [
+            (
+                ExamplePagination,
+                self.reports[0][1],
+                {"count": 1, "page": 1, "links": 0},
+            )
+        ]
+        assert set(self.reports[0][1]) == {"count", "page", "links"}
+
+    def test_limit_offset_keyset(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+            default_limit = 5
+            max_offset = 10
+            instrumentation = drf_link_header_pagination.Instrumentation()
+
+        headers = self.get_headers(ExamplePagination, {"after": 10})
+        assert self.get_phases(headers) == ["cursor", "page", "links"]
+        # The last link seeks backwards from the end.
+        assert self.reports[0][2] == {"cursor": 0, "page": 1, "links": 1}
+
+    def test_cursor(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderCursorPagination):
+            page_size = 5
+            ordering = "created"
+            instrumentation = drf_link_header_pagination.Instrumentation()
+
+        request = Request(factory.get("/"))
+        pagination = ExamplePagination()
+        pagination.paginate_queryset(self.queryset, request)
+        next_link = pagination.get_next_link()
+
+        params = dict(parse.parse_qsl(parse.urlsplit(next_link).query))
+        headers = self.get_headers(ExamplePagination, params)
+        assert self.get_phases(headers) == ["cursor", "page", "links"]
+        assert self.reports[-1][2] == {"cursor": 0, "page": 1, "links": 0}
+
+    def test_not_sampled(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            instrumentation = drf_link_header_pagination.Instrumentation(sample_rate=0)
+
+        headers = self.get_headers(ExamplePagination, {"page": 2})
+        assert "Link" in headers
+        assert "Server-Timing" not in headers
+        assert self.reports == []
+
+    def test_no_server_timing(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            instrumentation = drf_link_header_pagination.Instrumentation(
+                server_timing=False
+            )
+
+        headers = self.get_headers(ExamplePagination)
+        assert "Server-Timing" not in headers
+        assert len(self.reports) == 1
+
+    def test_reported_once(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            instrumentation = drf_link_header_pagination.Instrumentation()
+
+        request = Request(factory.get("/"))
+        pagination = ExamplePagination()
+        pagination.paginate_queryset(self.queryset, request)
+        assert "Server-Timing" in pagination.get_headers()
+        assert "Server-Timing" not in pagination.get_headers()
+        assert len(self.reports) == 1
+
+    def test_metrics(self):
+        client = StatsdClient()
+        duration, queries = PrometheusMetric(), PrometheusMetric()
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+            default_limit = 5
+            instrumentation = drf_link_header_pagination.Instrumentation(
+                metrics=[
+                    drf_link_header_pagination.StatsdMetrics(client, prefix="api"),
+                    drf_link_header_pagination.PrometheusMetrics(duration, queries),
+                ]
+            )
+
+        self.get_headers(ExamplePagination, {"offset": 5})
+        assert client.calls == [
+            ("timing", "api.ExamplePagination.count"),
+            ("incr", "api.ExamplePagination.count.queries", 1),
+            ("timing", "api.ExamplePagination.page"),
+            ("incr", "api.ExamplePagination.page.queries", 1),
+            ("timing", "api.ExamplePagination.links"),
+        ]
+        assert duration.calls == [
+            ("observe", "ExamplePagination", "count"),
+            ("observe", "ExamplePagination", "page"),
+            ("observe", "ExamplePagination", "links"),
+        ]
+        assert queries.calls == [
+            ("inc", "ExamplePagination", "count", 1),
+            ("inc", "ExamplePagination", "page", 1),
+        ]
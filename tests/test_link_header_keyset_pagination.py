@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+@pytest.mark.django_db
+class TestLinkHeaderKeysetPagination:
+    """
+    Unit tests for `pagination.LinkHeaderKeysetPagination`.
+    """
+
+    def setup(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderKeysetPagination):
+            page_size = 5
+            ordering = "created"
+
+        self.pagination = ExamplePagination()
+        Item.objects.bulk_create(
+            Item(created=idx, value=idx // 4) for idx in range(1, 23)
+        )
+        self.queryset = Item.objects.all()
+
+    def paginate(self, params):
+        request = Request(factory.get("/", params))
+        page = self.pagination.paginate_queryset(self.queryset, request)
+        response = self.pagination.get_paginated_response(page)
+        return [item.created for item in page], response.get("Link")
+
+    def test_first_page(self):
+        page, link = self.paginate({})
+        assert page == [1, 2, 3, 4, 5]
+        assert link == (
+            '<http://testserver/?after=5>; rel="next", '
+            '<http://testserver/?after=17>; rel="last"'
+        )
+
+    def test_after(self):
+        page, link = self.paginate({"after": 5})
+        assert page == [6, 7, 8, 9, 10]
+        assert link == (
+            '<http://testserver/?before=6>; rel="prev", '
+            '<http://testserver/?after=10>; rel="next", '
+            '<http://testserver/>; rel="first", '
+            '<http://testserver/?after=17>; rel="last"'
+        )
+
+    def test_before(self):
+        page, link = self.paginate({"before": 10})
+        assert page == [5, 6, 7, 8, 9]
+        assert link == (
+            '<http://testserver/?before=5>; rel="prev", '
+            '<http://testserver/?after=9>; rel="next", '
+            '<http://testserver/>; rel="first", '
+            '<http://testserver/?after=17>; rel="last"'
+        )
+
+    def test_before_start(self):
+        page, link = self.paginate({"before": 4})
+        assert page == [1, 2, 3]
+        assert link == (
+            '<http://testserver/?after=3>; rel="next", '
+            '<http://testserver/?after=17>; rel="last"'
+        )
+
+    def test_last_page(self):
+        page, link = self.paginate({"after": 17})
+        assert page == [18, 19, 20, 21, 22]
+        assert link == (
+            '<http://testserver/?before=18>; rel="prev", '
+            '<http://testserver/>; rel="first"'
+        )
+
+    def test_deep_page_uses_one_query(self):
+        request = Request(factory.get("/", {"after": 15}))
+        with CaptureQueriesContext(connection) as queries:
+            self.pagination.paginate_queryset(self.queryset, request)
+        assert len(queries) == 1
+        assert "OFFSET" not in queries[0]["sql"]
+
+    def test_composite_key(self):
+        self.pagination.ordering = ("-value", "created")
+        page, link = self.paginate({"after": "4,17"})
+        assert page == [18, 19, 12, 13, 14]
+        assert link == (
+            '<http://testserver/?before=4%2C18>; rel="prev", '
+            '<http://testserver/?after=3%2C14>; rel="next", '
+            '<http://testserver/>; rel="first", '
+            '<http://testserver/?after=1%2C5>; rel="last"'
+        )
+
+    @pytest.mark.parametrize("key", ["invalid", "1,2"])
+    def test_invalid_key(self, key):
+        request = Request(factory.get("/", {"after": key}))
+        with pytest.raises(exceptions.NotFound):
+            self.pagination.paginate_queryset(self.queryset, request)
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework import exceptions
 from rest_framework.pagination import PAGE_BREAK, PageLink
 from rest_framework.request import Request
@@ -6,6 +8,8 @@ from rest_framework.test import APIRequestFactory
 
 import drf_link_header_pagination
 
+from .models import Item
+
 factory = APIRequestFactory()
 
 
@@ -105,3 +109,70 @@ class TestLinkHeaderLimitOffsetPagination:
                 PageLink("http://testserver/?offset=96", 25, True, False),
             ],
         }
+
+
+@pytest.mark.django_db
+class TestLinkHeaderLimitOffsetPaginationDeepOffsets:
+    """
+    Unit tests for the `deferred_join` and `max_offset` options of
+    `pagination.LinkHeaderLimitOffsetPagination`.
+    """
+
+    def setup(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+            default_limit = 4
+            deferred_join = True
+            max_offset = 8
+
+        self.pagination = ExamplePagination()
+        Item.objects.bulk_create(Item(created=idx, value=idx) for idx in range(1, 21))
+        self.queryset = Item.objects.order_by("pk")
+
+    def paginate(self, params):
+        request = Request(factory.get("/", params))
+        page = self.pagination.paginate_queryset(self.queryset, request)
+        response = self.pagination.get_paginated_response(page)
+        return [item.value for item in page], response.get("Link")
+
+    def test_deferred_join(self):
+        request = Request(factory.get("/", {"offset": 4}))
+        with CaptureQueriesContext(connection) as queries:
+            page = self.pagination.paginate_queryset(
+                self.queryset.order_by("-created"), request
+            )
+        assert [item.value for item in page] == [16, 15, 14, 13]
+        assert len(queries) == 3
+        assert '"tests_item"."value"' not in queries[1]["sql"]
+        assert "OFFSET" not in queries[2]["sql"]
+
+    def test_links_switch_to_keys_past_max_offset(self):
+        page, link = self.paginate({"offset": 8})
+        assert page == [9, 10, 11, 12]
+        assert link == (
+            '<http://testserver/?limit=4&offset=4>; rel="prev", '
+            '<http://testserver/?after=12&limit=4>; rel="next", '
+            '<http://testserver/?limit=4>; rel="first", '
+            '<http://testserver/?after=16&limit=4>; rel="last"'
+        )
+
+    def test_key_page(self):
+        page, link = self.paginate({"after": 12, "limit": 4})
+        assert page == [13, 14, 15, 16]
+        assert link == (
+            '<http://testserver/?before=13&limit=4>; rel="prev", '
+            '<http://testserver/?after=16&limit=4>; rel="next", '
+            '<http://testserver/?limit=4>; rel="first", '
+            '<http://testserver/?after=16&limit=4>; rel="last"'
+        )
+
+    def test_stale_count_past_max_offset(self):
+        Item.objects.filter(value__gt=10).delete()
+        self.pagination.count_strategy = lambda queryset: 1000
+        page, link = self.paginate({"offset": 8})
+        assert page == [9, 10]
+        assert 'rel="next"' not in link
+
+    def test_offset_past_max_offset(self):
+        request = Request(factory.get("/", {"offset": 12}))
+        with pytest.raises(exceptions.NotFound):
+            self.pagination.paginate_queryset(self.queryset, request)
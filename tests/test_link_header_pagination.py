@@ -1,4 +1,6 @@
 import pytest
+from asgiref.sync import async_to_sync
+from django.core.paginator import Paginator
 from rest_framework import exceptions
 from rest_framework.pagination import PAGE_BREAK, PageLink
 from rest_framework.request import Request
@@ -107,3 +109,30 @@ class TestLinkHeaderPagination:
         request = Request(factory.get("/", {"page": "invalid"}))
         with pytest.raises(exceptions.NotFound):
             self.paginate_queryset(request)
+
+
+class TestPlainPaginator(TestLinkHeaderPagination):
+    """
+    The tests of `TestLinkHeaderPagination`, with a `django_paginator_class`
+    that isn't a `CountStrategyPaginator`.
+    """
+
+    def setup(self):
+        class ExamplePaginator(Paginator):
+            pass
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            django_paginator_class = ExamplePaginator
+
+        self.pagination = ExamplePagination()
+        self.queryset = range(1, 101)
+
+    def test_async(self):
+        request = Request(factory.get("/", {"page": 2}))
+        queryset = async_to_sync(self.pagination.apaginate_queryset)(
+            self.queryset, request
+        )
+        response = self.get_paginated_response(queryset)
+        assert queryset == [6, 7, 8, 9, 10]
+        assert '<http://testserver/?page=20>; rel="last"' in response["Link"]
@@ -0,0 +1,127 @@
+import random
+from urllib import parse
+
+import pytest
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from drf_link_header_pagination.links import LinkBuilder, PrefixedLinkBuilder
+
+URL = (
+    "http://testserver/items/?z=1&page=3&a=%C3%A9&a=2&blank=&"
+    + "&".join("filter{}=value+{}".format(idx, idx) for idx in range(25))
+    + "#fragment"
+)
+
+
+class TestLinkBuilder:
+    """
+    Unit tests for `links.LinkBuilder`.
+    """
+
+    def test_replace(self):
+        builder = LinkBuilder(URL)
+        assert builder.build({"page": 4}) == replace_query_param(URL, "page", 4)
+        assert builder.build({"new": "a b"}) == replace_query_param(URL, "new", "a b")
+
+    def test_remove(self):
+        builder = LinkBuilder(URL)
+        assert builder.build(remove=("page",)) == remove_query_param(URL, "page")
+        assert builder.build(remove=("missing",)) == remove_query_param(URL, "missing")
+
+    def test_replace_and_remove(self):
+        builder = LinkBuilder(URL)
+        expected = remove_query_param(replace_query_param(URL, "limit", 10), "page")
+        assert builder.build({"limit": 10}, remove=("page",)) == expected
+
+    def test_builder_is_reusable(self):
+        builder = LinkBuilder(URL)
+        builder.build({"page": 4}, remove=("z",))
+        assert builder.build() == remove_query_param(URL, "missing")
+
+
+class TestLinkTemplate:
+    """
+    Unit tests for the `LinkTemplate`s of `links.LinkBuilder`.
+    """
+
+    def test_render(self):
+        builder = LinkBuilder(URL)
+        template = builder.template("page")
+        for page in (1, 4, "last", "a b&c"):
+            assert template.render(page) == replace_query_param(URL, "page", page)
+
+    def test_replace_and_remove(self):
+        builder = LinkBuilder(URL)
+        template = builder.template("offset", {"limit": 10}, remove=("page",))
+        expected = remove_query_param(replace_query_param(URL, "limit", 10), "page")
+        assert template.render(20) == replace_query_param(expected, "offset", 20)
+
+    def test_cached(self):
+        builder = LinkBuilder(URL)
+        assert builder.template("page") is builder.template("page")
+        assert builder.template("page") is not builder.template("page", {"z": 2})
+
+    def test_first_and_last_parameter(self):
+        for url in ("http://testserver/", "http://testserver/?m=1", "/?m=1#f"):
+            builder = LinkBuilder(url)
+            for key in ("a", "m", "z"):
+                expected = replace_query_param(url, key, 5)
+                assert builder.template(key).render(5) == expected
+
+    def test_prefixed(self):
+        builder = PrefixedLinkBuilder(URL, "orders.")
+        template = builder.template("page", {"size": 3}, remove=("z",))
+        assert template.render(2) == builder.build({"page": 2, "size": 3}, ("z",))
+
+
+# Characters that need encoding, and the ones with a meaning in URLs.
+CHARACTERS = "ab z09.-_~é€&=+%#?/;,:"
+
+
+def random_text(rng, min_length=0):
+    return "".join(
+        rng.choice(CHARACTERS) for _ in range(rng.randint(min_length, 4))
+    )
+
+
+def random_url(rng):
+    params = [
+        (random_text(rng, 1), random_text(rng)) for _ in range(rng.randint(0, 6))
+    ]
+    # Repeated parameters.
+    params += params[:rng.randint(0, 2)]
+    return parse.urlunsplit(
+        (
+            rng.choice(["http", "https", ""]),
+            rng.choice(["testserver", "example.org:8000", ""]),
+            rng.choice(["/", "/items/", "/a%20b/"]),
+            parse.urlencode(params),
+            rng.choice(["", "fragment", "a=b&c"]),
+        )
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_template_matches_drf(seed):
+    """`LinkTemplate.render()` matches DRF's functions for random URLs."""
+    rng = random.Random(seed)
+    for _ in range(50):
+        url = random_url(rng)
+        builder = LinkBuilder(url)
+        existing = list(parse.parse_qs(parse.urlsplit(url).query))
+        names = existing + [random_text(rng, 1) for _ in range(2)]
+        key = rng.choice(names)
+        replace = {rng.choice(names): random_text(rng) for _ in range(rng.randint(0, 2))}
+        replace.pop(key, None)
+        remove = tuple(rng.sample(names, rng.randint(0, 2)))
+
+        expected = url
+        for name in remove:
+            expected = remove_query_param(expected, name)
+        for name, value in replace.items():
+            expected = replace_query_param(expected, name, value)
+        value = rng.choice([rng.randint(0, 1000), random_text(rng)])
+        expected = replace_query_param(expected, key, value)
+
+        template = builder.template(key, replace, remove)
+        assert template.render(value) == expected, (url, key, replace, remove)
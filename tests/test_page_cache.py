@@ -0,0 +1,150 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.deletion import Collector
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext
+from rest_framework import authentication, generics, serializers
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+import drf_link_header_pagination
+
+from .models import Document, Item
+
+factory = APIRequestFactory()
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["created", "value"]
+
+
+class UserItemSerializer(ItemSerializer):
+    user = serializers.SerializerMethodField()
+
+    class Meta(ItemSerializer.Meta):
+        fields = ["created", "value", "user"]
+
+    def get_user(self, item):
+        return self.context["request"].user.username
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("items")
+class TestPageCache:
+    """
+    Unit tests for caching pages with `PageCache` and `CachedListModelMixin`.
+    """
+
+    def setup(self):
+        cache.clear()
+        self.executor = drf_link_header_pagination.CountExecutor(max_workers=1)
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            page_cache = drf_link_header_pagination.PageCache(timeout=60)
+
+        class ItemList(drf_link_header_pagination.CachedListModelMixin, generics.ListAPIView):
+            queryset = Item.objects.all()
+            serializer_class = ItemSerializer
+            pagination_class = ExamplePagination
+
+        self.pagination_class = ExamplePagination
+        self.view = ItemList.as_view()
+
+    def teardown(self):
+        self.executor.shutdown()
+
+    def get(self, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.view(factory.get("/", params))
+        return [item["value"] for item in response.data], response["Link"], len(queries)
+
+    def test_cached_page(self):
+        page, link, num_queries = self.get({"page": 2})
+        assert page == [6, 7, 8, 9, 10]
+        assert num_queries == 2
+
+        assert self.get({"page": 2}) == (page, link, 0)
+
+    def test_save_invalidates(self):
+        self.get({"page": 2})
+        item = Item.objects.get(created=7)
+        item.value = 70
+        item.save()
+
+        page, link, num_queries = self.get({"page": 2})
+        assert page == [6, 70, 8, 9, 10]
+        assert num_queries == 2
+
+    def test_delete_invalidates(self):
+        self.get({"page": 2})
+        Item.objects.get(created=7).delete()
+
+        page, link, num_queries = self.get({"page": 2})
+        assert page == [6, 8, 9, 10, 11]
+        assert num_queries == 2
+
+    def test_prefetch_next_page(self):
+        self.pagination_class.page_cache.prefetch_executor = self.executor
+        self.get({"page": 2})
+        self.executor.shutdown()
+
+        page, link, num_queries = self.get({"page": 3})
+        assert page == [11, 12, 13, 14, 15]
+        assert num_queries == 0
+        assert link == (
+            '<http://testserver/?page=2>; rel="prev", '
+            '<http://testserver/?page=4>; rel="next", '
+            '<http://testserver/>; rel="first", '
+            '<http://testserver/?page=5>; rel="last"'
+        )
+
+    def test_varies_on_user(self):
+        class ItemList(drf_link_header_pagination.CachedListModelMixin, generics.ListAPIView):
+            queryset = Item.objects.all()
+            serializer_class = UserItemSerializer
+            pagination_class = self.pagination_class
+
+        view = ItemList.as_view()
+        alice = User.objects.create(username="alice")
+        bob = User.objects.create(username="bob")
+        for user in (alice, bob, None):
+            request = factory.get("/")
+            if user is not None:
+                force_authenticate(request, user)
+            response = view(request)
+            assert {item["user"] for item in response.data} == {
+                user.username if user is not None else ""
+            }
+
+    def test_prefetch_as_session_user(self):
+        class ItemList(drf_link_header_pagination.CachedListModelMixin, generics.ListAPIView):
+            queryset = Item.objects.all()
+            serializer_class = UserItemSerializer
+            pagination_class = self.pagination_class
+            authentication_classes = [authentication.SessionAuthentication]
+
+        self.pagination_class.page_cache.prefetch_executor = self.executor
+        view = ItemList.as_view()
+        alice = User.objects.create(username="alice")
+        request = factory.get("/")
+        # As set by `AuthenticationMiddleware`.
+        request.user = alice
+        view(request)
+        self.executor.shutdown()
+
+        request = factory.get("/", {"page": 2})
+        request.user = alice
+        with CaptureQueriesContext(connection) as queries:
+            response = view(request)
+        assert {item["user"] for item in response.data} == {"alice"}
+        assert len(queries) == 0
+
+    def test_receivers_only_for_cached_models(self):
+        self.get({"page": 2})
+        assert post_save.has_listeners(Item)
+        assert not post_save.has_listeners(Document)
+        assert Collector(using="default").can_fast_delete(Document.objects.all())
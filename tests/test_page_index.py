@@ -0,0 +1,144 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("items")
+class TestPageIndex:
+    """
+    Unit tests for `LinkHeaderPagination` with a `page_index`.
+    """
+
+    def setup(self):
+        cache.clear()
+        self.page_index = drf_link_header_pagination.PageIndex(
+            ordering="created", every=1
+        )
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            page_index = self.page_index
+
+        self.pagination_class = ExamplePagination
+
+    def paginate(self, page=None, queryset=None):
+        if queryset is None:
+            queryset = Item.objects.all()
+        request = Request(factory.get("/", {"page": page} if page else None))
+        pagination = self.pagination_class()
+        with CaptureQueriesContext(connection) as queries:
+            results = pagination.paginate_queryset(queryset, request)
+            link = pagination.get_headers()["Link"]
+        return [item.created for item in results], link, [q["sql"] for q in queries]
+
+    def test_pages(self):
+        for page, first in ((1, 1), (2, 6), (4, 16)):
+            results, _, _ = self.paginate(page)
+            assert results == list(range(first, first + 5))
+        results, link, _ = self.paginate("last")
+        assert results == [21, 22, 23]
+        assert link == (
+            '<http://testserver/?page=4>; rel="prev", '
+            '<http://testserver/>; rel="first"'
+        )
+
+    def test_no_count_or_offset(self):
+        self.paginate()
+        results, link, queries = self.paginate(4)
+        assert results == [16, 17, 18, 19, 20]
+        assert link.endswith('<http://testserver/?page=5>; rel="last"')
+        assert len(queries) == 1
+        assert "COUNT" not in queries[0]
+        assert "OFFSET" not in queries[0]
+
+    def test_every(self):
+        self.page_index.every = 3
+        for page in range(1, 6):
+            results, _, _ = self.paginate(page)
+            first = (page - 1) * 5 + 1
+            assert results == list(range(first, min(first + 5, 24)))
+
+    def test_descending(self):
+        self.page_index.ordering = ("-created",)
+        results, _, _ = self.paginate(2, Item.objects.order_by("-created"))
+        assert results == [18, 17, 16, 15, 14]
+        results, _, _ = self.paginate(5, Item.objects.order_by("-created"))
+        assert results == [3, 2, 1]
+
+    def test_filtered(self):
+        results, link, _ = self.paginate(2, Item.objects.filter(value__gt=10))
+        assert results == [16, 17, 18, 19, 20]
+        assert link.endswith('<http://testserver/?page=3>; rel="last"')
+
+    def test_extended_on_insert(self):
+        self.paginate()
+        Item.objects.create(created=24, value=24)
+        Item.objects.create(created=25, value=25)
+        Item.objects.create(created=26, value=26)
+        results, link, queries = self.paginate(5)
+        assert results == [21, 22, 23, 24, 25]
+        assert link.endswith('<http://testserver/?page=6>; rel="last"')
+        # Only the rows after the last boundary are counted and numbered.
+        assert len(queries) == 3
+        assert queries[0].startswith("SELECT COUNT(*)")
+        assert queries[1].startswith('SELECT "tests_item"."created"')
+        assert all('"tests_item"."created" > 20' in sql for sql in queries[:2])
+
+    def test_rebuilt_on_delete(self):
+        self.paginate()
+        Item.objects.get(created=3).delete()
+        results, link, _ = self.paginate(1)
+        assert results == [1, 2, 4, 5, 6]
+        results, link, _ = self.paginate("last")
+        assert results == [22, 23]
+
+    def test_invalid_page(self):
+        with pytest.raises(NotFound):
+            self.paginate(6)
+
+    def test_boundaries_found_by_the_database(self):
+        self.page_index.every = 2
+        results, link, queries = self.paginate(3)
+        assert results == [11, 12, 13, 14, 15]
+        assert link.endswith('<http://testserver/?page=5>; rel="last"')
+        # The count, the key ending page 2 and the page.
+        assert len(queries) == 3
+        assert "ROW_NUMBER() OVER" in queries[1]
+        assert cache.get(self.get_cache_key())["keys"] == [(10,), (20,)]
+
+    def test_without_window_functions(self, monkeypatch):
+        monkeypatch.setattr(connection.features, "supports_over_clause", False)
+        self.page_index.every = 2
+        results, link, queries = self.paginate(3)
+        assert results == [11, 12, 13, 14, 15]
+        assert link.endswith('<http://testserver/?page=5>; rel="last"')
+        assert cache.get(self.get_cache_key())["keys"] == [(10,), (20,)]
+
+    def test_shrunk_to_max_size(self):
+        Item.objects.bulk_create(Item(created=idx, value=idx) for idx in range(24, 201))
+        self.page_index.max_size = 100
+        results, link, _ = self.paginate(39)
+        assert results == [191, 192, 193, 194, 195]
+        assert link.endswith('<http://testserver/?page=40>; rel="last"')
+        entry = cache.get(self.get_cache_key())
+        assert entry["every"] == 16
+        assert entry["keys"] == [(80,), (160,)]
+
+        Item.objects.create(created=201, value=201)
+        results, link, _ = self.paginate(41)
+        assert results == [201]
+        assert cache.get(self.get_cache_key())["keys"] == [(80,), (160,)]
+
+    def get_cache_key(self):
+        return self.page_index.get_cache_key(Item.objects.all(), 5)
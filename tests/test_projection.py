@@ -0,0 +1,165 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import generics, serializers
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Document, Item
+
+factory = APIRequestFactory()
+
+
+class DocumentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Document
+        fields = ["id", "created", "title"]
+
+
+class RelatedDocumentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Document
+        fields = ["created", "item"]
+
+
+class MethodDocumentSerializer(serializers.ModelSerializer):
+    size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Document
+        fields = ["created", "size"]
+
+    def get_size(self, document):
+        return len(document.body)
+
+
+PAGINATION_CLASSES = [
+    drf_link_header_pagination.LinkHeaderPagination,
+    drf_link_header_pagination.LinkHeaderLimitOffsetPagination,
+    drf_link_header_pagination.LinkHeaderCursorPagination,
+    drf_link_header_pagination.LinkHeaderKeysetPagination,
+]
+
+
+@pytest.mark.django_db
+class TestProjection:
+    """
+    Unit tests for the `projection` of the pagination classes.
+    """
+
+    def setup(self):
+        items = Item.objects.bulk_create(
+            Item(created=idx, value=idx) for idx in range(1, 4)
+        )
+        Document.objects.bulk_create(
+            Document(
+                created=idx,
+                title="Document {}".format(idx),
+                body="x" * 1000,
+                metadata={"index": idx},
+                item=items[idx % 3],
+            )
+            for idx in range(1, 24)
+        )
+
+    def get(self, pagination, projection, serializer_class=DocumentSerializer, **params):
+        class ExamplePagination(pagination):
+            page_size = 5
+            default_limit = 5
+            max_offset = 10
+            ordering = "-created"
+
+        ExamplePagination.projection = projection
+        view = generics.ListAPIView.as_view(
+            queryset=Document.objects.all(),
+            serializer_class=serializer_class,
+            pagination_class=ExamplePagination,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = view(factory.get("/", params))
+        assert response.status_code == 200
+        return response, queries
+
+    @pytest.mark.parametrize("projection", ["only", "values"])
+    @pytest.mark.parametrize(
+        "pagination", PAGINATION_CLASSES, ids=lambda cls: cls.__name__
+    )
+    def test_same_output(self, pagination, projection):
+        expected, _ = self.get(pagination, None)
+        response, queries = self.get(pagination, projection)
+        assert response.data == expected.data
+        assert response["Link"] == expected["Link"]
+        assert not any('"body"' in query["sql"] for query in queries)
+
+    def test_values(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderKeysetPagination):
+            page_size = 5
+            ordering = "-created"
+            projection = "values"
+
+        request = Request(factory.get("/"))
+        view = generics.ListAPIView(
+            serializer_class=DocumentSerializer, request=request, format_kwarg=None
+        )
+        page = ExamplePagination().paginate_queryset(
+            Document.objects.all(), request, view
+        )
+        assert page[0] == {"id": page[0]["id"], "created": 23, "title": "Document 23"}
+
+    def test_related_fields_use_only(self):
+        expected, _ = self.get(
+            drf_link_header_pagination.LinkHeaderPagination,
+            None,
+            RelatedDocumentSerializer,
+        )
+        response, queries = self.get(
+            drf_link_header_pagination.LinkHeaderPagination,
+            "values",
+            RelatedDocumentSerializer,
+        )
+        assert response.data == expected.data
+        assert not any('"body"' in query["sql"] for query in queries)
+
+    def test_method_fields_disable_projection(self):
+        response, queries = self.get(
+            drf_link_header_pagination.LinkHeaderPagination,
+            "only",
+            MethodDocumentSerializer,
+        )
+        assert response.data[0] == {"created": 1, "size": 1000}
+        assert len(queries) == 2
+
+    def test_projected_queryset_left_alone(self):
+        pagination = drf_link_header_pagination.LinkHeaderPagination()
+        pagination.projection = "only"
+        queryset = Document.objects.defer("metadata")
+        assert pagination.project_queryset(queryset, None) is queryset
+
+    def test_batch(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+            page_size = 5
+            projection = "values"
+
+        class Dashboard(drf_link_header_pagination.BatchListModelMixin, generics.GenericAPIView):
+            def get_collections(self):
+                return {
+                    "documents": drf_link_header_pagination.Collection(
+                        Document.objects.all(), DocumentSerializer, ExamplePagination
+                    ),
+                }
+
+            def get(self, request, *args, **kwargs):
+                return self.list(request, *args, **kwargs)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = Dashboard.as_view()(factory.get("/"))
+        assert [row["title"] for row in response.data["documents"]["results"]] == [
+            "Document {}".format(idx) for idx in range(1, 6)
+        ]
+        # The collections are counted together, from their querysets.
+        assert [query["sql"] for query in queries if '"body"' in query["sql"]] == [
+            queries[0]["sql"]
+        ]
+        assert "COUNT" in queries[0]["sql"]
@@ -0,0 +1,113 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import OperationalError, connections, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+def fail(execute, sql, params, many, context):
+    raise OperationalError("replica is down")
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "replica"])
+@pytest.mark.usefixtures("items")
+class TestReplicas:
+    """
+    Unit tests for paginating on a replica with `ReplicaCount` and
+    `page_using`.
+    """
+
+    def setup(self):
+        # The replica lags behind: it has 13 of the 23 rows.
+        Item.objects.using("replica").bulk_create(
+            Item(created=idx, value=idx) for idx in range(1, 14)
+        )
+
+    def get_pagination(self, base, **attrs):
+        attrs.update(page_size=5, default_limit=5, ordering="created")
+        return type("ExamplePagination", (base,), attrs)()
+
+    def paginate(self, pagination, params=None):
+        request = Request(factory.get("/", params))
+        page = pagination.paginate_queryset(Item.objects.all(), request)
+        return [item.value for item in page], pagination.get_headers().get("Link")
+
+    def test_count_on_replica(self):
+        pagination = self.get_pagination(
+            drf_link_header_pagination.LinkHeaderPagination,
+            count_strategy=drf_link_header_pagination.ReplicaCount("replica"),
+        )
+        page, link = self.paginate(pagination)
+        assert page == [1, 2, 3, 4, 5]
+        assert link.endswith('<http://testserver/?page=3>; rel="last"')
+
+    def test_limit_offset_count_on_replica(self):
+        pagination = self.get_pagination(
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination,
+            count_strategy=drf_link_header_pagination.ReplicaCount("replica"),
+        )
+        page, link = self.paginate(pagination)
+        assert page == [1, 2, 3, 4, 5]
+        assert link.endswith('<http://testserver/?limit=5&offset=10>; rel="last"')
+
+    def test_count_falls_back(self, caplog):
+        pagination = self.get_pagination(
+            drf_link_header_pagination.LinkHeaderPagination,
+            count_strategy=drf_link_header_pagination.ReplicaCount("replica"),
+        )
+        with connections["replica"].execute_wrapper(fail):
+            page, link = self.paginate(pagination)
+        assert link.endswith('<http://testserver/?page=5>; rel="last"')
+        assert "Counting on replica failed" in caplog.text
+
+    def test_count_in_transaction(self):
+        pagination = self.get_pagination(
+            drf_link_header_pagination.LinkHeaderPagination,
+            count_strategy=drf_link_header_pagination.ReplicaCount("replica"),
+        )
+        with transaction.atomic():
+            page, link = self.paginate(pagination)
+        assert link.endswith('<http://testserver/?page=5>; rel="last"')
+
+    def test_async_count(self):
+        strategy = drf_link_header_pagination.ReplicaCount("replica")
+        assert async_to_sync(strategy.acount)(Item.objects.all()) == 13
+        with connections["replica"].execute_wrapper(fail):
+            assert async_to_sync(strategy.acount)(Item.objects.all()) == 23
+
+    @pytest.mark.parametrize(
+        "base",
+        [
+            drf_link_header_pagination.LinkHeaderPagination,
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination,
+            drf_link_header_pagination.LinkHeaderCursorPagination,
+            drf_link_header_pagination.LinkHeaderKeysetPagination,
+        ],
+        ids=lambda cls: cls.__name__,
+    )
+    def test_page_on_replica(self, base, caplog):
+        Item.objects.using("replica").filter(created=1).update(value=100)
+        pagination = self.get_pagination(base, page_using="replica")
+        page, link = self.paginate(pagination)
+        assert page == [100, 2, 3, 4, 5]
+
+        pagination = self.get_pagination(base, page_using="replica")
+        with connections["replica"].execute_wrapper(fail):
+            page, link = self.paginate(pagination)
+        assert page == [1, 2, 3, 4, 5]
+        assert "Paginating on replica failed" in caplog.text
+
+    def test_async_page_on_replica(self):
+        pagination = self.get_pagination(
+            drf_link_header_pagination.LinkHeaderPagination, page_using="replica"
+        )
+        request = Request(factory.get("/", {"page": 3}))
+        page = async_to_sync(pagination.apaginate_queryset)(Item.objects.all(), request)
+        assert [item.value for item in page] == [11, 12, 13]
+        assert pagination.get_next_link() is None
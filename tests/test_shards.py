@@ -0,0 +1,138 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+from drf_link_header_pagination.client import parse_link_header, parse_links
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("items")
+class TestShardLinks:
+    """
+    Unit tests for the `rel="shard"` links.
+    """
+
+    def setup(self):
+        cache.clear()
+        self.queryset = Item.objects.all()
+
+        class LimitOffsetPagination(
+            drf_link_header_pagination.LinkHeaderLimitOffsetPagination
+        ):
+            default_limit = 5
+            shard_query_param = "shards"
+            max_shards = 8
+
+        class KeysetPagination(drf_link_header_pagination.LinkHeaderKeysetPagination):
+            page_size = 5
+            ordering = "created"
+            shard_query_param = "shards"
+
+        self.limit_offset_class = LimitOffsetPagination
+        self.keyset_class = KeysetPagination
+
+    def get_links(self, pagination_class, url):
+        pagination = pagination_class()
+        page = pagination.paginate_queryset(self.queryset, Request(factory.get(url)))
+        return [item.created for item in page], pagination.get_headers().get("Link", "")
+
+    def get_shards(self, pagination_class, url):
+        _, link = self.get_links(pagination_class, url)
+        return [url for url, rel in parse_links(link) if rel == "shard"]
+
+    def crawl(self, pagination_class, url):
+        rows = []
+        while url is not None:
+            page, link = self.get_links(pagination_class, url)
+            rows.extend(page)
+            url = parse_link_header(link).get("next")
+        return rows
+
+    def test_limit_offset(self):
+        shards = self.get_shards(self.limit_offset_class, "/?shards=4")
+        assert shards == [
+            "http://testserver/?limit=5&until=5",
+            "http://testserver/?limit=5&offset=5&until=11",
+            "http://testserver/?limit=5&offset=11&until=17",
+            "http://testserver/?limit=5&offset=17",
+        ]
+        crawled = [self.crawl(self.limit_offset_class, url) for url in shards]
+        assert crawled == [
+            [1, 2, 3, 4, 5],
+            [6, 7, 8, 9, 10, 11],
+            [12, 13, 14, 15, 16, 17],
+            [18, 19, 20, 21, 22, 23],
+        ]
+
+    def test_limit_offset_max_shards(self):
+        assert len(self.get_shards(self.limit_offset_class, "/?shards=100")) == 8
+
+    def test_no_shards(self):
+        assert self.get_shards(self.limit_offset_class, "/") == []
+        self.limit_offset_class.shard_query_param = None
+        assert self.get_shards(self.limit_offset_class, "/?shards=4") == []
+
+    def test_keyset(self):
+        shards = self.get_shards(self.keyset_class, "/?shards=3")
+        assert shards == [
+            "http://testserver/?until=7",
+            "http://testserver/?after=7&until=15",
+            "http://testserver/?after=15",
+        ]
+        crawled = [self.crawl(self.keyset_class, url) for url in shards]
+        assert crawled == [list(range(1, 8)), list(range(8, 16)), list(range(16, 24))]
+
+    @pytest.mark.parametrize("window_functions", [True, False])
+    def test_keyset_boundaries(self, window_functions, monkeypatch):
+        monkeypatch.setattr(
+            connection.features, "supports_over_clause", window_functions
+        )
+        pagination = self.keyset_class()
+        pagination.paginate_queryset(self.queryset, Request(factory.get("/")))
+        with CaptureQueriesContext(connection) as queries:
+            boundaries = pagination.get_shard_boundaries(5)
+        assert boundaries == ["4", "9", "13", "18"]
+        # With window functions, the count is part of the same query.
+        assert len(queries) == (1 if window_functions else 2)
+        assert "OFFSET" not in queries[-1]["sql"]
+        assert pagination.get_shard_boundaries(1) == []
+
+    def test_keyset_boundaries_cached(self):
+        self.get_shards(self.keyset_class, "/?shards=3")
+        with CaptureQueriesContext(connection) as queries:
+            self.get_shards(self.keyset_class, "/?shards=3")
+        # The page and the start of the last page.
+        assert len(queries) == 2
+
+    def test_limit_offset_max_offset(self):
+        self.limit_offset_class.max_offset = 10
+        self.limit_offset_class.keyset_ordering = "created"
+        shards = self.get_shards(self.limit_offset_class, "/?shards=2")
+        assert shards == [
+            "http://testserver/?limit=5&until=11",
+            "http://testserver/?after=11&limit=5",
+        ]
+        crawled = [self.crawl(self.limit_offset_class, url) for url in shards]
+        assert crawled == [list(range(1, 12)), list(range(12, 24))]
+
+    @pytest.mark.parametrize("max_offset", [None, 10])
+    def test_until_ignored_without_shards(self, max_offset):
+        # `until` may be a filter of the view when shards aren't enabled.
+        self.limit_offset_class.shard_query_param = None
+        self.limit_offset_class.max_offset = max_offset
+        page, link = self.get_links(self.limit_offset_class, "/?until=2024-01-01")
+        assert page == [1, 2, 3, 4, 5]
+        assert set(parse_link_header(link)) == {"next", "first", "last"}
+
+        self.keyset_class.shard_query_param = None
+        page, link = self.get_links(self.keyset_class, "/?until=2024-01-01")
+        assert page == [1, 2, 3, 4, 5]
+        assert set(parse_link_header(link)) == {"next", "last"}
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import generics, mixins, serializers
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+class ItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Item
+        fields = ["created", "value"]
+
+
+class ExamplePagination(drf_link_header_pagination.LinkHeaderPagination):
+    page_size = 5
+    stream_chunk_size = 2
+
+
+class ExampleLimitOffsetPagination(drf_link_header_pagination.LinkHeaderLimitOffsetPagination):
+    default_limit = 4
+    stream_chunk_size = 3
+
+
+class ItemList(
+    drf_link_header_pagination.StreamingListModelMixin,
+    mixins.ListModelMixin,
+    generics.GenericAPIView,
+):
+    queryset = Item.objects.all()
+    serializer_class = ItemSerializer
+    pagination_class = ExamplePagination
+
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("items")
+class TestStreaming:
+    """
+    Unit tests for streaming pages with `StreamingListModelMixin`.
+    """
+
+    def get(self, params, **initkwargs):
+        request = factory.get("/", params)
+        response = ItemList.as_view(**initkwargs)(request)
+        assert response.streaming
+        body = b"".join(response.streaming_content)
+        return [item["value"] for item in json.loads(body.decode())], response.get("Link")
+
+    def test_page_number(self):
+        with CaptureQueriesContext(connection) as queries:
+            page, link = self.get({"page": 2})
+        assert page == [6, 7, 8, 9, 10]
+        assert link == (
+            '<http://testserver/>; rel="prev", '
+            '<http://testserver/?page=3>; rel="next", '
+            '<http://testserver/>; rel="first", '
+            '<http://testserver/?page=5>; rel="last"'
+        )
+        # The count and the page, read in chunks from a single query.
+        assert len(queries) == 2
+
+    def test_page_number_no_count(self):
+        class Pagination(ExamplePagination):
+            count_strategy = drf_link_header_pagination.NoCount()
+
+        page, link = self.get({"page": 5}, pagination_class=Pagination)
+        assert page == [21, 22, 23]
+        assert link == (
+            '<http://testserver/?page=4>; rel="prev", '
+            '<http://testserver/>; rel="first"'
+        )
+
+    def test_limit_offset(self):
+        page, link = self.get(
+            {"offset": 8}, pagination_class=ExampleLimitOffsetPagination
+        )
+        assert page == [9, 10, 11, 12]
+        assert link == (
+            '<http://testserver/?limit=4&offset=4>; rel="prev", '
+            '<http://testserver/?limit=4&offset=12>; rel="next", '
+            '<http://testserver/?limit=4>; rel="first", '
+            '<http://testserver/?limit=4&offset=20>; rel="last"'
+        )
+
+    def test_limit_offset_no_count(self):
+        class Pagination(ExampleLimitOffsetPagination):
+            count_strategy = drf_link_header_pagination.NoCount()
+
+        page, link = self.get({"offset": 16}, pagination_class=Pagination)
+        assert page == [17, 18, 19, 20]
+        assert link == (
+            '<http://testserver/?limit=4&offset=12>; rel="prev", '
+            '<http://testserver/?limit=4&offset=20>; rel="next", '
+            '<http://testserver/?limit=4>; rel="first"'
+        )
+
+    def test_empty_page(self):
+        Item.objects.all().delete()
+        page, link = self.get({})
+        assert page == []
+        assert link is None
@@ -0,0 +1,92 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+import drf_link_header_pagination
+
+from .models import Item
+
+factory = APIRequestFactory()
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.usefixtures("items")
+class TestTotalCounter:
+    """
+    Unit tests for the `X-Total-Count` header of the cursor classes.
+    """
+
+    def setup(self):
+        cache.clear()
+        self.executor = drf_link_header_pagination.CountExecutor(max_workers=1)
+
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderCursorPagination):
+            page_size = 5
+            ordering = "created"
+            total_counter = drf_link_header_pagination.TotalCounter(self.executor)
+
+        self.pagination_class = ExamplePagination
+
+    def teardown(self):
+        self.executor.shutdown()
+
+    def get_total(self, queryset):
+        request = Request(factory.get("/"))
+        pagination = self.pagination_class()
+        with CaptureQueriesContext(connection) as queries:
+            pagination.paginate_queryset(queryset, request)
+            headers = pagination.get_headers()
+        assert not any("COUNT" in query["sql"] for query in queries)
+        return headers.get("X-Total-Count")
+
+    def wait(self):
+        # Shutting down waits for the scheduled counts.
+        self.executor.shutdown()
+
+    def test_counted_in_background(self):
+        assert self.get_total(Item.objects.all()) is None
+        self.wait()
+        assert self.get_total(Item.objects.all()) == "23"
+
+    def test_adjusted_by_signals(self):
+        self.get_total(Item.objects.all())
+        self.wait()
+
+        Item.objects.create(created=100, value=100)
+        assert self.get_total(Item.objects.all()) == "24"
+        Item.objects.filter(created__lte=2).delete()
+        assert self.get_total(Item.objects.all()) == "22"
+
+    def test_filtered(self):
+        queryset = Item.objects.filter(value__gt=10)
+        self.get_total(queryset)
+        self.wait()
+        assert self.get_total(queryset) == "13"
+
+        # The stale total is served while the new one is counted.
+        Item.objects.create(created=100, value=100)
+        assert self.get_total(queryset) == "13"
+        self.wait()
+        assert self.get_total(queryset) == "14"
+
+    def test_ttl(self):
+        self.pagination_class.total_counter.ttl = 0
+        self.get_total(Item.objects.all())
+        self.wait()
+        Item.objects.bulk_create([Item(created=100, value=100)])
+        assert self.get_total(Item.objects.all()) == "23"
+        self.wait()
+        assert self.get_total(Item.objects.all()) == "24"
+
+    def test_no_counter(self):
+        class ExamplePagination(drf_link_header_pagination.LinkHeaderCursorPagination):
+            page_size = 5
+            ordering = "created"
+
+        request = Request(factory.get("/"))
+        pagination = ExamplePagination()
+        pagination.paginate_queryset(Item.objects.all(), request)
+        assert "X-Total-Count" not in pagination.get_headers()